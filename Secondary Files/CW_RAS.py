@@ -1,163 +1,289 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-
-# -----------------------------
-# LOAD DATA
-# -----------------------------
-df = pd.read_csv("CW_RAS_master_dataset.csv")
-
-# -----------------------------
-# HANDLE MISSING DATA
-# -----------------------------
-df["GW_last"] = df["GW_last"].fillna(df["GW_current"])
-df["GW_current"] = df["GW_current"].fillna(df["GW_last"])
-df = df.fillna(0)
-
-
-# -----------------------------
-# NORMALIZATION FUNCTIONS (0-100)
-# -----------------------------
-
-def normalize_rainfall(r_normal, r_current):
-    """Rainfall deviation normalized to 0-100, capped at 100."""
-    if r_normal == 0:
-        return 0
-    dev = abs(r_normal - r_current) / r_normal * 100
-    return min(dev, 100)
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
+import numpy as np
+import pandas as pd
 
-def normalize_groundwater(gw_last, gw_current):
-    """Groundwater change normalized to 0-100 using 3m reference max."""
-    MAX_GW_CHANGE = 3.0
-    if pd.isna(gw_last) or pd.isna(gw_current):
-        return 0
-    change = abs(gw_last - gw_current)
-    score = (change / MAX_GW_CHANGE) * 100
-    return min(score, 100)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from scoring import LEVELS, classify_codes, score_columns  # noqa: E402
 
+INPUT_CSV = "CW_RAS_master_dataset.csv"
+OUTPUT_CSV = "CW_RAS_output_results.csv"
+DEFAULT_CHUNK_SIZE = 100_000
 
-def normalize_landuse(urban_pct, forest_pct):
-    """Land-use score normalized to 0-100. Higher = more runoff-prone."""
-    urban_component = (urban_pct / 100) * 50
-    forest_deficit = ((100 - forest_pct) / 100) * 50
-    return min(urban_component + forest_deficit, 100)
+INPUT_COLUMNS = [
+    "R_normal", "R_current",
+    "GW_last", "GW_current",
+    "Urban_Percent", "Forest_Percent", "Water_Body_Percent",
+]
 
+NUMERIC_SCORE_COLUMNS = ["R_score", "G_score", "L_score", "SWF", "FloodRisk", "ScarcityRisk"]
+LEVEL_COLUMNS = {"FloodRiskLevel": "FloodRisk", "ScarcityRiskLevel": "ScarcityRisk"}
 
-def compute_swf(water_body_pct):
-    """Surface Water Factor: moderates scarcity for lake-adjacent areas."""
-    if pd.isna(water_body_pct) or water_body_pct <= 0:
-        return 1.0
-    return max(1.0 - (water_body_pct / 50), 0.1)
+SCORE_OUTPUT_COLUMNS = [
+    "R_score", "G_score", "L_score", "SWF",
+    "FloodRisk", "FloodRiskLevel",
+    "ScarcityRisk", "ScarcityRiskLevel"
+]
 
 
 # -----------------------------
-# STEP 1: COMPUTE NORMALIZED SCORES
+# HANDLE MISSING DATA
 # -----------------------------
 
-df["R_score"] = df.apply(
-    lambda row: normalize_rainfall(row["R_normal"], row["R_current"]),
-    axis=1
-)
+def fill_missing(df):
+    """Fill a missing GW reading from the other one, then everything else with 0.
+    Row-local, so chunks can be filled independently."""
+    df["GW_last"] = df["GW_last"].fillna(df["GW_current"])
+    df["GW_current"] = df["GW_current"].fillna(df["GW_last"])
+    return df.fillna(0)
 
-df["G_score"] = df.apply(
-    lambda row: normalize_groundwater(row["GW_last"], row["GW_current"]),
-    axis=1
-)
-
-df["L_score"] = df.apply(
-    lambda row: normalize_landuse(row["Urban_Percent"], row["Forest_Percent"]),
-    axis=1
-)
 
 # -----------------------------
-# STEP 2: WEIGHTED RISK SCORES
+# SCORE ALL ROWS
 # -----------------------------
+# Normalization (0-100), weighted flood / scarcity scores and classification
+# come from the shared vectorized engine in scoring.py:
+#   Flood    = min(0.4*R + 0.4*L + 0.2*G_rising + Water_Body_Percent*1.2, 100)
+#   Scarcity = (0.4*R + 0.4*G + 0.2*L) * SWF
+# Only rising groundwater (GW_current < GW_last, mbgl) contributes to flood risk.
+
+def score_frame(df, id_columns=("Panchayat",), float_dtype=None):
+    """Score a (filled) frame and return only the output columns.
+
+    The intermediate columns (G_Flood_Score, FloodRisk_Base, ...) stay as
+    arrays and are never added to df.
+    """
+    scores = score_columns(df)
+    out = {column: df[column].to_numpy() for column in id_columns}
+    for column in SCORE_OUTPUT_COLUMNS:
+        values = scores[column]
+        if float_dtype is not None and values.dtype.kind == "f":
+            values = values.astype(float_dtype)
+        out[column] = values
+    return pd.DataFrame(out, index=df.index)
 
-# ----- FLOOD RISK -----
-# Only rising groundwater contributes to flood risk.
-# GW (mbgl): Lower value = Higher water table.
-# Rise = GW_current < GW_last
-df["G_Flood_Score"] = df.apply(
-    lambda row: row["G_score"] if (
-        pd.notna(row["GW_current"]) and pd.notna(row["GW_last"]) and
-        row["GW_current"] < row["GW_last"]
-    ) else 0,
-    axis=1
-)
-
-# Flood Boost: Lake proximity increases flood risk
-# Boost = Water_Body_Percent * 1.2
-df["FloodBoost"] = df["Water_Body_Percent"].fillna(0) * 1.2
-
-df["FloodRisk_Base"] = (
-    0.4 * df["R_score"] +
-    0.4 * df["L_score"] +
-    0.2 * df["G_Flood_Score"]
-)
-
-# Final Flood Score = min(Base + Boost, 100)
-df["FloodRisk"] = (df["FloodRisk_Base"] + df["FloodBoost"]).clip(upper=100)
-
-
-# ----- SCARCITY RISK -----
-# Scarcity: 0.4*Rainfall + 0.4*Groundwater + 0.2*Land-use, moderated by SWF
-df["SWF"] = df["Water_Body_Percent"].apply(compute_swf) if "Water_Body_Percent" in df.columns else 1.0
-
-df["ScarcityRisk"] = (
-    0.4 * df["R_score"] +
-    0.4 * df["G_score"] +
-    0.2 * df["L_score"]
-) * df["SWF"]
 
 # -----------------------------
-# STEP 3: CLASSIFICATION
+# FULL (IN-MEMORY) RUN
 # -----------------------------
 
-def classify_risk(score):
-    if score < 30:
-        return "Low"
-    elif score < 60:
-        return "Moderate"
-    else:
-        return "High"
-
+def run(input_csv=INPUT_CSV, output_csv=OUTPUT_CSV, id_columns=("Panchayat",)):
+    df = fill_missing(pd.read_csv(input_csv))
+    results = score_frame(df, id_columns)
+    results.to_csv(output_csv, index=False)
+    return results
 
-df["FloodRiskLevel"] = df["FloodRisk"].apply(classify_risk)
-df["ScarcityRiskLevel"] = df["ScarcityRisk"].apply(classify_risk)
 
 # -----------------------------
-# SAVE OUTPUT
+# STREAMING (CHUNKED) RUN
 # -----------------------------
 
-output_columns = [
-    "Panchayat",
-    "R_score", "G_score", "L_score", "SWF",
-    "FloodRisk", "FloodRiskLevel",
-    "ScarcityRisk", "ScarcityRiskLevel"
-]
+def run_streaming(input_csv=INPUT_CSV, output_csv=OUTPUT_CSV, chunksize=DEFAULT_CHUNK_SIZE,
+                  id_columns=("Panchayat",), downcast=False):
+    """Score input_csv chunk by chunk, appending each chunk to output_csv.
+
+    Memory is bounded by chunksize rows whatever the input size. With
+    downcast=True numeric inputs are read, and scores written, as float32.
+    Returns (rows, seconds).
+    """
+    float_dtype = np.float32 if downcast else None
+    dtype = {column: float_dtype for column in INPUT_COLUMNS} if downcast else None
+    header = list(pd.read_csv(input_csv, nrows=0).columns)
+    usecols = [c for c in header if c in INPUT_COLUMNS or c in id_columns]
+    if dtype:
+        dtype = {c: t for c, t in dtype.items() if c in usecols}
+
+    start = time.perf_counter()
+    rows = 0
+    with open(output_csv, "w", newline="", encoding="utf-8") as out:
+        reader = pd.read_csv(input_csv, chunksize=chunksize, usecols=usecols, dtype=dtype)
+        for i, chunk in enumerate(reader):
+            results = score_frame(fill_missing(chunk), id_columns, float_dtype)
+            results.to_csv(out, index=False, header=(i == 0))
+            rows += len(chunk)
+        if rows == 0:
+            out.write(",".join([*id_columns, *SCORE_OUTPUT_COLUMNS]) + "\n")
+    return rows, time.perf_counter() - start
 
-df[output_columns].to_csv("CW_RAS_output_results.csv", index=False)
 
-print("✅ CW-RAS risk calculation completed successfully.")
-print("📁 Output saved as CW_RAS_output_results.csv")
+# -----------------------------
+# PARALLEL (MULTI-CORE) RUN
+# -----------------------------
+# The parent fills missing data once and copies the inputs into one
+# shared-memory block; workers attach to it by name, so shards are never
+# pickled. Each shard writes its scores into its own slice of a shared output
+# block, which keeps the merged result in input order regardless of which
+# worker finishes first.
+
+def _attach(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _score_shard(task):
+    """Worker: score rows [lo, hi) of the shared input into the shared output."""
+    in_name, out_name, levels_name, n_rows, lo, hi = task
+    start = time.perf_counter()
+    in_block, inputs = _attach(in_name, (len(INPUT_COLUMNS), n_rows), np.float64)
+    out_block, outputs = _attach(out_name, (len(NUMERIC_SCORE_COLUMNS), n_rows), np.float64)
+    lv_block, levels = _attach(levels_name, (len(LEVEL_COLUMNS), n_rows), np.int8)
+    shard = {}
+    try:
+        shard = {column: inputs[i, lo:hi] for i, column in enumerate(INPUT_COLUMNS)}
+        scores = score_columns(shard)
+        for i, column in enumerate(NUMERIC_SCORE_COLUMNS):
+            outputs[i, lo:hi] = scores[column]
+        for i, source in enumerate(LEVEL_COLUMNS.values()):
+            levels[i, lo:hi] = classify_codes(scores[source])
+    finally:
+        del inputs, outputs, levels, shard
+        for block in (in_block, out_block, lv_block):
+            block.close()
+    return lo, hi - lo, os.getpid(), time.perf_counter() - start
+
+
+def run_parallel(input_csv=INPUT_CSV, output_csv=OUTPUT_CSV, workers=None, shards=None,
+                 id_columns=("Panchayat",)):
+    """Score input_csv across a process pool.
+
+    Returns (results, stats) where stats maps each worker pid to its rows,
+    busy seconds and rows/s.
+    """
+    workers = workers or os.cpu_count() or 1
+    df = fill_missing(pd.read_csv(input_csv))
+    if "Water_Body_Percent" not in df.columns:
+        df["Water_Body_Percent"] = 0.0
+    n_rows = len(df)
+    shards = max(1, min(shards or workers * 4, n_rows or 1))
+    bounds = np.linspace(0, n_rows, shards + 1).astype(int)
+
+    blocks = []
+    try:
+        def create(shape, dtype):
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            blocks.append(block)
+            return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+        in_block, inputs = create((len(INPUT_COLUMNS), n_rows), np.float64)
+        out_block, outputs = create((len(NUMERIC_SCORE_COLUMNS), n_rows), np.float64)
+        lv_block, levels = create((len(LEVEL_COLUMNS), n_rows), np.int8)
+        for i, column in enumerate(INPUT_COLUMNS):
+            inputs[i] = df[column].to_numpy(dtype=np.float64)
+
+        tasks = [
+            (in_block.name, out_block.name, lv_block.name, n_rows, int(lo), int(hi))
+            for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+        ]
+        stats = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _lo, rows, pid, seconds in pool.map(_score_shard, tasks):
+                worker = stats.setdefault(pid, {"rows": 0, "seconds": 0.0, "shards": 0})
+                worker["rows"] += rows
+                worker["seconds"] += seconds
+                worker["shards"] += 1
+        for worker in stats.values():
+            worker["rows_per_s"] = worker["rows"] / max(worker["seconds"], 1e-9)
+
+        level_names = np.array(LEVELS, dtype=object)
+        out = {column: df[column].to_numpy() for column in id_columns}
+        numeric = {column: outputs[i].copy() for i, column in enumerate(NUMERIC_SCORE_COLUMNS)}
+        coded = {column: level_names[levels[i]] for i, column in enumerate(LEVEL_COLUMNS)}
+        for column in SCORE_OUTPUT_COLUMNS:
+            out[column] = numeric[column] if column in numeric else coded[column]
+        del inputs, outputs, levels
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    results = pd.DataFrame(out)
+    results.to_csv(output_csv, index=False)
+    return results, stats
+
 
 # -----------------------------
 # VISUALIZATION
 # -----------------------------
 
-plt.figure(figsize=(10, 5))
-plt.bar(df["Panchayat"], df["FloodRisk"])
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Flood Risk Score")
-plt.title("Flood Risk by Panchayat")
-plt.tight_layout()
-plt.show()
-
-plt.figure(figsize=(10, 5))
-plt.bar(df["Panchayat"], df["ScarcityRisk"])
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Scarcity Risk Score")
-plt.title("Water Scarcity Risk by Panchayat")
-plt.tight_layout()
-plt.show()
+def plot_results(results, save_dir=None):
+    """Bar charts of both scores. Shown interactively, or saved as PNGs in
+    save_dir for headless runs."""
+    import matplotlib
+    if save_dir is not None:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    for column, ylabel, title, filename in (
+        ("FloodRisk", "Flood Risk Score", "Flood Risk by Panchayat", "flood_risk.png"),
+        ("ScarcityRisk", "Scarcity Risk Score", "Water Scarcity Risk by Panchayat", "scarcity_risk.png"),
+    ):
+        plt.figure(figsize=(10, 5))
+        plt.bar(results["Panchayat"], results[column])
+        plt.xticks(rotation=45, ha="right")
+        plt.ylabel(ylabel)
+        plt.title(title)
+        plt.tight_layout()
+        if save_dir is None:
+            plt.show()
+        else:
+            os.makedirs(save_dir, exist_ok=True)
+            plt.savefig(os.path.join(save_dir, filename))
+            plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CW-RAS batch risk scoring")
+    parser.add_argument("--input", default=INPUT_CSV)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    parser.add_argument("--id-columns", default="Panchayat",
+                        help="comma-separated columns copied to the output (default: Panchayat)")
+    parser.add_argument("--stream", action="store_true",
+                        help="headless chunked mode for inputs larger than memory")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--downcast", action="store_true",
+                        help="read inputs and write scores as float32 (streaming mode)")
+    parser.add_argument("--workers", type=int,
+                        help="score in parallel across this many processes")
+    parser.add_argument("--shards", type=int, help="number of shards (default: 4 per worker)")
+    parser.add_argument("--no-plot", action="store_true", help="skip the charts")
+    parser.add_argument("--plot-dir", help="save charts as PNGs here instead of showing them")
+    args = parser.parse_args(argv)
+    id_columns = tuple(c for c in args.id_columns.split(",") if c)
+
+    if args.stream:
+        rows, seconds = run_streaming(args.input, args.output, args.chunksize, id_columns, args.downcast)
+        print(f"✅ CW-RAS risk calculation completed: {rows} rows in {seconds:.2f}s "
+              f"({rows / max(seconds, 1e-9):,.0f} rows/s).")
+        print(f"📁 Output saved as {args.output}")
+        return
+
+    if args.workers:
+        start = time.perf_counter()
+        results, stats = run_parallel(args.input, args.output, args.workers, args.shards, id_columns)
+        seconds = time.perf_counter() - start
+        print(f"✅ CW-RAS risk calculation completed: {len(results)} rows in {seconds:.2f}s "
+              f"with {args.workers} workers.")
+        for pid, worker in sorted(stats.items()):
+            print(f"   worker {pid}: {worker['shards']} shards, {worker['rows']} rows, "
+                  f"{worker['rows_per_s']:,.0f} rows/s")
+        print(f"📁 Output saved as {args.output}")
+        if not args.no_plot:
+            plot_results(results, args.plot_dir)
+        return
+
+    results = run(args.input, args.output, id_columns)
+    print("✅ CW-RAS risk calculation completed successfully.")
+    print(f"📁 Output saved as {args.output}")
+
+    if not args.no_plot:
+        plot_results(results, args.plot_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""CW-RAS Benchmark Suite
+
+Times the paths that matter in production and compares them with a stored
+baseline:
+
+    request.*   POST / through Flask's test client: exact name match (cached
+                and freshly rendered dashboard) and the geocode fallback with
+                a stubbed geocoder (no network)
+    nearest.*   find_nearest_panchayat against 73, 10k and 100k locations
+    batch.*     CW_RAS.py scoring throughput on synthetic datasets of growing
+                size, plus one end-to-end CSV run
+    import.*    cold `import app` in a fresh interpreter
+
+    python benchmark.py                          # run, compare with benchmark_baseline.json
+    python benchmark.py --output results.json    # also write the results
+    python benchmark.py --update-baseline        # accept the current numbers
+    python benchmark.py --quick                  # smaller sizes, for a smoke run
+
+Each metric is the best of several repeats after a warm-up call (the median
+for cold imports). A metric regresses when it is worse than the baseline by
+more than --tolerance (default 25%); the script then exits non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+os.chdir(ROOT)  # app.py loads its CSVs relative to the working directory
+import app  # noqa: E402
+import CW_RAS  # noqa: E402
+import import_report  # noqa: E402
+from spatial import SpatialIndex  # noqa: E402
+
+
+def timed(fn, repeat=5, number=1):
+    """Best seconds per call of fn over repeat rounds of number calls. The
+    minimum, as in timeit, is the least sensitive to other load on the box."""
+    fn()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return min(rounds)
+
+
+def synthetic_frame(rows, seed=0):
+    """Master-dataset shaped frame with realistic ranges and a few NaNs."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Panchayat": [f"P{i}" for i in range(rows)],
+        "R_normal": rng.uniform(1000, 30000, rows),
+        "R_current": rng.uniform(500, 30000, rows),
+        "GW_last": rng.uniform(1, 20, rows),
+        "GW_current": rng.uniform(1, 20, rows),
+        "Urban_Percent": rng.uniform(0, 80, rows),
+        "Forest_Percent": rng.uniform(0, 80, rows),
+        "Water_Body_Percent": rng.uniform(0, 60, rows),
+    })
+    df.loc[df.sample(frac=0.01, random_state=seed).index, "GW_current"] = np.nan
+    return df
+
+
+# ---------- request path ----------
+def bench_requests(results, repeat):
+    client = app.app.test_client()
+    data = app.datasets.current
+    exact = data.panchayat_list[0]
+
+    def post(name):
+        response = client.post("/", data={"panchayat": name, "risk_type": "flood"})
+        assert response.status_code == 200, response.status_code
+
+    post(exact)  # warm the page cache
+    results["request.post_exact_ms"] = timed(lambda: post(exact), repeat, 50) * 1000
+
+    # Pages are cached under page_version (dataset and history versions)
+    version = app.page_version(data)
+
+    def post_uncached():
+        app.dashboard_pages.invalidate(version)
+        post(exact)
+    results["request.post_exact_render_ms"] = timed(post_uncached, repeat, 20) * 1000
+    app.dashboard_pages.invalidate(app.page_version(app.datasets.current))
+    post(exact)  # leave a warm cache for the measurements that follow
+
+    lat, lon = float(data.location_columns["Latitude"][0]), float(data.location_columns["Longitude"][0])
+    calls = []
+
+    def stub_geocoder(place_name):
+        calls.append(place_name)
+        return lat, lon
+
+    real_geocoder = app.get_lat_long
+    app.get_lat_long = stub_geocoder
+    try:
+        results["request.post_geocode_ms"] = timed(lambda: post("Zqxvw Jnctn"), repeat, 50) * 1000
+    finally:
+        app.get_lat_long = real_geocoder
+    assert calls, "geocode benchmark never reached the geocoder"
+
+
+# ---------- nearest panchayat ----------
+def bench_nearest(results, repeat, sizes):
+    data = app.datasets.current
+    rng = np.random.default_rng(1)
+    queries = list(zip(rng.uniform(8.2, 9.4, 200), rng.uniform(76.4, 77.3, 200)))
+
+    for size in sizes:
+        if size is None:
+            label, snapshot = len(data.panchayat_list), data
+        else:
+            label = size
+            snapshot = types.SimpleNamespace(location_index=SpatialIndex(
+                rng.uniform(8.0, 12.8, size), rng.uniform(74.8, 77.4, size),
+                [f"P{i}" for i in range(size)],
+            ))
+
+        def run():
+            for q_lat, q_lon in queries:
+                app.find_nearest_panchayat(q_lat, q_lon, snapshot)
+        results[f"nearest.{label}_us"] = timed(run, repeat * 2) / len(queries) * 1e6
+
+
+# ---------- batch scoring ----------
+def bench_batch(results, repeat, sizes):
+    for size in sizes:
+        frame = synthetic_frame(size)
+
+        def run():
+            CW_RAS.score_frame(CW_RAS.fill_missing(frame.copy()))
+        results[f"batch.{size}_rows_per_s"] = size / timed(run, repeat)
+
+    size = sizes[-1]
+    with tempfile.TemporaryDirectory() as workdir:
+        input_csv = os.path.join(workdir, "input.csv")
+        synthetic_frame(size).to_csv(input_csv, index=False)
+        output_csv = os.path.join(workdir, "output.csv")
+        elapsed = timed(lambda: CW_RAS.run(input_csv, output_csv), max(repeat // 2, 1))
+    results[f"batch.csv_{size}_rows_per_s"] = size / elapsed
+
+
+# ---------- cold import ----------
+def bench_import(results, repeat):
+    totals = [import_report.summarize(import_report.measure("app"))["total_ms"]
+              for _ in range(repeat)]
+    results["import.app_ms"] = statistics.median(totals)
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+
+def compare(results, baseline, tolerance):
+    """[(metric, baseline, current, change)] for every regressed metric."""
+    regressions = []
+    for metric, current in results.items():
+        previous = baseline.get(metric)
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        worse = -change if higher_is_better(metric) else change
+        if worse > tolerance:
+            regressions.append((metric, previous, current, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CW-RAS benchmark suite")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="small sizes, for a smoke run")
+    args = parser.parse_args(argv)
+
+    batch_sizes = [1_000, 10_000] if args.quick else [10_000, 100_000, 1_000_000]
+    nearest_sizes = [None, 10_000] if args.quick else [None, 10_000, 100_000]
+
+    results = {}
+    bench_requests(results, args.repeat)
+    bench_nearest(results, args.repeat, nearest_sizes)
+    bench_batch(results, args.repeat, batch_sizes)
+    bench_import(results, args.repeat)
+
+    print("=== BENCHMARK REPORT ===")
+    for metric, value in results.items():
+        print(f"{metric:<36}{value:>16,.2f}")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; run with --update-baseline to store one.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for metric, previous, current, change in regressions:
+        print(f"REGRESSION: {metric} {previous:,.2f} -> {current:,.2f} ({change:+.0%})")
+    if regressions:
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} of the baseline ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
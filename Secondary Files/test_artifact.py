@@ -0,0 +1,122 @@
+"""CW-RAS Compiled Dataset Artifact Verification (round trip, staleness, fallback)"""
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import artifact  # noqa: E402
+import uncertainty  # noqa: E402
+from dataset import build_score_table, file_version, load_dataset  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+master = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def same_table(a, b):
+    """Score tables equal, with NaN equal to NaN."""
+    if a.keys() != b.keys():
+        return False
+    for key in a:
+        for field, value in a[key].items():
+            other = b[key][field]
+            if value != other and not (isinstance(value, float) and np.isnan(value) and np.isnan(other)):
+                return False
+    return True
+
+
+workdir = tempfile.mkdtemp()
+risk_csv = os.path.join(workdir, "risk.csv")
+locations_csv = os.path.join(workdir, "locations.csv")
+path = os.path.join(workdir, "dataset.bin")
+master.to_csv(risk_csv, index=False)
+shutil.copy(os.path.join(ROOT, "panchayat_locations.csv"), locations_csv)
+locations = pd.read_csv(locations_csv)
+
+
+def compile_artifact():
+    artifact.write_artifact(path, pd.read_csv(risk_csv), locations, file_version(risk_csv, locations_csv, None))
+
+
+print("=== DATASET ARTIFACT REPORT ===")
+
+print("\n[Test 1] Round trip")
+compile_artifact()
+compiled = artifact.read_artifact(path)
+check(compiled.is_current(file_version(risk_csv, locations_csv, None)), "a fresh artifact is current")
+check(all(isinstance(compiled.risk[c], np.ndarray) and not compiled.risk[c].flags.owndata
+          for c in artifact.RISK_COLUMNS), "numeric columns are views of the mapped file")
+check(list(compiled.risk["Panchayat"]) == list(master["Panchayat"])
+      and all(np.array_equal(compiled.risk[c], master[c], equal_nan=True) for c in artifact.RISK_COLUMNS)
+      and np.array_equal(compiled.locations["Latitude"], locations["Latitude"]),
+      "inputs read back bit for bit")
+check(same_table(build_score_table(compiled.risk, compiled.scores), build_score_table(master)),
+      "the stored scores give the same score table as scoring the CSV")
+bands = uncertainty.simulate(master)
+check(all(np.array_equal(getattr(compiled.uncertainty, n), getattr(bands, n))
+          for n in uncertainty.UncertaintyResult.ARRAYS), "the stored uncertainty bands match a fresh simulation")
+
+data = load_dataset(risk_csv, locations_csv, None, path)
+check(isinstance(data.risk_columns, dict) and data.uncertainty_ready,
+      "load_dataset uses a current artifact (no CSV parse, no simulation)")
+
+print("\n[Test 2] Staleness")
+real_scoring_version = artifact.SCORING_VERSION
+artifact.SCORING_VERSION = "0" * 12
+check(not compiled.is_current(compiled.source_version), "a changed SCORING_VERSION makes the artifact stale")
+check(isinstance(load_dataset(risk_csv, locations_csv, None, path).risk_columns, pd.DataFrame),
+      "a stale artifact falls back to the CSVs")
+artifact.SCORING_VERSION = real_scoring_version
+
+with open(path, "r+b") as f:
+    magic, _, header_length = struct.unpack("<8sII", f.read(16))
+    f.seek(0)
+    f.write(struct.pack("<8sII", magic, artifact.FORMAT_VERSION + 1, header_length))
+try:
+    artifact.read_artifact(path)
+    rejected = False
+except ValueError:
+    rejected = True
+check(rejected, "another FORMAT_VERSION is refused")
+check(isinstance(load_dataset(risk_csv, locations_csv, None, path).risk_columns, pd.DataFrame),
+      "an unreadable artifact falls back to the CSVs")
+
+compile_artifact()
+time.sleep(0.01)
+os.utime(risk_csv)                               # new mtime, same content
+check(artifact.read_artifact(path).is_current(file_version(risk_csv, locations_csv, None)),
+      "touching a source without changing it keeps the artifact current")
+wet = master.copy()
+wet["R_current"] = wet["R_current"] * 2
+wet.to_csv(risk_csv, index=False)
+check(not artifact.read_artifact(path).is_current(file_version(risk_csv, locations_csv, None)),
+      "a changed source makes the artifact stale")
+data = load_dataset(risk_csv, locations_csv, None, path)
+check(isinstance(data.risk_columns, pd.DataFrame)
+      and same_table(data.score_table, build_score_table(wet)), "the dataset is rebuilt from the changed CSVs")
+
+artifact.main(["--master", risk_csv, "--locations", locations_csv, "--aliases", os.path.join(workdir, "none"),
+               "--output", path])
+check(isinstance(load_dataset(risk_csv, locations_csv, None, path).risk_columns, dict),
+      "recompiling makes the artifact current again")
+
+shutil.rmtree(workdir)
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,55 @@
+"""CW-RAS Batch Scoring API Verification"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import app  # noqa: E402
+
+data = app.datasets.current
+client = app.app.test_client()
+name = data.panchayat_list[0]
+lat, lon = float(data.location_index.lats[0]), float(data.location_index.lons[0])
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+print("=== BATCH API REPORT ===")
+
+print("\n[Test 1] Names and coordinates")
+response = client.post("/api/scores", json={"queries": [name, {"lat": lat, "lon": lon}]})
+body = json.loads(response.get_data(as_text=True))
+first, second = body["results"]
+check(response.status_code == 200 and first["panchayat"] == name
+      and first["flood"]["score"] == data.score_table[(name, "flood")]["score"], "a name is scored from the table")
+check(second["panchayat"] == data.location_index.labels[0] and second["distance_km"] < 0.01,
+      "coordinates resolve to the nearest panchayat")
+
+print("\n[Test 2] Bad coordinates")
+bad = [{"lat": "nan", "lon": "nan"}, {"lat": 1000, "lon": 76.6}, {"lat": 9, "lon": "inf"}, {"lat": "x", "lon": 1}]
+text = client.post("/api/scores", json={"queries": bad}).get_data(as_text=True)
+results = json.loads(text)["results"]     # strict JSON: NaN / Infinity would not parse
+check("NaN" not in text and all("error" in r and "panchayat" not in r for r in results),
+      "NaN, infinite and out-of-range coordinates get a per-item error")
+
+lines = client.post("/api/scores?format=ndjson", json={"queries": [name, bad[0]]}).get_data(as_text=True).splitlines()
+check(len(lines) == 2 and "error" in json.loads(lines[1]), "NDJSON streams one object per query")
+
+print("\n[Test 3] Request validation")
+check(client.post("/api/scores", json={"nope": 1}).status_code == 400
+      and client.post("/api/scores", json={"queries": [name], "risk_types": ["drought"]}).status_code == 400
+      and client.post("/api/scores", json={"queries": [name] * (app.API_MAX_BATCH + 1)}).status_code == 413,
+      "malformed, unknown risk type and oversized batches are rejected")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
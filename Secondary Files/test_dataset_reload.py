@@ -0,0 +1,147 @@
+"""CW-RAS Dataset Reload Verification (atomic swap, failed rebuilds, /admin/reload)"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import DatasetManager  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+master = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+NAME = master["Panchayat"][0]
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+workdir = tempfile.mkdtemp()
+risk_csv = os.path.join(workdir, "risk.csv")
+locations_csv = os.path.join(workdir, "locations.csv")
+shutil.copy(os.path.join(ROOT, "panchayat_locations.csv"), locations_csv)
+
+
+def write_risk(df):
+    """Replace the risk CSV the way an upstream export should: atomically."""
+    tmp = risk_csv + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, risk_csv)
+
+
+wet = master.copy()
+wet["R_current"] = wet["R_current"] * 1.5
+write_risk(master)
+
+print("=== DATASET RELOAD REPORT ===")
+
+print("\n[Test 1] Reload on change")
+manager = DatasetManager(risk_csv, locations_csv, None, None, check_interval=3600)
+swaps = []
+manager.on_swap(lambda data: swaps.append(data.version))
+dry = manager.current
+check(manager.reload() is False and manager.current is dry, "unchanged files are not rebuilt")
+check(manager.reload(force=True) is False and not swaps, "a forced rebuild of identical data is not a swap")
+
+write_risk(wet)
+check(manager.reload() is True and swaps == [manager.version] and manager.version != dry.version,
+      "changed files swap in a new snapshot and notify listeners")
+check(manager.current.score_table[(NAME, "flood")]["score"] != dry.score_table[(NAME, "flood")]["score"],
+      "the new snapshot carries the new scores")
+check(dry.score_table[(NAME, "flood")] is not None and dry.version != manager.version,
+      "a reader's old snapshot stays intact after the swap")
+
+print("\n[Test 2] Atomic swap under concurrent readers")
+wet_version = manager.version
+expected = {dry.version: dry.score_table[(NAME, "flood")]["score"],
+            manager.version: manager.current.score_table[(NAME, "flood")]["score"]}
+seen, errors = set(), []
+stop = threading.Event()
+
+
+def reader():
+    while not stop.is_set():
+        data = manager.current
+        try:
+            if data.score_table[(NAME, "flood")]["score"] != expected[data.version]:
+                errors.append(f"{data.version}: scores from another snapshot")
+            if len(data.panchayat_list) != len(master):
+                errors.append(f"{data.version}: partial panchayat list")
+            seen.add(data.version)
+        except Exception as exc:
+            errors.append(repr(exc))
+
+
+threads = [threading.Thread(target=reader) for _ in range(4)]
+for thread in threads:
+    thread.start()
+for df in [master, wet, master, wet]:
+    time.sleep(0.05)
+    write_risk(df)
+    manager.reload()
+stop.set()
+for thread in threads:
+    thread.join()
+check(not errors, f"every snapshot a reader sees is complete and self-consistent ({len(errors)} errors)")
+check(seen == set(expected), "readers saw both versions while the swaps happened")
+
+print("\n[Test 3] Failed rebuilds")
+good = manager.current
+with open(risk_csv, "w", encoding="utf-8") as f:
+    f.write("Panchayat,R_normal\nBroken,not a number\n")
+check(manager.reload() is False and manager.current is good, "a failed rebuild keeps the last good snapshot")
+check(manager.last_error is not None, f"the failure is recorded ({manager.last_error})")
+check(manager.reload() is False, "the broken files are not retried until they change again")
+write_risk(master)
+check(manager.reload() is True and manager.last_error is None, "fixed files swap in and clear the error")
+
+print("\n[Test 4] Background check")
+manager.check_interval = 0
+write_risk(wet)
+manager.check()
+deadline = time.time() + 30
+while manager.version != wet_version and time.time() < deadline:
+    time.sleep(0.05)
+check(manager.version == wet_version and manager.last_error is None,
+      "check() rebuilds changed files in the background")
+manager.check_interval = 3600  # requests below must not race a background rebuild
+
+print("\n[Test 5] /admin/reload")
+os.environ.pop("CWRAS_RELOAD_TOKEN", None)
+os.environ["CWRAS_HISTORY_DIR"] = tempfile.mkdtemp()
+os.chdir(ROOT)
+import app  # noqa: E402
+
+app.datasets = manager
+client = app.app.test_client()
+check(client.post("/admin/reload").status_code == 403, "disabled when CWRAS_RELOAD_TOKEN is unset")
+os.environ["CWRAS_RELOAD_TOKEN"] = "s3cret"
+check(client.post("/admin/reload", headers={"X-Reload-Token": "guess"}).status_code == 403,
+      "a wrong token is rejected")
+check(client.get("/admin/reload").status_code == 405, "GET is not allowed")
+
+before = client.get("/api/dataset").get_json()["version"]
+write_risk(master)
+reply = client.post("/admin/reload", headers={"X-Reload-Token": "s3cret"})
+body = reply.get_json()
+check(reply.status_code == 200 and body["swapped"] and body["version"] != before and body["error"] is None,
+      "a valid token swaps in the changed files")
+check(client.get("/api/dataset").get_json()["version"] == body["version"], "the API serves the new version")
+body = client.post("/admin/reload", headers={"X-Reload-Token": "s3cret"}).get_json()
+check(body["swapped"] is False, "reloading identical files reports no swap")
+
+shutil.rmtree(workdir)
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
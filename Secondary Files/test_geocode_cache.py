@@ -0,0 +1,153 @@
+"""CW-RAS Geocode Cache Verification (TTL, LRU eviction, negative caching)"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from geocoding import GeocodeCache, Geocoder, Provider, TokenBucket  # noqa: E402
+
+DAY = 24 * 3600
+hits = []
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = parse_qs(urlparse(self.path).query)["q"][0].split(",")[0]
+        hits.append(name)
+        body = [] if name == "Nowhere" else [{"lat": "9.5", "lon": "76.5"}]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+workdir = tempfile.mkdtemp()
+
+print("=== GEOCODE CACHE REPORT ===")
+
+print("\n[Test 1] TTL expiry")
+clock = Clock()
+cache = GeocodeCache(workdir, ttl=30 * DAY, negative_ttl=DAY, clock=clock)
+cache.set("Alappad", 9.1, 76.5)
+check(cache.get("alappad  ") == (9.1, 76.5), "hit is case- and whitespace-insensitive")
+clock.now += 30 * DAY - 1
+check(cache.get("Alappad") == (9.1, 76.5), "entry is served until its TTL")
+clock.now += 1
+check(cache.get("Alappad") is None, "entry expires at its TTL (memory tier)")
+cache.set("Anchal", 8.9, 76.9)
+cache.clear()
+check(cache.get("Anchal") == (8.9, 76.9), "disk tier refills memory after clear()")
+cache.clear()
+clock.now += 30 * DAY
+check(cache.get("Anchal") is None, "expired disk entries are misses")
+
+print("\n[Test 2] LRU eviction")
+clock = Clock()
+cache = GeocodeCache(os.path.join(workdir, "lru"), max_entries=3, clock=clock)
+for i, name in enumerate(["A", "B", "C"]):
+    cache.set(name, float(i), float(i))
+cache.get("A")                          # A is now most recently used
+cache.set("D", 3.0, 3.0)                # evicts B, the least recently used
+check(list(cache._entries) == ["c", "a", "d"], "least recently used entry is evicted first")
+check(len(cache._entries) <= 3, "memory tier stays within max_entries")
+check(cache.get("B") == (1.0, 1.0), "evicted entries are still served from disk")
+check("b" in cache._entries and "c" not in cache._entries, "a disk hit re-enters the LRU")
+
+print("\n[Test 3] Negative caching")
+clock = Clock()
+cache = GeocodeCache(os.path.join(workdir, "negative"), ttl=30 * DAY, negative_ttl=DAY, clock=clock)
+cache.set("Nowhere", None, None)
+check(cache.get("Nowhere") == (None, None), "not-found answers are cached as (None, None)")
+cache.clear()
+check(cache.get("Nowhere") == (None, None), "not-found answers persist on disk")
+clock.now += DAY
+check(cache.get("Nowhere") is None, "not-found answers expire after the shorter TTL")
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubNominatim)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/search"
+provider = Provider(url)
+provider.bucket = TokenBucket(50, capacity=10)     # the request path never waits for a token
+geocoder = Geocoder(provider, cache=cache)
+clock.now += DAY
+hits.clear()
+first = geocoder.lookup("Nowhere")
+second = geocoder.lookup("Nowhere")
+check(first == second == (None, None) and hits == ["Nowhere"],
+      "Geocoder asks upstream once for an unknown name")
+geocoder.lookup("Kollam")
+geocoder.lookup("KOLLAM")
+check(hits == ["Nowhere", "Kollam"], "Geocoder asks upstream once for a known name")
+geocoder.close()
+server.shutdown()
+
+print("\n[Test 4] Foreign files in cache/")
+foreign = GeocodeCache(os.path.join(workdir, "foreign"), clock=Clock())
+os.makedirs(foreign.cache_dir)
+with open(foreign._path("kollam"), "w", encoding="utf-8") as f:
+    json.dump([{"lat": "1", "lon": "2"}], f)
+check(foreign.get("Kollam") is None, "files that are not cache entries are ignored")
+
+print("\n[Test 5] Pruning expired entries on disk")
+clock = Clock()
+pruned = GeocodeCache(os.path.join(workdir, "prune"), ttl=30 * DAY, negative_ttl=DAY,
+                      prune_interval=2 * DAY, clock=clock)
+pruned.set("Kollam", 8.9, 76.6)
+pruned.set("Nowhere", None, None)
+pruned.set("Elsewhere", None, None)
+with open(os.path.join(pruned.cache_dir, "foreign.json"), "w", encoding="utf-8") as f:
+    json.dump({"results": []}, f)
+clock.now += 2 * DAY
+pruned.clear()
+check(pruned.get("Nowhere") is None and not os.path.exists(pruned._path("nowhere")),
+      "an expired entry is deleted when it is read")
+pruned.set("Anchal", 8.9, 76.9)
+files = sorted(os.listdir(pruned.cache_dir))
+check(files == sorted(["foreign.json", os.path.basename(pruned._path("kollam")),
+                       os.path.basename(pruned._path("anchal"))]),
+      "a write sweeps expired not-found entries and keeps live and foreign files")
+clock.now += 30 * DAY
+pruned.set("Alappad", 9.1, 76.5)
+check(not os.path.exists(pruned._path("kollam")) and os.path.exists(pruned._path("alappad")),
+      "expired found entries are swept too")
+pruned.set("Gone", None, None)
+clock.now += 1.5 * DAY
+pruned.set("Punalur", 9.0, 76.9)
+check(os.path.exists(pruned._path("gone")), "the sweep runs at most once per prune_interval")
+check(pruned.prune() == 1 and os.path.exists(pruned._path("punalur")), "prune() reports what it removed")
+check(pruned.hits == 0 and pruned.misses == 1, "hits and misses are counted")
+
+shutil.rmtree(workdir)
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,133 @@
+"""CW-RAS Geocoder Resilience Verification (against a local fake Nominatim)"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from geocoding import (AsyncGeocoder, CircuitBreaker, CircuitOpenError,  # noqa: E402
+                       GeocodeCache, Geocoder, GeocodingError, Provider)
+
+hits = []
+mode = {"down": False}
+
+
+class FakeNominatim(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = parse_qs(urlparse(self.path).query)["q"][0]
+        hits.append(name)
+        if name == "Hang":
+            time.sleep(1.5)
+        if mode["down"] or name == "Hang":
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(0.2)  # long enough for concurrent callers to overlap
+        payload = json.dumps([] if name == "Nowhere" else [{"lat": "9.5", "lon": "76.5"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNominatim)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def geocoder(timeout=(1, 1), **kwargs):
+    cache = GeocodeCache(tempfile.mkdtemp())
+    return Geocoder(Provider(url, rate=1000, name="fake", timeout=timeout), cache=cache, **kwargs)
+
+
+print("=== GEOCODER RESILIENCE REPORT ===")
+
+print("\n[Test 1] Single-flight")
+g = geocoder()
+results = []
+threads = [threading.Thread(target=lambda: results.append(g.lookup("Kollam"))) for _ in range(10)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+check(hits.count("Kollam") == 1, f"10 concurrent lookups made {hits.count('Kollam')} upstream call(s)")
+check(results == [(9.5, 76.5)] * 10, "every caller gets the shared result")
+g.lookup("kollam ")
+check(hits.count("Kollam") + hits.count("kollam ") == 1, "later lookups come from the cache")
+check(g.lookup("Nowhere") == (None, None), "not found is an answer, not an error")
+
+print("\n[Test 2] Strict timeouts")
+start = time.perf_counter()
+try:
+    geocoder(timeout=(1, 0.3)).lookup("Hang")
+    raised = False
+except GeocodingError:
+    raised = True
+elapsed = time.perf_counter() - start
+check(raised and elapsed < 1.0, f"a hung upstream fails after {elapsed:.2f}s instead of blocking")
+
+print("\n[Test 3] Circuit breaker")
+clock = [0.0]
+g = geocoder(breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=lambda: clock[0]))
+mode["down"] = True
+hits.clear()
+errors = []
+for i in range(6):
+    try:
+        g.lookup(f"Down {i}")
+    except GeocodingError as exc:
+        errors.append(exc)
+check(len(hits) == 3, f"upstream hit {len(hits)} times before the breaker opened")
+check(all(isinstance(e, CircuitOpenError) for e in errors[3:]), "further calls fail fast")
+check(g.breaker.state == "open", "breaker reports open")
+
+mode["down"] = False
+clock[0] = 31.0
+check(g.lookup("Recovered") == (9.5, 76.5), "a trial call after reset_timeout goes through")
+check(g.breaker.state == "closed", "a successful trial closes the breaker")
+
+print("\n[Test 4] Async variant")
+hits.clear()
+ag = AsyncGeocoder(geocoder(), max_workers=2, deadline=1.0)
+
+
+async def burst():
+    return await asyncio.gather(*(ag.lookup("Anchal") for _ in range(20)))
+
+answers = asyncio.run(burst())
+check(answers == [(9.5, 76.5)] * 20 and hits.count("Anchal") == 1,
+      "20 concurrent awaits share one upstream call")
+
+ag.deadline = 0.3
+try:
+    asyncio.run(ag.lookup("Hang"))
+    raised = False
+except GeocodingError:
+    raised = True
+check(raised, "a slow lookup is cut off at the deadline")
+ag.close()
+
+server.shutdown()
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
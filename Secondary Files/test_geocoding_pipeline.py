@@ -0,0 +1,136 @@
+"""CW-RAS Geocoding Pipeline Verification (against a local stub Nominatim)"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import generate_panchayat_locations as gpl  # noqa: E402
+from geocoding import Provider  # noqa: E402
+
+hits = []
+flaky_failures = {"Flaky": 1}
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = parse_qs(urlparse(self.path).query)["q"][0].split(",")[0]
+        hits.append(name)
+        if flaky_failures.get(name, 0) > 0:
+            flaky_failures[name] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if name == "Broken":
+            self.send_response(503)
+            self.end_headers()
+            return
+        if name == "Nowhere":
+            body = []
+        elif name == "Garbled":
+            body = [{"display_name": "no coordinates"}]
+        else:
+            body = [{"lat": "9.5", "lon": str(76 + len(name) / 100)}]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubNominatim)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+workdir = tempfile.mkdtemp()
+master = os.path.join(workdir, "master.csv")
+output = os.path.join(workdir, "locations.csv")
+checkpoint = os.path.join(workdir, "checkpoint.jsonl")
+names = ["Alappad", "Known", "Flaky", "Nowhere", "Broken", "Garbled", "Anchal", "Chavara", "Panmana", "Thevalakkara"]
+pd.DataFrame({"Panchayat": names}).to_csv(master, index=False)
+pd.DataFrame({"Panchayat": ["Known"], "Latitude": [8.0], "Longitude": [77.0]}).to_csv(output, index=False)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def providers():
+    return [Provider(url, rate=50, name="stub-a"), Provider(url, rate=50, name="stub-b")]
+
+
+print("=== GEOCODING PIPELINE REPORT ===")
+
+print("\n[Test 1] First run")
+df, missing = gpl.generate(master, output, checkpoint, providers(), threads_per_provider=2,
+                           retries=2, backoff=0.01, log=lambda *_: None)
+located = df.set_index("Panchayat")
+check("Known" not in hits, "names that already have coordinates are skipped")
+check(located.loc["Known", "Latitude"] == 8.0, "existing coordinates are kept")
+check(hits.count("Flaky") == 2 and located.loc["Flaky", "Latitude"] == 9.5, "503 is retried")
+check(pd.isna(located.loc["Nowhere", "Latitude"]), "not-found names have empty coordinates")
+check(missing == ["Broken", "Garbled"], "persistent failures are reported for the next run")
+check(located.loc[["Anchal", "Chavara", "Panmana", "Thevalakkara"], "Latitude"].eq(9.5).all(),
+      "an unexpected answer does not stop its worker thread")
+check(list(df["Panchayat"]) == names, "output keeps the master dataset order")
+check(os.path.exists(checkpoint), "checkpoint is kept while names are missing")
+
+print("\n[Test 2] Resume")
+hits.clear()
+df, missing = gpl.generate(master, output, checkpoint, providers(), retries=0,
+                           log=lambda *_: None)
+check(set(hits) == {"Broken", "Garbled"}, "only unfinished names are requested again")
+
+print("\n[Test 3] Rate limit")
+bucket = Provider(url, rate=2).bucket
+clock = [0.0]
+bucket.clock = lambda: clock[0]
+bucket.sleep = lambda s: clock.__setitem__(0, clock[0] + s)
+bucket._updated = 0.0
+for _ in range(5):
+    bucket.acquire()
+check(abs(clock[0] - 2.0) < 1e-9, "token bucket spaces 5 calls at 2/s over 2 seconds")
+
+print("\n[Test 4] Provider specs")
+spec = Provider.parse("https://user:p@ss@geo.example/search 5")
+check(spec.url == "https://user:p@ss@geo.example/search" and spec.bucket.rate == 5,
+      "URLs with user:pass@host keep their userinfo")
+check(Provider.parse("https://geo.example/search", rate=3).bucket.rate == 3, "the rate is optional")
+
+print("\n[Test 5] Spelling differences between files")
+spelled_master = os.path.join(workdir, "spelled_master.csv")
+spelled_output = os.path.join(workdir, "spelled_locations.csv")
+spelled_checkpoint = os.path.join(workdir, "spelled_checkpoint.jsonl")
+pd.DataFrame({"Panchayat": ["Sooranadu South", "Kareepra", "Chavara"]}).to_csv(spelled_master, index=False)
+pd.DataFrame({"Panchayat": ["Sooranaadu South", "Karipra"], "Latitude": [9.1, 8.9],
+              "Longitude": [76.6, 76.7]}).to_csv(spelled_output, index=False)
+hits.clear()
+df, missing = gpl.generate(spelled_master, spelled_output, spelled_checkpoint, providers(),
+                           log=lambda *_: None)
+located = df.set_index("Panchayat")
+check(hits == ["Chavara"], "rows spelled differently in the locations file are not geocoded again")
+check(located.loc["Sooranadu South", "Latitude"] == 9.1 and located.loc["Kareepra", "Longitude"] == 76.7,
+      "their hand-entered coordinates are kept under the master spelling")
+check(gpl.load_existing(spelled_output) == {"Sooranadu South": (9.1, 76.6), "Kareepra": (8.9, 76.7),
+                                            "Chavara": (9.5, 76.07)}, "the rewritten file uses master names")
+
+server.shutdown()
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
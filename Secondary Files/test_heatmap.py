@@ -0,0 +1,107 @@
+"""CW-RAS Heatmap Tiles Verification"""
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import heatmap  # noqa: E402
+from dataset import load_dataset  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+os.chdir(ROOT)
+data = load_dataset()
+lats, lons, names, values = heatmap.located_scores(data)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def decode_png(blob):
+    """(width, height, rgba) of an unfiltered 8-bit RGBA PNG."""
+    assert blob[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, chunks = 8, {}
+    while pos < len(blob):
+        length, kind = struct.unpack(">I4s", blob[pos:pos + 8])
+        body = blob[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", blob[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        pos += 12 + length
+    width, height = struct.unpack(">II", chunks[b"IHDR"][:8])
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width * 4 + 1)
+    return width, height, raw[:, 1:].reshape(height, width, 4)
+
+
+def inside(ring, x, y):
+    """Point in a counter-clockwise convex ring."""
+    return all((b[0] - a[0]) * (y - a[1]) - (b[1] - a[1]) * (x - a[0]) >= -1e-9
+               for a, b in zip(ring, ring[1:]))
+
+
+print("=== HEATMAP REPORT ===")
+
+print("\n[Test 1] Interpolation")
+start = time.perf_counter()
+kerala = heatmap.interpolate(lats, lons, values, (8.17, 74.85, 12.8, 77.42), max_km=400)
+elapsed = time.perf_counter() - start
+check(kerala.shape[0] * kerala.shape[1] > 140000 and elapsed < 5,
+      f"1 km grid over Kerala ({kerala.shape[0]} x {kerala.shape[1]}) in {elapsed:.2f}s")
+
+exact = True
+for lat, lon, score in zip(lats[::10], lons[::10], values["flood"][::10]):
+    half_lat = 0.5 / heatmap.KM_PER_DEGREE      # one 1 km cell centred on the panchayat
+    half_lon = half_lat / math.cos(math.radians(lat))
+    cell = heatmap.interpolate(lats, lons, values, (lat - half_lat, lon - half_lon, lat + half_lat, lon + half_lon))
+    exact = exact and cell.shape == (1, 1) and abs(cell.values["flood"][0, 0] - score) < 1e-6
+check(exact, "the surface passes through the panchayat scores")
+finite = kerala.values["scarcity"][~np.isnan(kerala.values["scarcity"])]
+check(finite.min() >= values["scarcity"].min() - 1e-9 and finite.max() <= values["scarcity"].max() + 1e-9,
+      "interpolated values stay within the observed range")
+
+sparse = heatmap.interpolate(lats, lons, values, (8.0, 74.0, 13.0, 78.0), resolution_km=5, max_km=10)
+check(np.isnan(sparse.values["flood"]).any() and (sparse.nearest == -1).sum() == np.isnan(sparse.values["flood"]).sum(),
+      "cells beyond max_km are left empty")
+
+print("\n[Test 2] Tiles and polygons")
+output = tempfile.mkdtemp()
+heatmap.build(data, output, zooms=(8, 10), log=lambda message: None)
+manifest = json.load(open(os.path.join(output, "manifest.json")))
+check(manifest["dataset_version"] == data.version and manifest["zooms"] == [8, 10], "manifest written")
+
+south, west, north, east = manifest["bbox"]
+for zoom in (8, 10):
+    x0, x1, y0, y1 = heatmap.tile_range(manifest["bbox"], zoom)
+    n = 2 ** zoom
+    check(x0 / n * 360 - 180 <= west and (x1 + 1) / n * 360 - 180 >= east
+          and math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y0 / n)))) >= north,
+          f"zoom {zoom} tile range covers the bounds")
+
+tiles = [os.path.join(d, f) for d, _, files in os.walk(os.path.join(output, "flood")) for f in files]
+width, height, rgba = decode_png(open(tiles[0], "rb").read())
+check(width == height == heatmap.TILE_SIZE and rgba[..., 3].max() == heatmap.ALPHA, f"{len(tiles)} valid flood tiles")
+
+regions = json.load(open(os.path.join(output, "regions.geojson")))
+features = {f["properties"]["panchayat"]: f for f in regions["features"]}
+check(set(features) == set(names), f"one polygon per located panchayat ({len(features)})")
+check(all(inside(features[name]["geometry"]["coordinates"][0], lon, lat)
+          for name, lat, lon in zip(names, lats, lons)), "each polygon contains its panchayat")
+row = data.score_table[(names[0], "flood")]
+check(features[names[0]]["properties"]["flood"] == row["score"]
+      and features[names[0]]["properties"]["flood_level"] == row["level"], "polygons carry the scores")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,146 @@
+"""CW-RAS Risk History Store Verification"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import scoring  # noqa: E402
+from history import HistoryStore  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+master = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+rng = np.random.default_rng(3)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def month(i):
+    """Synthetic readings for month i (2023-01 + i)."""
+    df = master.drop(columns=["GW_last"]).copy()
+    df["R_current"] = df["R_current"] * rng.uniform(0.7, 1.3, len(df))
+    df["GW_current"] = df["GW_current"] + rng.normal(0, 1, len(df))
+    return f"{2023 + i // 12}-{i % 12 + 1:02d}", df
+
+
+def full_rescore(store, name):
+    """Score every month of one panchayat from scratch."""
+    periods = store.periods(name)
+    rows = [store.row(name, period) for period in periods]
+    gw_last = [rows[0]["GW_last"]] + [row["GW_current"] for row in rows[:-1]]
+    columns = {c: np.array([row[c] for row in rows]) for c in
+               ("R_normal", "R_current", "GW_current", "Urban_Percent", "Forest_Percent", "Water_Body_Percent")}
+    return scoring.score_columns({**columns, "GW_last": np.array(gw_last)})
+
+
+print("=== HISTORY STORE REPORT ===")
+path = tempfile.mkdtemp()
+store = HistoryStore(path)
+
+print("\n[Test 1] Appending months")
+store.append("2022-12", master)
+months = [month(i) for i in range(12)]
+for period, df in months:
+    store.append(period, df)
+check(len(store.periods()) == 13, "13 months stored")
+check(store.append(*months[5]) == 0, "re-sending an unchanged month rescores nothing")
+
+name = master["Panchayat"][10]
+jan = store.row(name, "2023-01")
+check(jan["GW_last_used"] == store.row(name, "2022-12")["GW_current"],
+      "GW_last comes from the previous month's GW_current")
+
+print("\n[Test 2] Corrections")
+before = store.row(name, "2023-08")
+rescored = store.correct(name, "2023-07", GW_current=before["GW_current"] + 2.5)
+check(rescored == 2, f"a correction rescores its month and the next one ({rescored} rows)")
+after = store.row(name, "2023-08")
+check(after["GW_last_used"] == store.row(name, "2023-07")["GW_current"]
+      and after["G_score"] != before["G_score"], "the following month picks up the corrected reading")
+other = master["Panchayat"][11]
+check(store.row(other, "2023-08") is not None and store.trend(other)["flood"] == HistoryStore(path).trend(other)["flood"],
+      "other panchayats are untouched")
+
+full = full_rescore(store, name)
+trend = store.trend(name)
+check(np.allclose(trend["flood"], np.round(full["FloodRisk"], 2))
+      and np.allclose(trend["scarcity"], np.round(full["ScarcityRisk"], 2)),
+      "incremental scores equal a full rescore")
+
+print("\n[Test 3] Reopening and range queries")
+reopened = HistoryStore(path)
+check(reopened.trend(name) == trend and reopened.version == store.version, "a fresh reader sees the same history")
+window = reopened.trend(name, "2023-03", "2023-05")
+check(window["periods"] == ["2023-03", "2023-04", "2023-05"], "from/to bounds are inclusive")
+
+store.correct(name, "2023-12", R_current=1.0)
+check(reopened.refresh(force=True) and reopened.trend(name) == store.trend(name),
+      "refresh() picks up segments written by another process")
+
+try:
+    store.append("2023-13", master)
+    rejected = False
+except ValueError:
+    rejected = True
+check(rejected, "malformed periods are rejected")
+
+print("\n[Test 4] Concurrent refreshes")
+stop = threading.Event()
+stale = []
+
+
+def refresher():
+    seen = 0.0
+    while not stop.is_set():
+        reopened.refresh(force=True)
+        value = reopened.row(name, "2023-12")["R_current"]
+        if value < seen:                              # corrections only ever raise R_current
+            stale.append((seen, value))
+        seen = max(seen, value)
+
+
+switch_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)                           # interleave the refreshers as much as possible
+threads = [threading.Thread(target=refresher) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for value in range(1, 101):
+    store.correct(name, "2023-12", R_current=float(value))
+stop.set()
+for thread in threads:
+    thread.join()
+sys.setswitchinterval(switch_interval)
+reopened.refresh(force=True)
+check(not stale and reopened.row(name, "2023-12")["R_current"] == 100.0 and reopened.version == store.version,
+      f"racing refreshes never put an older segment's row back over a newer one ({len(stale)} stale reads)")
+
+print("\n[Test 5] Dashboard revalidation")
+os.environ["CWRAS_HISTORY_DIR"] = tempfile.mkdtemp()
+os.chdir(ROOT)
+import app  # noqa: E402
+
+url = f"/dashboard/flood/{quote(name)}"
+first = app.app.test_client().get(url)
+time.sleep(1.1)                                   # Last-Modified has one-second resolution
+app.history.append("2024-01", master)
+again = app.app.test_client().get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+check(again.status_code == 200 and "2024-01" in again.get_data(as_text=True)
+      and again.last_modified > first.last_modified,
+      "a history append moves Last-Modified, so If-Modified-Since gets the new page")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,88 @@
+"""CW-RAS Local Land-Cover Backend Verification (synthetic WorldCover raster)"""
+import json
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import landuse_updater as lu  # noqa: E402
+
+# 0.001 degree pixels (~111 m) over 9.0-9.4 N, 76.5-76.9 E, split into two
+# tiles at 76.7 E. West half is built-up (50), east half tree cover (10),
+# with a lake (80) in the north-east corner.
+PIXEL = 0.001
+full = np.full((400, 400), 10, dtype=np.uint8)
+full[:, :200] = 50
+full[:100, 300:] = 80
+west = lu.ArrayTile(full[:, :200], (76.5, PIXEL, 9.4, -PIXEL))
+
+workdir = tempfile.mkdtemp()
+east_path = os.path.join(workdir, "east.npy")
+np.save(east_path, full[:, 200:])
+with open(east_path + ".json", "w") as f:
+    json.dump({"transform": [76.7, PIXEL, 9.4, -PIXEL]}, f)
+east = lu.open_tile(east_path)
+
+backend = lu.RasterBackend([west, east], strip_rows=50)
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def brute_force(lat, lon, radius):
+    """Per-pixel distance test over the whole synthetic raster."""
+    rows, cols = np.mgrid[0:400, 0:400]
+    plat = 9.4 - (rows + 0.5) * PIXEL
+    plon = 76.5 + (cols + 0.5) * PIXEL
+    dy = (plat - lat) * lu.METRES_PER_DEGREE
+    dx = (plon - lon) * lu.METRES_PER_DEGREE * math.cos(math.radians(lat))
+    inside = dx ** 2 + dy ** 2 <= radius ** 2
+    return {int(c): int(n) for c, n in zip(*np.unique(full[inside], return_counts=True))}
+
+
+print("=== LOCAL LAND-COVER REPORT ===")
+
+points = [
+    ("Boundary", 9.2, 76.7),    # straddles both tiles
+    ("Urban", 9.2, 76.55),
+    ("Lakeside", 9.35, 76.85),
+    ("Offshore", 5.0, 70.0),    # outside every tile
+]
+histograms = backend.histograms(points, radius=5000)
+
+print("\n[Test 1] Histograms match a per-pixel scan")
+for key, lat, lon in points[:3]:
+    expected = brute_force(lat, lon, 5000)
+    got = histograms.get(key, {})
+    total = sum(expected.values())
+    diff = sum(abs(got.get(c, 0) - expected.get(c, 0)) for c in set(got) | set(expected))
+    check(diff <= 0.03 * total, f"{key}: {got} vs {expected}")
+
+print("\n[Test 2] Buffers across tile edges")
+boundary = histograms["Boundary"]
+check(abs(boundary.get(50, 0) - boundary.get(10, 0)) <= 0.05 * sum(boundary.values()),
+      "boundary buffer is split about evenly between built-up and trees")
+
+print("\n[Test 3] Missing coverage falls back to defaults")
+check("Offshore" not in histograms, "points outside every tile return no histogram")
+locations = pd.DataFrame(points, columns=["Panchayat", "Latitude", "Longitude"])
+landuse = lu.compute_landuse(locations, backend)
+check(tuple(landuse.loc["Offshore"]) == lu.FALLBACK_PERCENTAGES, "fallback percentages used")
+check(landuse.loc["Lakeside", "Water_Body_Percent"] > 0, "lake pixels counted as water")
+
+print("\n[Test 4] Mask reuse")
+check(len(backend._masks) <= 4, f"{len(backend._masks)} masks built for {len(points)} buffers")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
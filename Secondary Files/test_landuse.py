@@ -0,0 +1,92 @@
+"""CW-RAS Land-Use Update Verification (chunked backend, percentages, master merge)"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import landuse_updater as lu  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+master = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+locations = pd.read_csv(os.path.join(ROOT, "panchayat_locations.csv"))
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+# Random recorded histograms for every located panchayat except the last, with
+# string class keys as in an Earth Engine JSON dump.
+rng = np.random.default_rng(7)
+located = locations.dropna(subset=["Latitude", "Longitude"])
+recorded = {}
+for name in located["Panchayat"][:-1]:
+    counts = rng.integers(0, 5000, size=4)
+    recorded[name] = {"10": int(counts[0]), "40": int(counts[1]), "50": int(counts[2]), "80.0": int(counts[3])}
+missing = located["Panchayat"].iloc[-1]
+
+print("=== LAND-USE UPDATE REPORT ===")
+
+print("\n[Test 1] Fixture backend through compute_landuse")
+backend = lu.FixtureBackend(recorded, chunk_size=10, max_workers=3)
+chunks = []
+reduce_chunk = backend._reduce_chunk
+backend._reduce_chunk = lambda points, radius: chunks.append(len(points)) or reduce_chunk(points, radius)
+landuse = lu.compute_landuse(locations, backend)
+check(len(chunks) == -(-len(located) // 10) > 1 and sum(chunks) == len(located),
+      f"the points are reduced in {len(chunks)} chunks of at most 10")
+check(list(landuse.index) == list(dict.fromkeys(located["Panchayat"])), "every located panchayat gets a row")
+first = located["Panchayat"].iloc[0]
+hist = recorded[first]
+total = sum(hist.values())
+check(landuse.loc[first].tolist() == [round(hist["50"] / total * 100, 2),
+                                      round((hist["10"] + hist["40"]) / total * 100, 2),
+                                      round(hist["80.0"] / total * 100, 2)],
+      "percentages follow the recorded histogram")
+check(tuple(landuse.loc[missing]) == lu.FALLBACK_PERCENTAGES, "a buffer without data gets the fallback")
+
+print("\n[Test 2] Percentages stay in range")
+values = landuse.to_numpy()
+check(((values >= 0) & (values <= 100)).all() and (values.sum(axis=1) <= 100.01).all(),
+      "each percentage is within 0-100 and the three classes never exceed 100 together")
+check(lu.percentages_from_histogram({}) == lu.FALLBACK_PERCENTAGES
+      and lu.percentages_from_histogram({"50": 0}) == lu.FALLBACK_PERCENTAGES,
+      "empty and all-zero histograms fall back")
+
+print("\n[Test 3] update_master")
+target = ["Urban_Percent", "Forest_Percent", "Water_Body_Percent"]
+updated = lu.update_master(master, landuse)
+others = [c for c in master.columns if c not in target]
+check(list(updated.columns) == list(master.columns) and updated[others].equals(master[others]),
+      "only the land-use columns change")
+row = updated.set_index("Panchayat").loc[first]
+check(row[target].tolist() == landuse.loc[first].tolist(), "a located panchayat takes the new values")
+check(len(master) == len(updated) and master.equals(pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))),
+      "the input frame is left untouched")
+
+name = "Sooranadu South"
+position = int(master.index[master["Panchayat"] == name][0])
+variant = pd.DataFrame([[11.0, 22.0, 33.0]], columns=target, index=pd.Index(["Sooranaadu South"], name="Panchayat"))
+updated = lu.update_master(master, variant)
+check(updated.set_index("Panchayat").loc[name, target].tolist() == [11.0, 22.0, 33.0],
+      "a location row with a transliteration variant still updates its panchayat")
+both = pd.concat([variant, pd.DataFrame([[1.0, 2.0, 3.0]], columns=target,
+                                        index=pd.Index([name], name="Panchayat"))])
+updated = lu.update_master(master, both)
+check(updated.set_index("Panchayat").loc[name, target].tolist() == [1.0, 2.0, 3.0],
+      "the exact spelling wins over a variant")
+check(updated.drop(columns=target).equals(master.drop(columns=target))
+      and (updated[target].drop(index=position) == master[target].drop(index=position)).all().all(),
+      "panchayats without a location keep their values")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
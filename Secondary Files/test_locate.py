@@ -0,0 +1,98 @@
+"""CW-RAS Coordinate Lookup Verification"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import app  # noqa: E402
+from spatial import haversine_km  # noqa: E402
+
+data = app.datasets.current
+locator = data.locator
+client = app.app.test_client()
+rng = np.random.default_rng(11)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Scalar great-circle distance in km, written out independently."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+print("=== COORDINATE LOOKUP REPORT ===")
+
+print("\n[Test 1] Blending")
+lats, lons = locator.index.lats, locator.index.lons
+on_centroid = locator.blend(lats, lons)
+check(all(on_centroid.scores[r]["score"][i] == data.score_table[(name, r)]["score"]
+          for i, name in enumerate(locator.names) for r in ("flood", "scarcity")),
+      "a point on a centroid gets that panchayat's own score")
+
+points_lat = rng.uniform(lats.min(), lats.max(), 2000)
+points_lon = rng.uniform(lons.min(), lons.max(), 2000)
+single = locator.blend(points_lat, points_lon, k=1, max_km=1e9)
+check([locator.names[i] for i in single.neighbours[:200, 0]]
+      == [app.find_nearest_panchayat(a, b, data) for a, b in zip(points_lat[:200], points_lon[:200])],
+      "k=1 matches find_nearest_panchayat")
+
+blend = locator.blend(points_lat, points_lon, k=6, max_km=1e9)
+values = locator.values["flood"]["score"][blend.neighbours]
+flood = blend.scores["flood"]["score"]
+check(np.all(flood >= values.min(axis=1) - 1e-9) and np.all(flood <= values.max(axis=1) + 1e-9),
+      "blended scores lie between the contributing scores")
+check(np.allclose(blend.weights.sum(axis=1), 1) and np.all(np.diff(blend.weights, axis=1) <= 1e-12),
+      "weights sum to 1 and fall with distance")
+check(np.allclose(blend.distances_km[:, 0], [haversine(a, b, lats[i], lons[i])
+                                             for a, b, i in zip(points_lat, points_lon, blend.neighbours[:, 0])]),
+      "vectorized distances match the scalar haversine")
+parts = locator.values["flood"]
+check(np.allclose(flood, (blend.weights * parts["score"][blend.neighbours]).sum(axis=1))
+      and np.allclose(blend.scores["flood"]["rainfall_score"],
+                      (blend.weights * parts["rainfall_score"][blend.neighbours]).sum(axis=1)),
+      "components are blended with the same weights")
+
+near = locator.blend(points_lat, points_lon, k=6, max_km=5)
+check(np.all(near.distances_km[near.weights > 0] <= 5)
+      and np.array_equal(near.covered, near.distances_km[:, 0] <= 5), "max_km limits the contributors")
+
+print("\n[Test 2] API")
+response = client.get(f"/api/locate?lat={lats[0]}&lon={lons[0]}&k=3")
+result = response.get_json()["results"][0]
+check(response.status_code == 200 and result["neighbours"][0]["panchayat"] == locator.names[0]
+      and result["flood"]["score"] == data.score_table[(locator.names[0], "flood")]["score"], "GET one point")
+
+points = [[float(a), float(b)] for a, b in zip(rng.uniform(8.7, 9.3, 5000), rng.uniform(76.4, 77.1, 5000))]
+start = time.perf_counter()
+response = client.post("/api/locate", json={"points": points + [{"lat": 1, "lon": "x"}, [0, 0]]})
+elapsed = time.perf_counter() - start
+results = response.get_json()["results"]
+check(response.status_code == 200 and len(results) == 5002 and elapsed < 2,
+      f"5000 points in one request ({elapsed * 1000:.0f} ms)")
+check("error" in results[-2] and "error" in results[-1] and "flood" in results[0], "bad and out-of-range points are reported in place")
+check(abs(results[10]["neighbours"][0]["distance_km"]
+          - float(haversine_km(*points[10], lats[locator.names.index(results[10]["neighbours"][0]["panchayat"])],
+                               lons[locator.names.index(results[10]["neighbours"][0]["panchayat"])]))) < 1e-3,
+      "results carry contributor distances")
+check(client.post("/api/locate", json={"points": [[9, 76.6]] * (app.API_MAX_BATCH + 1)}).status_code == 413
+      and client.get("/api/locate?lat=9&lon=76.6&k=99").status_code == 400
+      and client.post("/api/locate", json={"points": [[9, 76.6]], "risk_types": ["drought"]}).status_code == 400,
+      "oversized batches and bad options are rejected")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
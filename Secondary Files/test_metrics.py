@@ -0,0 +1,119 @@
+"""CW-RAS Metrics and Slow-Request Profiler Verification"""
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["CWRAS_HISTORY_DIR"] = tempfile.mkdtemp()
+import app  # noqa: E402
+import metrics  # noqa: E402
+
+data = app.datasets.current
+client = app.app.test_client()
+name = data.panchayat_list[0]
+lat, lon = float(data.location_index.lats[0]), float(data.location_index.lons[0])
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def scrape():
+    """{series with labels: value} from /metrics."""
+    response = client.get("/metrics")
+    assert response.status_code == 200, response.status_code
+    assert response.content_type == metrics.CONTENT_TYPE, response.content_type
+    series = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            series[key] = float(value)
+    return series
+
+
+def slow_geocoder(place_name):
+    time.sleep(0.05)
+    return lat, lon
+
+
+print("=== METRICS REPORT ===")
+
+print("\n[Test 1] Scraping /metrics")
+before = scrape()
+for _ in range(3):
+    client.post("/", data={"panchayat": name, "risk_type": "flood"})
+after = scrape()
+
+matched = 'cwras_resolutions_total{method="name_match"}'
+check(after[matched] - before.get(matched, 0) == 3, "name matches are counted")
+count = 'cwras_request_seconds_count{endpoint="index"}'
+check(after[count] - before.get(count, 0) == 3, "request latency is observed once per request")
+buckets = [(key, value) for key, value in after.items()
+           if key.startswith('cwras_request_seconds_bucket{endpoint="index"')]
+values = [value for _, value in buckets]
+check(buckets[-1][0].endswith('le="+Inf"}') and values == sorted(values) and values[-1] == after[count],
+      "buckets are cumulative and end at +Inf with the total count")
+check(after['cwras_stage_seconds_count{stage="name_match"}'] >= 3
+      and after['cwras_stage_seconds_sum{stage="name_match"}'] > 0, "stages are timed")
+check(after["cwras_dataset_panchayats"] == len(data.panchayat_list), "gauges are read at scrape time")
+check(all(re.fullmatch(r"[a-z_]+(\{[^}]*\})?", key) for key in after), "every line is a valid series")
+
+print("\n[Test 2] Slow-request profiles")
+profile_dir = tempfile.mkdtemp()
+app.profiler = metrics.SlowRequestProfiler(profile_dir, threshold=0.001, interval=0.001)
+app.get_lat_long = slow_geocoder
+written = metrics.slow_profiles.value()
+for _ in range(2):
+    client.post("/", data={"panchayat": "Zqxvw Jnctn", "risk_type": "flood"})
+profiles = sorted(os.listdir(profile_dir))
+check(len(profiles) == 2 and all(p.endswith(".folded") for p in profiles)
+      and metrics.slow_profiles.value() - written == 2,
+      "each slow request writes its own .folded profile, even with the same label and duration")
+with open(os.path.join(profile_dir, profiles[0]), encoding="utf-8") as f:
+    lines = f.read().splitlines()
+check(lines and all(re.fullmatch(r".+ \d+", line) for line in lines)
+      and any("slow_geocoder" in line for line in lines), "profiles are collapsed stacks of the slow frames")
+
+app.profiler = None
+fast_dir = tempfile.mkdtemp()
+fast = metrics.SlowRequestProfiler(fast_dir, threshold=10)
+fast.begin("fast")
+check(fast.end() is None and not os.listdir(fast_dir), "fast requests leave no profile")
+
+print("\n[Test 3] Ending while the sampler runs")
+busy = metrics.SlowRequestProfiler(tempfile.mkdtemp(), threshold=0, interval=0)
+errors = []
+
+
+def request_loop(label):
+    try:
+        for _ in range(50):
+            busy.begin(label)
+            deadline = time.perf_counter() + 0.002
+            while time.perf_counter() < deadline:
+                pass
+            busy.end()
+    except Exception as exc:
+        errors.append(repr(exc))
+
+
+threads = [threading.Thread(target=request_loop, args=(f"t{i}",)) for i in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+check(not errors, f"end() never races the sampler ({errors[:1]})")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
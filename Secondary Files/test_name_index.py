@@ -0,0 +1,111 @@
+"""CW-RAS Name Index Verification (alias, transliteration, prefix, fuzzy, ambiguity)"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from name_index import BKTree, NameIndex, edit_distance, load_aliases  # noqa: E402
+
+NAMES = [
+    "Sasthamkotta", "Karunagappally (M)", "Thekkumbhagam", "Kareepra*", "Kollam (C)",
+    "Alappad", "Chavara", "Panmana", "Poothakkulam", "Pootharakkulam",
+    "Kulakkada", "Kulathupuzha", "Edamulakkal", "Elamad",
+]
+ALIASES = {
+    "ശാസ്താംകോട്ട": "Sasthamkotta",
+    "Quilon": "Kollam (C)",
+    "Chavra": "Chavara",
+    "Kolam": "Kollam (C)",
+    "Nowhere": "Not A Panchayat",          # unknown targets are ignored
+    "Kulam": "Kulakkada",                  # an alias shared by two panchayats ...
+    "kulam ": "Kulathupuzha",              # ... is ambiguous and dropped
+}
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+index = NameIndex(NAMES, aliases=ALIASES)
+
+print("=== NAME INDEX REPORT ===")
+
+print("\n[Test 1] Exact and aliases")
+check(index.lookup("  sasthamkotta ") == "Sasthamkotta", "case and spacing are ignored")
+check(index.lookup("Kareepra") == "Kareepra*", "asterisk markers are ignored")
+check(index.lookup("Karunagappally") == "Karunagappally (M)", "(M) suffix is optional")
+check(index.lookup("kollam") == "Kollam (C)", "(C) suffix is optional")
+check(index.lookup("ശാസ്താംകോട്ട") == "Sasthamkotta", "Malayalam-script alias")
+check(index.lookup("Quilon") == "Kollam (C)", "historical-name alias")
+check(index.lookup("CHAVRA") == "Chavara", "misspelling alias, case-insensitive")
+check(index.exact("Nowhere") is None, "aliases to unknown panchayats are ignored")
+check(index.exact("Kulam") is None, "an alias naming two panchayats is dropped")
+
+print("\n[Test 2] Transliteration")
+check(index.lookup("Karipra") == "Kareepra*", "ee / i")
+check(index.lookup("Tekkumbagam") == "Thekkumbhagam", "aspirated consonants")
+check(index.lookup("Poothakulam") == "Poothakkulam", "doubled letters")
+check(index.lookup("Edamuzhakkal") == "Edamulakkal", "zh / l")
+check(index.lookup("Sastham Kotta") == "Sasthamkotta", "spacing")
+
+print("\n[Test 3] Prefix")
+check(index.prefix("sasthamk") == "Sasthamkotta", "an unambiguous prefix resolves")
+check(index.prefix("Karunag") == "Karunagappally (M)", "prefix of a suffixed name")
+check(index.prefix("Poot") is None, "a prefix shared by two panchayats is ambiguous")
+check(index.prefix("Pan") is None, "prefixes shorter than the minimum are ignored")
+check(index.lookup("Poothak") == "Poothakkulam", "a longer prefix disambiguates")
+
+print("\n[Test 4] Fuzzy")
+check(index.fuzzy("Alapad") == "Alappad", "one edit within a short name")
+check(index.fuzzy("Sastamkottah") == "Sasthamkotta", "two edits within a longer name")
+check(index.fuzzy("Elamd") == "Elamad", "a 5-letter query allows one edit")
+check(index.fuzzy("Elam") is None, "4-letter queries must be exact")
+check(index.fuzzy("Panmxnx") is None, "queries beyond the edit budget do not match")
+check(index.fuzzy("Poothaakkulam") is None, "a tie between two panchayats is ambiguous")
+check(index.lookup("Trivandrum") is None, "unknown names fall back to geocoding")
+
+print("\n[Test 5] BK-tree against a linear scan")
+words = [name.lower() for name in NAMES] + ["kulam", "kollam", "kolam", "kallam"]
+tree = BKTree(words)
+ok = True
+for query in ["kollam", "kulakada", "chavra", "x", "poothakulam", "elamad"]:
+    for budget in range(4):
+        expected = sorted({(edit_distance(query, w), w) for w in words if edit_distance(query, w) <= budget})
+        ok = ok and tree.search(query, budget) == expected
+check(ok, "search returns every word within the budget, closest first")
+check(edit_distance("kitten", "sitting") == 3 and edit_distance("", "abc") == 3, "Levenshtein distance")
+
+print("\n[Test 6] Alias file")
+workdir = tempfile.mkdtemp()
+path = os.path.join(workdir, "aliases.csv")
+with open(path, "w", encoding="utf-8") as f:
+    f.write("Alias,Panchayat\nQuilon,Kollam (C)\n,Chavara\n")
+check(load_aliases(path) == {"Quilon": "Kollam (C)"}, "rows without an alias are skipped")
+check(load_aliases(os.path.join(workdir, "missing.csv")) == {}, "a missing file means no aliases")
+shutil.rmtree(workdir)
+check(load_aliases(None) == {}, "no path means no aliases")
+
+print("\n[Test 7] Shipped aliases")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+with open(os.path.join(ROOT, "CW_RAS_master_dataset.csv"), encoding="utf-8") as f:
+    master = [line.split(",", 1)[0] for line in f.read().splitlines()[1:]]
+shipped = load_aliases(os.path.join(ROOT, "panchayat_aliases.csv"))
+index = NameIndex(master, aliases=shipped)
+check(set(shipped.values()) <= set(master) and all(index.exact(a) == n for a, n in shipped.items()),
+      f"all {len(shipped)} shipped aliases resolve exactly to their panchayat")
+check(all(index.lookup(name) == name for name in master), "no alias shadows a canonical name")
+check(index.lookup("കൊല്ലം") == "Kollam(C)*" and index.lookup("quilon") == "Kollam(C)*"
+      and index.lookup("Kizhakke Kallada") == "East Kallada", "Malayalam and English aliases")
+check(index.lookup("അഞ്ചല്\u200d") == "Anchal" and index.lookup("അലയമണ്\u200d") == "Alayamon",
+      "old-style ZWJ chillu letters match the atomic ones")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,104 @@
+"""CW-RAS Dashboard Page Cache Verification (ETag, Last-Modified, 304, invalidation)"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+os.chdir(ROOT)
+os.environ["CWRAS_HISTORY_DIR"] = tempfile.mkdtemp()
+import app  # noqa: E402
+from page_cache import PageCache  # noqa: E402
+
+master = pd.read_csv("CW_RAS_master_dataset.csv")
+name = master["Panchayat"][0]
+url = f"/dashboard/flood/{quote(name)}"
+client = app.app.test_client()
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+print("=== PAGE CACHE REPORT ===")
+
+print("\n[Test 1] Validators")
+first = client.get(url)
+check(first.status_code == 200 and first.headers.get("ETag") and first.headers.get("Last-Modified"),
+      "a dashboard carries an ETag and Last-Modified")
+check(first.cache_control.public and first.cache_control.max_age == app.DASHBOARD_MAX_AGE,
+      "GET responses are publicly cacheable")
+hits = app.dashboard_pages.hits
+again = client.get(url)
+check(again.get_data() == first.get_data() and again.headers["ETag"] == first.headers["ETag"]
+      and app.dashboard_pages.hits == hits + 1, "a repeat request is served from the cache")
+posted = client.post("/", data={"panchayat": name, "risk_type": "flood"})
+check(posted.headers["ETag"] == first.headers["ETag"] and not posted.cache_control.public,
+      "POST / shares the cached page but is not marked public")
+
+marked = next(n for n in master["Panchayat"] if "*" in n)
+page = client.post("/", data={"panchayat": marked.rstrip("*"), "risk_type": "flood"})
+shown = page.get_data(as_text=True)
+check(f"📍 {marked.rstrip('*')}<" in shown and f"{marked}<" not in shown
+      and page.headers["Content-Location"] == f"/dashboard/flood/{marked}",
+      "the page shows the display name; the URL keeps the canonical key")
+
+print("\n[Test 2] Conditional requests")
+reply = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+check(reply.status_code == 304 and reply.get_data() == b"", "If-None-Match with the current ETag gets 304 and no body")
+reply = client.get(url, headers={"If-None-Match": '"not-the-etag"'})
+check(reply.status_code == 200 and reply.get_data() == first.get_data(), "a different ETag gets the full page")
+reply = client.get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+check(reply.status_code == 304 and reply.get_data() == b"", "If-Modified-Since at Last-Modified gets 304")
+reply = client.get(url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+check(reply.status_code == 200, "an older If-Modified-Since gets the full page")
+
+print("\n[Test 3] A dataset reload invalidates the page")
+workdir = tempfile.mkdtemp()
+risk_csv = os.path.join(workdir, "risk.csv")
+locations_csv = os.path.join(workdir, "locations.csv")
+master.to_csv(risk_csv, index=False)
+shutil.copy("panchayat_locations.csv", locations_csv)
+app.datasets.check_interval = 3600              # only the explicit reloads below
+app.datasets.paths = (risk_csv, locations_csv, None, None)
+app.datasets.reload(force=True)
+baseline = client.get(url)
+
+time.sleep(1.1)                                 # Last-Modified has one-second resolution
+wet = master.copy()
+wet["R_current"] = wet["R_current"] * 3
+wet.to_csv(risk_csv, index=False)
+check(app.datasets.reload() and len(app.dashboard_pages) == 0, "the swap empties the page cache")
+reply = client.get(url, headers={"If-None-Match": baseline.headers["ETag"],
+                                 "If-Modified-Since": baseline.headers["Last-Modified"]})
+score = app.datasets.current.score_table[(name, "flood")]["score"]
+check(reply.status_code == 200 and reply.headers["ETag"] != baseline.headers["ETag"]
+      and reply.last_modified > baseline.last_modified and str(score) in reply.get_data(as_text=True),
+      "old validators get the re-rendered page with new scores and validators")
+shutil.rmtree(workdir)
+
+print("\n[Test 4] Concurrent lookups")
+cache = PageCache("v1")
+threads = [threading.Thread(target=lambda: [cache.get_or_render(str(i % 10), "flood", "v1", lambda: "page", 0)
+                                            for i in range(2000)]) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+check(cache.hits + cache.misses == 16000 and len(cache) == 10, "every lookup is counted exactly once")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
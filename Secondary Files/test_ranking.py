@@ -0,0 +1,78 @@
+"""CW-RAS Ranking Index Verification"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import build_score_table  # noqa: E402
+from ranking import LANDUSE_TYPES, RiskRanking, landuse_type  # noqa: E402
+from scoring import LEVELS  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+table = build_score_table(pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv")))
+index = RiskRanking(table)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def brute_force(risk_type, landuse, level, min_score, max_score):
+    rows = [
+        (name, row) for (name, kind), row in table.items()
+        if kind == risk_type
+        and (landuse is None or row["landuse_type"] == landuse)
+        and (level is None or row["level"] == level)
+        and (min_score is None or row["score"] >= min_score)
+        and (max_score is None or row["score"] <= max_score)
+    ]
+    return [name for name, _ in sorted(rows, key=lambda item: (-item[1]["score"], item[0]))]
+
+
+print("=== RANKING INDEX REPORT ===")
+
+print("\n[Test 1] Every filter combination against a full scan")
+mismatches = 0
+combinations = 0
+for risk_type in ("flood", "scarcity"):
+    for landuse in (None, *LANDUSE_TYPES):
+        for level in (None, *LEVELS):
+            for bounds in ((None, None), (30, None), (None, 45.5), (20, 60), (70, 10)):
+                expected = brute_force(risk_type, landuse, level, *bounds)
+                for offset, limit in ((0, 20), (3, 5), (len(expected), 5)):
+                    combinations += 1
+                    total, entries = index.query(risk_type, landuse, level, *bounds, offset, limit)
+                    if total != len(expected) or [e["panchayat"] for e in entries] != expected[offset:offset + limit]:
+                        mismatches += 1
+check(mismatches == 0, f"{combinations} queries match a sorted full scan")
+
+print("\n[Test 2] Ranks and aliases")
+_, top = index.query("flood", limit=3)
+check([e["rank"] for e in top] == [1, 2, 3], "ranks are positions in the unfiltered order")
+_, urban = index.query("flood", landuse="Urban-dominant", limit=100)
+check(all(a["rank"] < b["rank"] for a, b in zip(urban, urban[1:])), "filtered results keep overall ranks")
+check(landuse_type("rural") == "Rural / Forest-dominant" and landuse_type("Semi-Urban") == "Semi-urban"
+      and landuse_type("desert") is None, "land-use filter aliases")
+
+print("\n[Test 3] API parameters")
+os.chdir(ROOT)
+import app  # noqa: E402
+
+client = app.app.test_client()
+check(all(client.get(f"/api/rankings/flood?{query}").status_code == 400
+          for query in ("min=nan", "max=inf", "min=-Infinity", "min=abc", "limit=0")),
+      "non-finite or malformed bounds are rejected")
+response = client.get("/api/rankings/flood?min=60&limit=1000")
+check(response.status_code == 200 and all(e["score"] >= 60 for e in response.get_json()["results"]),
+      "finite bounds filter the ranking")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
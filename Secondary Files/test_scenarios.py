@@ -0,0 +1,104 @@
+"""CW-RAS Scenario Sweep Verification"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import scenarios  # noqa: E402
+import scoring  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+df = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def reference(row, p):
+    """Scalar re-implementation of one scenario for one region."""
+    r_normal, r_current = row.R_normal, row.R_current
+    r = 0.0 if r_normal == 0 else min(abs(r_normal - r_current) / r_normal * 100, 100)
+    delta = abs(row.GW_last - row.GW_current)
+    g = 0.0 if np.isnan(delta) else min(delta / p["max_gw_change"] * 100, 100)
+    g_flood = g if row.GW_current < row.GW_last else 0.0
+    urban = 0.0 if np.isnan(row.Urban_Percent) else row.Urban_Percent
+    forest = 0.0 if np.isnan(row.Forest_Percent) else row.Forest_Percent
+    lu = min(urban / 100 * 50 + (100 - forest) / 100 * 50, 100)
+    water = row.Water_Body_Percent
+    swf = 1.0 if np.isnan(water) or water <= 0 else max(1 - water / p["swf_divisor"], p["swf_floor"])
+    boost = (0.0 if np.isnan(water) else water) * p["flood_boost_factor"]
+    flood = min(p["flood_w_rain"] * r + p["flood_w_land"] * lu + p["flood_w_gw"] * g_flood + boost, 100)
+    scarcity = (p["scarcity_w_rain"] * r + p["scarcity_w_gw"] * g + p["scarcity_w_land"] * lu) * swf
+    return flood, scarcity
+
+
+print("=== SCENARIO SWEEP REPORT ===")
+
+print("\n[Test 1] Baseline scenario")
+result = scenarios.sweep(df, scenarios.grid())
+current = scoring.score_columns(df)
+check(np.array_equal(result.flood[0], current["FloodRisk"]), "flood scores match scoring.py exactly")
+check(np.array_equal(result.scarcity[0], current["ScarcityRisk"]), "scarcity scores match scoring.py exactly")
+check(result.flood_changed[0] == 0 and result.scarcity_changed[0] == 0, "no level changes at the baseline")
+
+print("\n[Test 2] Random scenarios against a scalar reference")
+rng = np.random.default_rng(7)
+records = [{
+    "flood_w_rain": rng.uniform(0, 1), "flood_w_land": rng.uniform(0, 1), "flood_w_gw": rng.uniform(0, 1),
+    "scarcity_w_rain": rng.uniform(0, 1), "scarcity_w_gw": rng.uniform(0, 1),
+    "scarcity_w_land": rng.uniform(0, 1), "max_gw_change": rng.uniform(0.5, 6),
+    "swf_divisor": rng.uniform(10, 100), "swf_floor": rng.uniform(0, 0.5),
+    "flood_boost_factor": rng.uniform(0, 3), "low_cutoff": rng.uniform(10, 40),
+    "high_cutoff": rng.uniform(45, 80),
+} for _ in range(20)]
+result = scenarios.sweep(df, scenarios.from_records(records))
+worst = 0.0
+for s, params in enumerate(records):
+    for i, row in enumerate(df.itertuples(index=False)):
+        flood, scarcity = reference(row, params)
+        worst = max(worst, abs(flood - result.flood[s, i]), abs(scarcity - result.scarcity[s, i]))
+check(worst < 1e-9, f"20 scenarios x {len(df)} regions agree (max diff {worst:.1e})")
+expected = scoring.classify_codes(result.flood[3], records[3]["low_cutoff"], records[3]["high_cutoff"])
+check(np.array_equal(result.flood_levels[3], expected), "levels use each scenario's own cutoffs")
+changed = (result.scarcity_levels != result.baseline["scarcity_levels"]).sum(axis=1)
+check(np.array_equal(changed, result.scarcity_changed), "changed-region counts match the level tensors")
+
+print("\n[Test 3] Chunking and summaries")
+big = scenarios.grid(flood_w_rain=np.linspace(0.2, 0.6, 40), max_gw_change=np.linspace(1, 5, 25),
+                     high_cutoff=[50, 60, 70])
+whole = scenarios.sweep(df, big)
+chunked = scenarios.sweep(df, big, keep_scores=False, chunk_elements=500)
+check(np.array_equal(whole.flood_changed, chunked.flood_changed)
+      and np.allclose(whole.scarcity_flip_rate, chunked.scarcity_flip_rate),
+      "summaries do not depend on the chunk size")
+check(np.array_equal(whole.flood_max, whole.flood.max(axis=0)), "per-region maxima match the tensor")
+check(len(whole.summary()["flood_changed"]) == 3000, "summary has one row per scenario")
+
+try:
+    scenarios.grid(flood_weight=[1])
+    rejected = False
+except ValueError:
+    rejected = True
+check(rejected, "unknown parameter names are rejected")
+
+print("\n[Test 4] Throughput")
+sweep_grid = scenarios.grid(flood_w_rain=np.linspace(0.2, 0.6, 100), max_gw_change=np.linspace(1, 5, 100))
+start = time.perf_counter()
+scenarios.sweep(df, sweep_grid, keep_scores=False)
+elapsed = time.perf_counter() - start
+print(f"  10,000 scenarios x {len(df)} regions in {elapsed * 1000:.0f} ms")
+check(elapsed < 5, "10,000 scenarios sweep in seconds, not minutes")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -0,0 +1,294 @@
+"""CW-RAS Scoring Parity & Property Verification
+
+Differential harness for every scoring path. It generates synthetic rows
+that include the awkward cases (missing readings, zero R_normal, extreme
+groundwater swings, water bodies above 50%) and checks that these paths
+agree within --tolerance and classify identically, timing each one:
+
+    engine        scoring.score_columns (used by app.py, history.py, artifact.py)
+    sweep         scenarios.sweep with the default parameters
+    batch         CW_RAS.score_frame over the whole frame
+    streaming     CW_RAS.run_streaming through a CSV           (--io-rows)
+    parallel      CW_RAS.run_parallel with 2 workers           (--io-rows)
+    table         dataset.build_score_table (rounded to 2 dp)  (--sample)
+    scalar        app.py's per-value helpers, one row at a time (--sample)
+    reference     plain-Python formulas written out below       (--sample)
+
+The scalar and reference paths are compared on a random sample, and the
+CSV paths on the leading rows. The vectorized paths are compared on
+every row.
+
+    python "Secondary Files/test_scoring_parity.py"                  # 2M rows
+    python "Secondary Files/test_scoring_parity.py" --rows 10000000 --sample 100000
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+import CW_RAS  # noqa: E402
+import scenarios  # noqa: E402
+import scoring  # noqa: E402
+from dataset import build_score_table  # noqa: E402
+
+os.chdir(os.path.join(HERE, ".."))
+import app  # noqa: E402
+
+NUMERIC = ("R_score", "G_score", "G_Flood_Score", "L_score", "SWF", "FloodBoost", "FloodRisk", "ScarcityRisk")
+LEVEL_COLUMNS = ("FloodRiskLevel", "ScarcityRiskLevel")
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+# ---------- synthetic data ----------
+def synthetic(n, seed=0):
+    """n rows of master-dataset columns, edge cases included at fixed rates."""
+    rng = np.random.default_rng(seed)
+
+    def sprinkle(values, rate, fill):
+        mask = rng.random(n) < rate
+        values[mask] = fill if np.isscalar(fill) else fill[mask]
+        return values
+
+    r_normal = rng.uniform(500, 4000, n)
+    sprinkle(r_normal, 0.05, 0.0)                               # zero normal rainfall
+    sprinkle(r_normal, 0.01, rng.uniform(1e-6, 1e-3, n))        # vanishing normal
+    r_current = r_normal * rng.uniform(0, 3, n)
+    sprinkle(r_current, 0.02, 0.0)
+
+    gw_last = rng.uniform(0.5, 20, n)
+    gw_current = gw_last + rng.normal(0, 1.5, n)
+    sprinkle(gw_current, 0.05, gw_last + rng.choice([-1, 1], n) * rng.uniform(10, 200, n))   # extreme swings
+    sprinkle(gw_current, 0.02, gw_last)                         # no change
+    sprinkle(gw_current, 0.01, gw_last + 3.0)                   # exactly the reference change
+
+    urban = rng.uniform(0, 100, n)
+    forest = rng.uniform(0, 100 - urban)
+    sprinkle(urban, 0.02, 100.0)
+    sprinkle(forest, 0.02, 0.0)
+
+    water = np.where(rng.random(n) < 0.5, 0.0, rng.uniform(0, 100, n))   # often above 50
+    sprinkle(water, 0.02, 50.0)
+
+    columns = {
+        "Panchayat": np.arange(n).astype(str),
+        "R_normal": r_normal, "R_current": r_current,
+        "GW_last": gw_last, "GW_current": gw_current,
+        "Urban_Percent": urban, "Forest_Percent": forest,
+        "Water_Body_Percent": water,
+    }
+    for name in CW_RAS.INPUT_COLUMNS:                           # missing readings everywhere
+        sprinkle(columns[name], 0.02, np.nan)
+    return pd.DataFrame(columns)
+
+
+# ---------- independent reference ----------
+def _nan(x):
+    return x != x
+
+
+def reference_row(r_normal, r_current, gw_last, gw_current, urban, forest, water):
+    """The published formulas, one row at a time, in plain Python."""
+    if r_normal == 0:
+        r = 0.0
+    elif _nan(r_normal) or _nan(r_current):
+        r = math.nan
+    else:
+        r = min(abs(r_normal - r_current) / r_normal * 100, 100)
+
+    if _nan(gw_last) or _nan(gw_current):
+        g = g_flood = 0.0
+    else:
+        g = min(abs(gw_last - gw_current) / 3.0 * 100, 100)
+        g_flood = g if gw_current < gw_last else 0.0
+
+    urban = 0.0 if _nan(urban) else urban
+    forest = 0.0 if _nan(forest) else forest
+    lu = min(urban / 100 * 50 + (100 - forest) / 100 * 50, 100)
+
+    swf = 1.0 if _nan(water) or water <= 0 else max(1.0 - water / 50, 0.1)
+    boost = (0.0 if _nan(water) else water) * 1.2
+
+    flood = 0.4 * r + 0.4 * lu + 0.2 * g_flood + boost
+    flood = math.nan if _nan(flood) else min(flood, 100)
+    scarcity = (0.4 * r + 0.4 * g + 0.2 * lu) * swf
+
+    def level(score):
+        if score < 30:
+            return "Low"
+        if score < 60:
+            return "Moderate"
+        return "High"      # including NaN
+
+    return {"R_score": r, "G_score": g, "G_Flood_Score": g_flood, "L_score": lu, "SWF": swf,
+            "FloodBoost": boost, "FloodRisk": flood, "ScarcityRisk": scarcity,
+            "FloodRiskLevel": level(flood), "ScarcityRiskLevel": level(scarcity)}
+
+
+def scalar_row(r_normal, r_current, gw_last, gw_current, urban, forest, water):
+    """app.py's scalar helpers, composed the way a single-row caller would."""
+    r = app.normalize_rainfall(r_normal, r_current)
+    g = app.normalize_groundwater(gw_last, gw_current)
+    g_flood = float(scoring.groundwater_flood_score(gw_last, gw_current))
+    lu = app.normalize_landuse(urban, forest)
+    swf = app.compute_swf(water)
+    boost = float(scoring.flood_boost(water))
+    flood = float(scoring.flood_risk(r, lu, g_flood, boost))
+    scarcity = float(scoring.scarcity_risk(r, g, lu, swf))
+    return {"R_score": r, "G_score": g, "G_Flood_Score": g_flood, "L_score": lu, "SWF": swf,
+            "FloodBoost": boost, "FloodRisk": flood, "ScarcityRisk": scarcity,
+            "FloodRiskLevel": app.classify_level(flood), "ScarcityRiskLevel": app.classify_level(scarcity)}
+
+
+def per_row(fn, frame):
+    rows = [fn(*values) for values in zip(*(frame[c].tolist() for c in CW_RAS.INPUT_COLUMNS))]
+    return {column: np.array([row[column] for row in rows]) for column in (*NUMERIC, *LEVEL_COLUMNS)}
+
+
+# ---------- comparison ----------
+def compare(name, got, expected, tolerance, columns=NUMERIC, levels=LEVEL_COLUMNS):
+    """Count rows where got and expected disagree (NaN only matches NaN)."""
+    bad = 0
+    worst = 0.0
+    for column in columns:
+        a = np.asarray(got[column], dtype=float)
+        b = np.asarray(expected[column], dtype=float)
+        same_nan = np.isnan(a) == np.isnan(b)
+        diff = np.where(np.isnan(a) | np.isnan(b), 0.0, np.abs(a - b))
+        worst = max(worst, float(diff.max(initial=0.0)))
+        bad += int((~same_nan | (diff > tolerance)).sum())
+    for column in levels:
+        bad += int((np.asarray(got[column]) != np.asarray(expected[column])).sum())
+    check(bad == 0, f"{name}: {len(np.asarray(got[columns[0]])):,} rows, {bad} mismatches "
+                    f"(max diff {worst:.2e})")
+
+
+def timed(label, rows, fn, timings):
+    start = time.perf_counter()
+    result = fn()
+    timings.append((label, rows, time.perf_counter() - start))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--sample", type=int, default=20_000, help="rows for the per-row paths")
+    parser.add_argument("--io-rows", type=int, default=200_000, help="rows for the CSV paths")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("=== SCORING PARITY REPORT ===")
+    timings = []
+    frame = synthetic(args.rows, args.seed)
+    filled = CW_RAS.fill_missing(frame.copy())
+    sample = np.sort(np.random.default_rng(args.seed + 1).choice(args.rows, min(args.sample, args.rows),
+                                                                 replace=False))
+    rows = frame.iloc[sample].reset_index(drop=True)
+    print(f"{args.rows:,} synthetic rows, {len(sample):,} sampled for the per-row paths")
+
+    print("\n[Test 1] Vectorized paths on every row")
+    engine = timed("engine", args.rows, lambda: scoring.score_columns(frame), timings)
+    swept = timed("sweep", args.rows, lambda: scenarios.sweep(frame, scenarios.grid()), timings)
+    compare("sweep vs engine",
+            {"FloodRisk": swept.flood[0], "ScarcityRisk": swept.scarcity[0],
+             "FloodRiskLevel": swept.flood_levels[0], "ScarcityRiskLevel": swept.scarcity_levels[0]},
+            {**engine, "FloodRiskLevel": scoring.classify_codes(engine["FloodRisk"]),
+             "ScarcityRiskLevel": scoring.classify_codes(engine["ScarcityRisk"])},
+            args.tolerance, columns=("FloodRisk", "ScarcityRisk"))
+    batch = timed("batch", args.rows, lambda: CW_RAS.score_frame(filled), timings)
+    filled_engine = scoring.score_columns(filled)
+    compare("CW_RAS batch vs engine (filled inputs)", batch, filled_engine, args.tolerance,
+            columns=("R_score", "G_score", "L_score", "SWF", "FloodRisk", "ScarcityRisk"))
+
+    print("\n[Test 2] Per-row paths against the reference")
+    reference = timed("reference", len(rows), lambda: per_row(reference_row, rows), timings)
+    scalar = timed("scalar", len(rows), lambda: per_row(scalar_row, rows), timings)
+    compare("engine vs reference", {c: np.asarray(v)[sample] for c, v in engine.items()}, reference, args.tolerance)
+    compare("app scalar vs reference", scalar, reference, args.tolerance)
+
+    filled_rows = filled.iloc[sample].reset_index(drop=True)
+    compare("CW_RAS batch vs reference (filled inputs)",
+            {c: batch[c].to_numpy()[sample] for c in batch.columns}, per_row(reference_row, filled_rows),
+            args.tolerance, columns=("R_score", "G_score", "L_score", "SWF", "FloodRisk", "ScarcityRisk"))
+
+    table = timed("table", len(rows), lambda: build_score_table(rows), timings)
+    names = rows["Panchayat"].tolist()
+    table_scores = {
+        "FloodRisk": np.array([table[(name, "flood")]["score"] for name in names]),
+        "ScarcityRisk": np.array([table[(name, "scarcity")]["score"] for name in names]),
+        "FloodRiskLevel": np.array([table[(name, "flood")]["level"] for name in names]),
+        "ScarcityRiskLevel": np.array([table[(name, "scarcity")]["level"] for name in names]),
+    }
+    compare("score table vs reference (2 dp)", table_scores, reference, 0.005 + args.tolerance,
+            columns=("FloodRisk", "ScarcityRisk"))
+
+    print("\n[Test 3] CSV batch paths")
+    io_rows = min(args.io_rows, args.rows)
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, "input.csv")
+    frame.iloc[:io_rows].to_csv(source, index=False)
+    expected = {c: (v.to_numpy() if hasattr(v, "to_numpy") else v)[:io_rows] for c, v in batch.items()}
+    timed("streaming", io_rows, lambda: CW_RAS.run_streaming(source, os.path.join(directory, "stream.csv")),
+          timings)
+    compare("run_streaming vs batch", pd.read_csv(os.path.join(directory, "stream.csv")), expected,
+            args.tolerance, columns=("R_score", "G_score", "L_score", "SWF", "FloodRisk", "ScarcityRisk"))
+    parallel, _ = timed("parallel", io_rows,
+                        lambda: CW_RAS.run_parallel(source, os.path.join(directory, "parallel.csv"), workers=2),
+                        timings)
+    compare("run_parallel vs batch", parallel, expected, args.tolerance,
+            columns=("R_score", "G_score", "L_score", "SWF", "FloodRisk", "ScarcityRisk"))
+
+    print("\n[Test 4] Properties")
+    flood, scarcity = engine["FloodRisk"], engine["ScarcityRisk"]
+    for name, values in (("flood", flood), ("scarcity", scarcity)):
+        finite = values[~np.isnan(values)]
+        check(finite.min() >= 0 and finite.max() <= 100, f"{name} scores stay within [0, 100]")
+    check(np.array_equal(np.isnan(flood), np.isnan(engine["R_score"]))
+          and np.array_equal(np.isnan(scarcity), np.isnan(engine["R_score"])),
+          "only missing rainfall leaves a score undefined")
+    check(np.all(engine["FloodRiskLevel"][np.isnan(flood)] == "High"), "undefined scores classify as High")
+    check(np.all(engine["R_score"][frame["R_normal"].to_numpy() == 0] == 0), "zero R_normal scores 0 rainfall")
+    check(np.all(engine["G_Flood_Score"] <= engine["G_score"])
+          and np.all((engine["G_score"] >= 0) & (engine["G_score"] <= 100)),
+          "groundwater scores are bounded and the flood share never exceeds the magnitude")
+    swf = engine["SWF"]
+    check(np.all((swf >= 0.1) & (swf <= 1)), "SWF stays within [0.1, 1]")
+    above = frame["Water_Body_Percent"].to_numpy() > 50
+    check(np.all(engine["FloodRiskLevel"][above] == "High") and np.allclose(swf[above], 0.1),
+          f"water bodies above 50% are High flood and floor SWF ({int(above.sum()):,} rows)")
+    wetter = scoring.score_columns({**{c: frame[c].to_numpy() for c in CW_RAS.INPUT_COLUMNS},
+                                    "Water_Body_Percent": np.nan_to_num(frame["Water_Body_Percent"].to_numpy()) + 5})
+    defined = ~np.isnan(flood)
+    check(np.all(wetter["FloodRisk"][defined] >= flood[defined])
+          and np.all(wetter["ScarcityRisk"][defined] <= scarcity[defined] + args.tolerance),
+          "more surface water never lowers flood or raises scarcity risk")
+
+    print("\n[Timings]")
+    for label, n, seconds in timings:
+        print(f"  {label:<10} {n:>11,} rows {seconds:8.3f}s {n / max(seconds, 1e-9):>14,.0f} rows/s")
+
+    if all_pass:
+        print("\nALL TESTS PASSED ✅")
+    else:
+        print("\nSOME TESTS FAILED ❌")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""CW-RAS Spatial Index Verification"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import spatial  # noqa: E402
+from spatial import SpatialIndex, haversine_km  # noqa: E402
+
+rng = np.random.default_rng(5)
+TOLERANCE_KM = 1e-4
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+def agrees(index, lats, lons, q_lats, q_lons, k):
+    """query_many and query against a full haversine scan. With ties the
+    chosen points may differ, so compare distances and check that every
+    returned label really is at its reported distance."""
+    positions, km = index.query_many(q_lats, q_lons, k)
+    full = haversine_km(q_lats[:, None], q_lons[:, None], lats[None, :], lons[None, :])
+    full = np.where(np.isnan(full), np.inf, full)
+    expected = np.sort(full, axis=1)[:, :min(k, len(index))]
+    labels = np.asarray(index.labels)[positions]
+    actual = np.take_along_axis(full, labels, axis=1)
+    bulk_ok = (np.abs(km - expected).max() < TOLERANCE_KM and np.abs(actual - km).max() < TOLERANCE_KM
+               and all(len(set(row)) == len(row) for row in labels.tolist()))
+
+    single_ok = True
+    for i in rng.choice(len(q_lats), min(50, len(q_lats)), replace=False):
+        hits = index.query(q_lats[i], q_lons[i], k)
+        single_ok = single_ok and np.allclose([d for _, d in hits], expected[i], atol=TOLERANCE_KM)
+    return bulk_ok and single_ok
+
+
+print("=== SPATIAL INDEX REPORT ===")
+threshold = spatial.BRUTE_FORCE_MAX_POINTS
+
+print(f"\n[Test 1] Random points either side of the brute-force threshold ({threshold})")
+for n in (1, 7, threshold, threshold + 1, 3000):
+    lats, lons = rng.uniform(8.1, 12.8, n), rng.uniform(74.8, 77.5, n)
+    index = SpatialIndex(lats, lons)
+    q_lats, q_lons = rng.uniform(7.5, 13.5, 2000), rng.uniform(74, 78, 2000)
+    check(all(agrees(index, lats, lons, q_lats, q_lons, k) for k in (1, 4, 17)), f"{n} points, k = 1, 4, 17")
+q_lats, q_lons = lats[:200], lons[:200]
+positions, km = index.query_many(q_lats, q_lons, 1)
+check(np.array_equal(positions[:, 0], np.arange(200)) and km.max() < TOLERANCE_KM,
+      "each indexed point finds itself")
+
+print("\n[Test 2] Duplicates and ties")
+for n in (40, 2000):
+    lats = np.repeat(rng.uniform(9, 10, n // 20), 20)            # every location 20 times
+    lons = np.repeat(rng.uniform(76, 77, n // 20), 20)
+    index = SpatialIndex(lats, lons)
+    check(agrees(index, lats, lons, rng.uniform(9, 10, 500), rng.uniform(76, 77, 500), 25),
+          f"{n} points at {n // 20} repeated locations")
+
+side = 60                                                        # 0.01-degree lattice
+lats, lons = (v.ravel() for v in np.meshgrid(9 + np.arange(side) * 0.01, 76 + np.arange(side) * 0.01))
+for n in (threshold // 4, len(lats)):
+    index = SpatialIndex(lats[:n], lons[:n])
+    q_lats = 9 + (rng.integers(0, side - 1, 500) + 0.5) * 0.01   # cell centres: four-way ties
+    q_lons = 76 + (rng.integers(0, side - 1, 500) + 0.5) * 0.01
+    check(agrees(index, lats[:n], lons[:n], q_lats, q_lons, 4), f"{n} lattice points, queries on cell centres")
+
+print("\n[Test 3] Edge cases")
+lats, lons = rng.uniform(9, 10, 500), rng.uniform(76, 77, 500)
+lats[::7] = np.nan
+index = SpatialIndex(lats, lons)
+check(len(index) == 500 - len(lats[::7]) and agrees(index, lats, lons, rng.uniform(9, 10, 300), rng.uniform(76, 77, 300), 3),
+      "points with missing coordinates are left out")
+positions, km = index.query_many(np.array([np.nan, 9.5]), np.array([76.5, 76.5]), 2)
+check(np.isnan(km[0]).all() and not np.isnan(km[1]).any(), "a query with missing coordinates gets NaN distances")
+check(index.query_many([9.5], [76.5], 10_000)[0].shape == (1, len(index)), "k is capped at the index size")
+empty = SpatialIndex([], [])
+check(empty.query_many([9.5], [76.5], 3)[0].shape == (1, 0) and empty.nearest(9.5, 76.5) == (None, float("inf")),
+      "an empty index returns nothing")
+labelled = SpatialIndex([9.0, 9.5], [76.0, 76.5], ["a", "b"])
+check(labelled.nearest(9.4, 76.4)[0] == "b", "labels come back with hits")
+
+print("\n[Test 4] Bulk cost")
+lats, lons = rng.uniform(8.17, 12.8, 20000), rng.uniform(74.85, 77.42, 20000)
+index = SpatialIndex(lats, lons)
+grid_lats, grid_lons = (v.ravel() for v in np.meshgrid(np.linspace(8.17, 12.8, 516), np.linspace(74.85, 77.42, 282)))
+start = time.perf_counter()
+index.query_many(grid_lats, grid_lons, 8)
+elapsed = time.perf_counter() - start
+check(elapsed < 5, f"1 km Kerala grid against 20,000 points, k = 8, in {elapsed:.2f}s")
+
+print("\n[Test 5] Memory bound with many queries in one leaf")
+crowd_lats, crowd_lons = 9.5 + rng.normal(0, 1e-4, 5000), 76.5 + rng.normal(0, 1e-4, 5000)
+real_block, real_dist2 = spatial.BLOCK_ELEMENTS, spatial._dist2
+largest = []
+
+
+def recording_dist2(queries, points):
+    largest.append(len(queries) * len(points))
+    return real_dist2(queries, points)
+
+
+spatial.BLOCK_ELEMENTS, spatial._dist2 = 1 << 14, recording_dist2
+try:
+    crowd_ok = agrees(index, lats, lons, crowd_lats, crowd_lons, 8)
+finally:
+    spatial.BLOCK_ELEMENTS, spatial._dist2 = real_block, real_dist2
+check(crowd_ok, "queries piled into one leaf still get exact neighbours")
+check(max(largest) <= 1 << 14, f"no distance block exceeds BLOCK_ELEMENTS (largest {max(largest):,})")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
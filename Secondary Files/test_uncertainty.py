@@ -0,0 +1,84 @@
+"""CW-RAS Monte Carlo Uncertainty Verification"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import scoring  # noqa: E402
+import uncertainty  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+df = pd.read_csv(os.path.join(ROOT, "CW_RAS_master_dataset.csv"))
+current = scoring.score_columns(df)
+
+all_pass = True
+
+
+def check(condition, message):
+    global all_pass
+    print(("PASS: " if condition else "FAIL: ") + message)
+    all_pass = all_pass and condition
+
+
+print("=== UNCERTAINTY REPORT ===")
+
+print("\n[Test 1] Zero noise collapses to the deterministic score")
+silent = {name: (kind, 0.0) for name, (kind, _) in uncertainty.NOISE.items()}
+result = uncertainty.simulate(df, samples=50, noise=silent)
+check(np.allclose(result.flood_percentiles, current["FloodRisk"][:, None]), "flood bands have zero width")
+check(np.allclose(result.scarcity_mean, current["ScarcityRisk"]), "scarcity mean equals the score")
+codes = scoring.classify_codes(current["FloodRisk"])
+check(np.array_equal(result.flood_probabilities.argmax(axis=1), codes)
+      and np.all(result.flood_probabilities.max(axis=1) == 1), "the current level has probability 1")
+
+print("\n[Test 2] Default noise")
+start = time.perf_counter()
+result = uncertainty.simulate(df)
+elapsed = time.perf_counter() - start
+print(f"  {result.samples:,} samples x {len(df)} regions in {elapsed * 1000:.0f} ms")
+check(elapsed < 1.0, "10k samples for every region in under a second")
+check(np.allclose(result.flood_probabilities.sum(axis=1), 1)
+      and np.allclose(result.scarcity_probabilities.sum(axis=1), 1), "level probabilities sum to 1")
+check(np.all(np.diff(result.scarcity_percentiles, axis=1) >= 0), "percentiles are ordered")
+check(np.all(result.flood_percentiles[:, -1] <= 100), "flood stays capped at 100")
+again = uncertainty.simulate(df)
+check(np.array_equal(result.flood_percentiles, again.flood_percentiles), "a fixed seed reproduces the bands")
+chunked = uncertainty.simulate(df, samples=2000, chunk_elements=5000)
+check(chunked.flood_percentiles.shape == (len(df), 3), "region chunking covers every region")
+
+water = np.array([0.0, 0.0, 10.0, np.nan])
+drawn = uncertainty._perturb(np.random.default_rng(0), water, "Water_Body_Percent", (1000, 4),
+                             uncertainty.NOISE)
+check(np.all(drawn[:, :2] == 0) and drawn[:, 2].std() > 1 and np.all(np.isnan(drawn[:, 3])),
+      "only existing water bodies are perturbed")
+
+summary = result.for_region(0, "scarcity")
+check(summary["interval"] == [summary["percentiles"]["p5"], summary["percentiles"]["p95"]]
+      and set(summary["probabilities"]) == set(scoring.LEVELS), "JSON summary shape")
+
+print("\n[Test 3] Precomputed in the artifact")
+os.chdir(ROOT)
+from dataset import load_dataset  # noqa: E402
+
+data = load_dataset()
+check(data.uncertainty_ready, "a current artifact supplies the bands, so loading never simulates")
+start = time.perf_counter()
+band = data.uncertainty_for(data.panchayat_list[0], "flood")
+check(band is not None and time.perf_counter() - start < 0.01, "a lookup is a table read")
+check(band == result.for_region(list(df["Panchayat"]).index(data.panchayat_list[0]), "flood")
+      and np.allclose(data.uncertainty.scarcity_probabilities, result.scarcity_probabilities),
+      "the stored bands match a fresh simulation")
+
+csv_only = load_dataset(artifact_path=None)
+check(not csv_only.uncertainty_ready, "without an artifact the bands are not simulated on load")
+check(csv_only.uncertainty_for(data.panchayat_list[0], "flood") == band,
+      "they are simulated on first use, with the same seeded result")
+
+if all_pass:
+    print("\nALL TESTS PASSED ✅")
+else:
+    print("\nSOME TESTS FAILED ❌")
+    sys.exit(1)
@@ -1,112 +1,184 @@
-from flask import Flask, render_template, request
-import pandas as pd
-import numpy as np
-import requests
+from flask import (Flask, Response, g, jsonify, redirect, render_template, request,
+                   stream_with_context, url_for)
 import math
+import json
+import os
+import hmac
+import time
+
+import locate
+import metrics
+import ranking
+import scoring
+from geocoding import (NOMINATIM_URL, REQUEST_TIMEOUT, GeocodeCache, Geocoder, GeocodingError,
+                       Provider)
+from dataset import DatasetManager
+from history import HistoryStore
+from name_index import display_name
+from page_cache import PageCache
 
 app = Flask(__name__)
 
-# Load datasets
-risk_data = pd.read_csv("CW_RAS_master_dataset.csv")
-location_data = pd.read_csv("panchayat_locations.csv")
+# Load datasets (reloaded in the background when the CSVs change)
+datasets = DatasetManager(
+    "CW_RAS_master_dataset.csv",
+    "panchayat_locations.csv",
+    "panchayat_aliases.csv",
+    "cwras_dataset.bin",
+    check_interval=float(os.environ.get("CWRAS_RELOAD_INTERVAL", 30)),
+)
 
-panchayat_list = sorted(risk_data["Panchayat"].unique().tolist())
+# Monthly history (optional; empty until history.py has appended a month)
+history = HistoryStore(os.environ.get("CWRAS_HISTORY_DIR", "history"),
+                       refresh_interval=datasets.check_interval)
+DASHBOARD_HISTORY_MONTHS = 12
+
+
+def page_version(data):
+    """Dashboards depend on both the dataset and the history store."""
+    return f"{data.version}.{history.version}"
+
+
+def page_modified(data):
+    """Last-Modified for dashboards: the later of the inputs and the newest history month."""
+    return max(data.modified_at, history.modified_at or 0)
+
+
+# Rendered dashboards, one per (panchayat, risk type), dropped on every swap
+dashboard_pages = PageCache(page_version(datasets.current))
+datasets.on_swap(lambda data: dashboard_pages.invalidate(page_version(data)))
+DASHBOARD_MAX_AGE = int(os.environ.get("CWRAS_DASHBOARD_MAX_AGE", 60))
+
+# Optional sampling profiler: CWRAS_PROFILE_SLOW_MS=500 writes a collapsed-stack
+# profile to profiles/ for every request slower than 500 ms
+profiler = None
+if os.environ.get("CWRAS_PROFILE_SLOW_MS"):
+    profiler = metrics.SlowRequestProfiler(
+        os.environ.get("CWRAS_PROFILE_DIR", "profiles"),
+        threshold=float(os.environ["CWRAS_PROFILE_SLOW_MS"]) / 1000,
+    )
+
+metrics.registry.gauge("cwras_page_cache", "Dashboard page cache lookups by result.",
+                       lambda: {"hit": dashboard_pages.hits, "miss": dashboard_pages.misses},
+                       ("result",))
+metrics.registry.gauge("cwras_geocode_cache", "Geocode cache lookups by result.",
+                       lambda: {"hit": geocode_cache.hits, "miss": geocode_cache.misses},
+                       ("result",))
+metrics.registry.gauge("cwras_geocode_circuit_open", "1 while the geocoder circuit breaker is open.",
+                       lambda: int(geocoder.breaker.state != "closed"))
+metrics.registry.gauge("cwras_dataset_panchayats", "Panchayats in the live dataset.",
+                       lambda: len(datasets.current.panchayat_list))
 
 
 def classify_level(score):
-    if score < 30:
-        return "Low"
-    elif score < 60:
-        return "Moderate"
-    else:
-        return "High"
+    return scoring.classify(score).item()
 
 
 def normalize_rainfall(r_normal, r_current):
     """Rainfall deviation normalized to 0-100, capped at 100."""
-    if r_normal == 0:
-        return 0
-    dev = abs(r_normal - r_current) / r_normal * 100
-    return min(dev, 100)
+    return float(scoring.rainfall_score(r_normal, r_current))
 
 
 def normalize_groundwater(gw_last, gw_current):
     """Groundwater change normalized to 0-100 using 3m reference max."""
-    MAX_GW_CHANGE = 3.0
-    if pd.isna(gw_last) or pd.isna(gw_current):
-        return 0
-    change = abs(gw_last - gw_current)
-    score = (change / MAX_GW_CHANGE) * 100
-    return min(score, 100)
+    return float(scoring.groundwater_score(gw_last, gw_current))
 
 
 def normalize_landuse(urban_pct, forest_pct):
     """Land-use score normalized to 0-100. Higher = more runoff-prone."""
-    urban_component = (urban_pct / 100) * 50
-    forest_deficit = ((100 - forest_pct) / 100) * 50
-    return min(urban_component + forest_deficit, 100)
+    return float(scoring.landuse_score(urban_pct, forest_pct))
 
 
 def compute_swf(water_body_pct):
     """Surface Water Factor: moderates scarcity for lake-adjacent areas.
     SWF = max(1.0 - (Water_Body_Percent / 50), 0.1)
     Range: [0.1, 1.0]."""
-    if pd.isna(water_body_pct) or water_body_pct <= 0:
-        return 1.0
-    return max(1.0 - (water_body_pct / 50), 0.1)
+    return float(scoring.surface_water_factor(water_body_pct))
 
 
 # ---------- OSM Geocoding ----------
+geocode_cache = GeocodeCache("cache")
+geocoder = Geocoder(
+    Provider(
+        os.environ.get("CWRAS_GEOCODER_URL", NOMINATIM_URL),
+        rate=float(os.environ.get("CWRAS_GEOCODER_RATE", 1)),  # Nominatim usage policy
+        name="nominatim",
+        user_agent="CW-RAS-App",
+        timeout=REQUEST_TIMEOUT,
+    ),
+    cache=geocode_cache,
+)
+GEOCODER_UNAVAILABLE = "The location service is busy. Please try the panchayat's name instead."
+
+
 def get_lat_long(place_name):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": place_name,
-        "format": "json",
-        "limit": 1
-    }
-    headers = {
-        "User-Agent": "CW-RAS-App"
-    }
+    """(lat, lon) for a free-text place, or (None, None) if it does not exist.
+    Raises GeocodingError when the geocoder cannot answer right now. The
+    geocoder checks geocode_cache before going upstream."""
+    try:
+        return geocoder.lookup(place_name)
+    except GeocodingError:
+        metrics.geocode_failures.inc()
+        raise
 
-    response = requests.get(url, params=params, headers=headers)
-    data = response.json()
 
-    if len(data) == 0:
-        return None, None
+# ---------- Nearest Panchayat ----------
+def find_nearest_panchayat(lat, lon, data=None):
+    data = data or datasets.current
+    nearest_panchayat, _distance_km = data.location_index.nearest(lat, lon)
+    return nearest_panchayat
 
-    return float(data[0]["lat"]), float(data[0]["lon"])
 
+@app.before_request
+def check_dataset():
+    datasets.check()
+    if history.refresh():
+        dashboard_pages.invalidate(page_version(datasets.current))
 
-# ---------- Haversine Distance ----------
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Earth radius in km
 
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    if profiler is not None:
+        profiler.begin(request.endpoint or "unknown")
 
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
 
-    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-    c = 2 * math.asin(math.sqrt(a))
+@app.teardown_request
+def record_request(_exc=None):
+    start = g.pop("request_start", None)
+    if start is not None:
+        metrics.request_seconds.observe(time.perf_counter() - start,
+                                        endpoint=request.endpoint or "unknown")
+    if profiler is not None:
+        profiler.end()
 
-    return R * c
 
+@app.after_request
+def add_dataset_version(response):
+    response.headers["X-Dataset-Version"] = datasets.version
+    return response
 
-# ---------- Nearest Panchayat ----------
-def find_nearest_panchayat(lat, lon):
-    min_distance = float("inf")
-    nearest_panchayat = None
 
-    for _, row in location_data.iterrows():
-        dist = haversine_distance(
-            lat, lon,
-            row["Latitude"],
-            row["Longitude"]
-        )
+def resolve_panchayat(data, user_place):
+    """Canonical panchayat for a typed place name, or None if it cannot be located."""
+    # --- STEP 1: Resolve the name locally (exact, alias, prefix or fuzzy) ---
+    with metrics.stage("name_match"):
+        nearest_panchayat = data.name_index.lookup(user_place)
 
-        if dist < min_distance:
-            min_distance = dist
-            nearest_panchayat = row["Panchayat"]
+    if nearest_panchayat is None:
+        # --- STEP 2: Fall back to geocoding + Haversine ---
+        with metrics.stage("geocode"):
+            lat, lon = get_lat_long(user_place)
+
+        if lat is None or lon is None:
+            metrics.resolutions.inc(method="not_found")
+            return None
+
+        with metrics.stage("nearest"):
+            nearest_panchayat = find_nearest_panchayat(lat, lon, data)
+        metrics.resolutions.inc(method="geocode")
+    else:
+        metrics.resolutions.inc(method="name_match")
 
     return nearest_panchayat
 
@@ -121,139 +193,373 @@ def index():
     user_place = request.form["panchayat"]
     risk_type = request.form["risk_type"]
 
-    # --- STEP 1: Try exact name match (case-insensitive) ---
-    name_lower = user_place.strip().lower()
-    exact_match = risk_data[risk_data["Panchayat"].str.lower().str.strip("* ") == name_lower]
-    if exact_match.empty:
-        # Also try with asterisk-stripped names
-        exact_match = risk_data[risk_data["Panchayat"].str.replace("*", "", regex=False).str.lower().str.strip() == name_lower]
-
-    if not exact_match.empty:
-        nearest_panchayat = exact_match.iloc[0]["Panchayat"]
-    else:
-        # --- STEP 2: Fall back to geocoding + Haversine ---
-        lat, lon = get_lat_long(user_place)
-
-        if lat is None or lon is None:
-            return render_template("index.html", error="Location not found. Please try another name.")
-
-        nearest_panchayat = find_nearest_panchayat(lat, lon)
-
-    row = risk_data[risk_data["Panchayat"] == nearest_panchayat].iloc[0]
-
-    # ----- NORMALIZE COMPONENTS (all 0-100) -----
-    rain_score = normalize_rainfall(row["R_normal"], row["R_current"])
-
-    rainfall_normal = round(row["R_normal"], 2)
-    rainfall_current = round(row["R_current"], 2)
-    rainfall_deviation = round(rain_score, 2)
-
-    # ----- GROUNDWATER -----
-    gw_score = normalize_groundwater(row["GW_last"], row["GW_current"])
-
-    gw_last = round(row["GW_last"], 2) if pd.notna(row["GW_last"]) else None
-    gw_current = round(row["GW_current"], 2) if pd.notna(row["GW_current"]) else None
-    gw_change = round(abs(gw_last - gw_current), 2) if gw_last is not None and gw_current is not None else None
-
-    # ----- LAND USE -----
-    urban = row["Urban_Percent"] if pd.notna(row["Urban_Percent"]) else 0
-    forest = row["Forest_Percent"] if pd.notna(row["Forest_Percent"]) else 0
-    lu_score = normalize_landuse(urban, forest)
-
-    urban_percent = round(urban, 2)
-    forest_percent = round(forest, 2)
-
-    if urban_percent >= 50:
-        landuse_type = "Urban-dominant"
-    elif urban_percent >= 25:
-        landuse_type = "Semi-urban"
-    else:
-        landuse_type = "Rural / Forest-dominant"
-
-    # ----- SURFACE WATER FACTORS -----
-    water_body_pct = row["Water_Body_Percent"] if "Water_Body_Percent" in row.index else 0
-    swf = compute_swf(water_body_pct)  # For Scarcity
-    flood_boost = water_body_pct * 1.2  # For Flood
-
-    # ----- WEIGHTED SCORING -----
-    if risk_type == "flood":
-        # Flood: Only rising GW contributes (GW_current < GW_last means rise in water level / decrease in depth)
-        # Note: Datasets usually use mbgl (meters below ground level).
-        # gw_rise_score is calculated based on direction check.
-        # However, normalize_groundwater uses abs diff. We need direction.
-
-        is_rising = False
-        if pd.notna(gw_last) and pd.notna(gw_current):
-            # If current depth < last depth => Water level ROSE
-            if gw_current < gw_last:
-                is_rising = True
-
-        gw_flood_score = gw_score if is_rising else 0
-
-        rainfall_impact = 0.4 * rain_score
-        landuse_impact = 0.4 * lu_score
-        groundwater_impact = 0.2 * gw_flood_score
-        
-        base_score = rainfall_impact + landuse_impact + groundwater_impact
-        score = min(base_score + flood_boost, 100)
-        risk_label = "Flood Risk"
-
+    data = datasets.current
+    try:
+        nearest_panchayat = resolve_panchayat(data, user_place)
+    except GeocodingError:
+        return render_template("index.html", error=GEOCODER_UNAVAILABLE), 503
+    if nearest_panchayat is None:
+        return render_template("index.html", error="Location not found. Please try another name.")
+
+    return dashboard_response(data, nearest_panchayat, risk_type)
+
+
+@app.route("/dashboard/<risk_type>/<path:panchayat>")
+def dashboard(risk_type, panchayat):
+    """Cacheable GET form of the dashboard. Non-canonical names redirect to
+    the canonical URL so each page is cached under one address."""
+    if risk_type not in API_RISK_TYPES:
+        return render_template("index.html", error="Unknown risk type."), 404
+
+    data = datasets.current
+    try:
+        nearest_panchayat = resolve_panchayat(data, panchayat)
+    except GeocodingError:
+        return render_template("index.html", error=GEOCODER_UNAVAILABLE), 503
+    if nearest_panchayat is None:
+        return render_template("index.html", error="Location not found. Please try another name."), 404
+    if nearest_panchayat != panchayat:
+        return redirect(url_for("dashboard", risk_type=risk_type, panchayat=nearest_panchayat))
+
+    return dashboard_response(data, nearest_panchayat, risk_type)
+
+
+def dashboard_response(data, panchayat, risk_type):
+    """Dashboard for a canonical panchayat, rendered once per dataset version.
+
+    The canonical key (markers included) is only used for the cache key and
+    the GET URL; the page shows its display_name.
+
+    GET responses are public and carry ETag / Last-Modified, so browsers and
+    proxies revalidate with a 304 instead of downloading the page again.
+    """
+    risk_type = "flood" if risk_type == "flood" else "scarcity"
+
+    # ----- LOOK UP PRECOMPUTED SCORES -----
+    def render():
+        with metrics.stage("score"):
+            scored = data.score_table[(panchayat, risk_type)]
+            trend = history.trend(panchayat)
+            recent = [
+                {"period": period, "score": score, "level": level}
+                for period, score, level in zip(trend["periods"], trend[risk_type],
+                                                trend[f"{risk_type}_level"])
+            ][-DASHBOARD_HISTORY_MONTHS:]
+        with metrics.stage("render"):
+            shown = display_name(panchayat)
+            return render_template(
+                "dashboard.html",
+                data={"panchayat": shown, **scored,
+                      "uncertainty": data.uncertainty_for(panchayat, risk_type),
+                      "history": recent},
+                selected_panchayat=shown,
+                selected_risk=risk_type
+            )
+
+    page = dashboard_pages.get_or_render(panchayat, risk_type, page_version(data), render,
+                                         page_modified(data))
+    response = Response(page.body, mimetype="text/html")
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    response.headers["Content-Location"] = url_for("dashboard", risk_type=risk_type,
+                                                   panchayat=panchayat)
+    if request.method in ("GET", "HEAD"):
+        response.cache_control.public = True
+        response.cache_control.max_age = DASHBOARD_MAX_AGE
+    return response.make_conditional(request)
+
+
+# ---------- JSON BATCH SCORING API ----------
+API_RISK_TYPES = ("flood", "scarcity")
+API_MAX_BATCH = 10000
+
+API_FIELDS = (
+    "score", "level",
+    "rainfall_score", "groundwater_score", "landuse_score",
+    "rainfall", "groundwater", "landuse",
+    "swf", "flood_boost",
+)
+
+
+def _api_error(message, status=400):
+    return jsonify({"error": message}), status
+
+
+def _coordinates(point):
+    """(lat, lon) floats from [lat, lon] or {"lat": .., "lon": ..}, else None."""
+    if isinstance(point, dict):
+        point = (point.get("lat"), point.get("lon"))
+    if not isinstance(point, (list, tuple)) or len(point) != 2:
+        return None
+    try:
+        lat, lon = float(point[0]), float(point[1])
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):      # also rejects NaN
+        return None
+    return lat, lon
+
+
+def _assess(data, query, risk_types, with_uncertainty=False):
+    """Resolve one batch item and return its JSON-ready result."""
+    if isinstance(query, str):
+        query = {"panchayat": query}
+    if not isinstance(query, dict):
+        return {"query": query, "error": "Each query must be a name or an object."}
+
+    result = {"query": query}
+    if query.get("lat") is not None and query.get("lon") is not None:
+        coordinates = _coordinates(query)
+        if coordinates is None:
+            return {**result, "error": "lat and lon must be valid coordinates."}
+        panchayat, distance_km = data.location_index.nearest(*coordinates)
+        result["distance_km"] = round(distance_km, 3)
+    elif query.get("panchayat"):
+        try:
+            panchayat = resolve_panchayat(data, str(query["panchayat"]))
+        except GeocodingError:
+            return {**result, "error": "Geocoding is unavailable; retry later or use lat/lon."}
     else:
-        # Scarcity: Absolute fluctuation contributes (instability)
-        rainfall_impact = 0.4 * rain_score
-        groundwater_impact = 0.4 * gw_score
-        landuse_impact = 0.2 * lu_score
-        
-        raw_score = rainfall_impact + groundwater_impact + landuse_impact
-        score = raw_score * swf
-        risk_label = "Water Scarcity Risk"
-
-    rainfall = round(rainfall_impact, 2)
-    groundwater = round(groundwater_impact, 2)
-    landuse = round(landuse_impact, 2)
-
-    level = classify_level(score)
-
-    if rainfall >= groundwater and rainfall >= landuse:
-        explanation = "Rainfall variation is the dominant factor influencing the assessed risk in this region."
-    elif groundwater >= landuse:
-        explanation = "Groundwater level fluctuation significantly contributes to the assessed risk in this region."
+        return {**result, "error": "Provide a panchayat name or lat/lon."}
+
+    if panchayat is None or (panchayat, risk_types[0]) not in data.score_table:
+        return {**result, "error": "Location not found."}
+
+    result["panchayat"] = panchayat
+    for risk_type in risk_types:
+        scored = data.score_table[(panchayat, risk_type)]
+        result[risk_type] = {field: scored[field] for field in API_FIELDS}
+        if with_uncertainty:
+            result[risk_type]["uncertainty"] = data.uncertainty_for(panchayat, risk_type)
+    return result
+
+
+@app.route("/api/scores", methods=["POST"])
+def api_scores():
+    """Score a batch of panchayat names and/or coordinates.
+
+    Body: {"queries": ["Kollam", {"lat": 8.9, "lon": 76.6}, ...],
+           "risk_types": ["flood", "scarcity"],   (optional)
+           "uncertainty": true}                   (optional: Monte Carlo bands)
+
+    Results are streamed in input order as {"results": [...]}, or as one JSON
+    object per line with ?format=ndjson.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get("queries"), list):
+        return _api_error('Expected a JSON object with a "queries" list.')
+
+    queries = body["queries"]
+    if len(queries) > API_MAX_BATCH:
+        return _api_error(f"At most {API_MAX_BATCH} queries per request.", 413)
+
+    risk_types = body.get("risk_types", list(API_RISK_TYPES))
+    if isinstance(risk_types, str):
+        risk_types = [risk_types]
+    if not risk_types or any(r not in API_RISK_TYPES for r in risk_types):
+        return _api_error(f"risk_types must be drawn from {list(API_RISK_TYPES)}.")
+    risk_types = list(dict.fromkeys(risk_types))
+    with_uncertainty = bool(body.get("uncertainty"))
+    data = datasets.current
+
+    if request.args.get("format") == "ndjson":
+        def generate():
+            for query in queries:
+                yield json.dumps(_assess(data, query, risk_types, with_uncertainty)) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    def generate():
+        yield '{"results": ['
+        for i, query in enumerate(queries):
+            yield ("," if i else "") + json.dumps(_assess(data, query, risk_types, with_uncertainty))
+        yield "]}"
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+# ---------- RANKINGS ----------
+API_MAX_PAGE = 1000
+
+
+def _float_arg(name):
+    """Optional finite float query parameter; ValueError for anything else."""
+    value = request.args.get(name)
+    if value in (None, ""):
+        return None
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite")
+    return number
+
+
+@app.route("/api/rankings/<risk_type>")
+def api_rankings(risk_type):
+    """Panchayats ranked by one risk score, highest first.
+
+    Query (all optional): min / max score bounds (inclusive), level
+    (Low|Moderate|High), landuse (urban|semi-urban|rural), limit (default
+    20) and offset. Top 20 for flood: /api/rankings/flood; everything above
+    60 for scarcity: /api/rankings/scarcity?min=60&limit=1000.
+    """
+    if risk_type not in API_RISK_TYPES:
+        return _api_error(f"risk_type must be one of {list(API_RISK_TYPES)}.", 404)
+    try:
+        min_score, max_score = _float_arg("min"), _float_arg("max")
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return _api_error("min/max must be finite numbers and limit/offset integers.")
+    if not 0 < limit <= API_MAX_PAGE or offset < 0:
+        return _api_error(f"limit must be 1-{API_MAX_PAGE} and offset non-negative.")
+
+    level = request.args.get("level")
+    if level is not None:
+        level = level.capitalize()
+        if level not in scoring.LEVELS:
+            return _api_error(f"level must be one of {list(scoring.LEVELS)}.")
+    landuse = request.args.get("landuse")
+    if landuse:
+        landuse = ranking.landuse_type(landuse)
+        if landuse is None:
+            return _api_error("landuse must be urban, semi-urban or rural.")
+
+    data = datasets.current
+    total, results = data.ranking.query(risk_type, landuse, level, min_score, max_score,
+                                        offset, limit)
+    response = jsonify({
+        "risk_type": risk_type,
+        "dataset_version": data.version,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < total else None,
+        "results": results,
+    })
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# ---------- RISK HISTORY ----------
+@app.route("/api/history/<path:panchayat>")
+def api_history(panchayat):
+    """Monthly scores of one panchayat, oldest first.
+
+    Query: ?from=2023-01&to=2024-06 (inclusive, optional) and
+    ?risk_type=flood|scarcity to return only one of the two series.
+    """
+    risk_type = request.args.get("risk_type")
+    if risk_type is not None and risk_type not in API_RISK_TYPES:
+        return _api_error(f"risk_type must be one of {list(API_RISK_TYPES)}.")
+
+    data = datasets.current
+    try:
+        resolved = resolve_panchayat(data, panchayat)
+    except GeocodingError:
+        return _api_error("Geocoding is unavailable; use the panchayat's name.", 503)
+    if resolved is None:
+        return _api_error("Location not found.", 404)
+
+    trend = history.trend(resolved, request.args.get("from"), request.args.get("to"))
+    if risk_type is not None:
+        trend = {"periods": trend["periods"], "scores": trend[risk_type],
+                 "levels": trend[f"{risk_type}_level"]}
+    return jsonify({"panchayat": resolved, "history_version": history.version, **trend})
+
+
+# ---------- COORDINATE LOOKUP ----------
+LOCATE_MAX_K = 16
+
+
+@app.route("/api/locate", methods=["GET", "POST"])
+def api_locate():
+    """Scores at GPS coordinates, blended from the nearest panchayats; no geocoding.
+
+    GET /api/locate?lat=8.89&lon=76.61 scores one point. POST
+    {"points": [[8.89, 76.61], {"lat": 9.1, "lon": 76.5}, ...]} scores up to
+    API_MAX_BATCH points in one vectorized pass. Optional (query string or
+    body): k nearest panchayats to blend (default 4), power (default 2),
+    max_km (default 25) and risk_types. Each result lists the contributing
+    panchayats with their distance and weight.
+    """
+    body = request.get_json(silent=True) if request.method == "POST" else None
+    if request.method == "POST":
+        if not isinstance(body, dict) or not isinstance(body.get("points"), list):
+            return _api_error('Expected a JSON object with a "points" list.')
+        points = body["points"]
     else:
-        explanation = "Land-use characteristics such as urbanization influence the assessed risk in this region."
-
-    dashboard_data = {
-        "panchayat": user_place,
-        "risk_type": risk_label,
-        "score": round(score, 2),
-        "level": level,
-        "rainfall": rainfall,
-        "groundwater": groundwater,
-        "landuse": landuse,
-        "explanation": explanation,
-
-        "rainfall_normal": rainfall_normal,
-        "rainfall_current": rainfall_current,
-        "rainfall_deviation": rainfall_deviation,
-
-        "gw_last": gw_last,
-        "gw_current": gw_current,
-        "gw_change": gw_change,
-
-        "urban_percent": urban_percent,
-        "forest_percent": forest_percent,
-        "landuse_type": landuse_type,
-
-        "water_body_pct": round(water_body_pct, 1) if water_body_pct else 0,
-        "swf": round(swf, 2),
-        "flood_boost": round(flood_boost, 1)
-    }
-
-    return render_template(
-        "dashboard.html",
-        data=dashboard_data,
-        selected_panchayat=user_place,
-        selected_risk=risk_type
-    )
+        body = {}
+        points = [(request.args.get("lat"), request.args.get("lon"))]
+    if len(points) > API_MAX_BATCH:
+        return _api_error(f"At most {API_MAX_BATCH} points per request.", 413)
+
+    options = {**request.args, **body}
+    try:
+        k = int(options.get("k", locate.DEFAULT_NEIGHBOURS))
+        power = float(options.get("power", locate.DEFAULT_POWER))
+        max_km = float(options.get("max_km", locate.DEFAULT_MAX_KM))
+    except (TypeError, ValueError):
+        return _api_error("k must be an integer and power/max_km numbers.")
+    if not 0 < k <= LOCATE_MAX_K or power < 0 or not max_km > 0:
+        return _api_error(f"k must be 1-{LOCATE_MAX_K}, power non-negative and max_km positive.")
+
+    risk_types = options.get("risk_types", list(API_RISK_TYPES))
+    if isinstance(risk_types, str):
+        risk_types = risk_types.split(",")
+    if not risk_types or any(r not in API_RISK_TYPES for r in risk_types):
+        return _api_error(f"risk_types must be drawn from {list(API_RISK_TYPES)}.")
+
+    parsed = [_coordinates(point) for point in points]
+    valid = [i for i, point in enumerate(parsed) if point is not None]
+    if request.method == "GET" and not valid:
+        return _api_error("lat and lon must be valid coordinates.")
+
+    data = datasets.current
+    results = [{"point": point, "error": "Each point must be [lat, lon] or {lat, lon}."} for point in points]
+    if valid:
+        lats, lons = zip(*(parsed[i] for i in valid))
+        blended = data.locator.blend(lats, lons, k, power, max_km, list(dict.fromkeys(risk_types)))
+        for i, result in zip(valid, blended.results()):
+            results[i] = result
+
+    return jsonify({
+        "dataset_version": data.version,
+        "k": k,
+        "power": power,
+        "max_km": max_km,
+        "results": results,
+    })
+
+
+# ---------- DATASET VERSION / RELOAD ----------
+@app.route("/api/dataset")
+def dataset_info():
+    data = datasets.current
+    return jsonify({
+        "version": data.version,
+        "loaded_at": data.loaded_at,
+        "panchayats": len(data.panchayat_list),
+        "last_reload_error": datasets.last_error,
+    })
+
+
+@app.route("/admin/reload", methods=["POST"])
+def reload_dataset():
+    """Force a synchronous reload. Disabled unless CWRAS_RELOAD_TOKEN is set;
+    callers send it in the X-Reload-Token header."""
+    token = os.environ.get("CWRAS_RELOAD_TOKEN")
+    if not token or not hmac.compare_digest(request.headers.get("X-Reload-Token", ""), token):
+        return _api_error("Forbidden.", 403)
+    swapped = datasets.reload(force=True)
+    return jsonify({
+        "version": datasets.version,
+        "swapped": swapped,
+        "error": datasets.last_error,
+    })
+
+
+# ---------- METRICS ----------
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
 
 
 # ---------- ABOUT PAGE ----------
@@ -0,0 +1,203 @@
+"""Compiled dataset artifact for fast cold starts.
+
+`python artifact.py` compiles the master dataset, the panchayat locations,
+their precomputed scores and Monte Carlo score bands into one binary file (cwras_dataset.bin by default).
+Run it whenever the CSVs change, before deploying. At startup the app
+memory-maps the file and wraps each column with np.frombuffer, so nothing is
+parsed or copied and pandas is never imported.
+
+Layout (little-endian):
+
+    8 bytes   magic  b"CWRASDS\\0"
+    4 bytes   format version (uint32)
+    4 bytes   header length in bytes (uint32)
+    header    UTF-8 JSON: source_version, built_at, string columns, the
+              uncertainty sample count and percentiles, and for every
+              numeric column its dtype, byte offset, length and (for the
+              2-D uncertainty bands) shape
+    columns   raw column data, each starting on a 64-byte boundary
+
+source_version is the content hash of the CSVs the artifact was built from
+and scoring_version the hash of scoring.py and uncertainty.py that computed
+its scores and bands. If
+either differs from the running code's, the artifact is stale: it is
+ignored and the CSVs are loaded instead.
+
+The file is written beside the target and renamed over it, so workers that
+still have the old artifact mapped keep reading the old, intact file.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+import scoring
+import uncertainty
+
+MAGIC = b"CWRASDS\0"
+FORMAT_VERSION = 3
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+RISK_COLUMNS = (
+    "R_normal", "R_current", "GW_last", "GW_current",
+    "Urban_Percent", "Forest_Percent", "Water_Body_Percent",
+)
+LOCATION_COLUMNS = ("Latitude", "Longitude")
+LEVEL_COLUMNS = {"FloodRiskLevel": "FloodRisk", "ScarcityRiskLevel": "ScarcityRisk"}
+NUMERIC_SCORE_COLUMNS = tuple(c for c in scoring.SCORE_COLUMNS if c not in LEVEL_COLUMNS)
+
+
+def _scoring_version():
+    digest = hashlib.sha1()
+    for module in (scoring, uncertainty):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+SCORING_VERSION = _scoring_version()
+
+
+class CompiledDataset:
+    """Columns read back from an artifact, as dicts of (memory-mapped) arrays,
+    plus the score bands as an uncertainty.UncertaintyResult."""
+
+    def __init__(self, source_version, built_at, risk, locations, scores, scoring_version=None,
+                 uncertainty=None):
+        self.source_version = source_version
+        self.scoring_version = scoring_version
+        self.built_at = built_at
+        self.risk = risk
+        self.locations = locations
+        self.scores = scores
+        self.uncertainty = uncertainty
+
+    def is_current(self, source_version):
+        """True if built from these inputs by the scoring code running now."""
+        return self.source_version == source_version and self.scoring_version == SCORING_VERSION
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_artifact(path, risk, locations, source_version):
+    """Compile risk / locations (DataFrames or dicts of arrays) into path."""
+    risk_names = [str(name) for name in risk["Panchayat"]]
+    arrays = {f"risk.{c}": np.asarray(risk[c], dtype="<f8") if c in risk else np.zeros(len(risk_names))
+              for c in RISK_COLUMNS}
+    arrays.update({f"locations.{c}": np.asarray(locations[c], dtype="<f8") for c in LOCATION_COLUMNS})
+
+    scores = scoring.score_columns({c: arrays[f"risk.{c}"] for c in RISK_COLUMNS})
+    arrays.update({f"scores.{c}": np.asarray(scores[c], dtype="<f8") for c in NUMERIC_SCORE_COLUMNS})
+    arrays.update({f"scores.{c}": scoring.classify_codes(scores[source])
+                   for c, source in LEVEL_COLUMNS.items()})
+
+    bands = uncertainty.simulate({"Panchayat": risk_names,
+                                  **{c: arrays[f"risk.{c}"] for c in RISK_COLUMNS}})
+    arrays.update({f"uncertainty.{name}": np.asarray(getattr(bands, name), dtype="<f8")
+                   for name in uncertainty.UncertaintyResult.ARRAYS})
+
+    columns, offset = {}, 0
+    for name, values in arrays.items():
+        offset = _align(offset)
+        columns[name] = {"dtype": values.dtype.str, "offset": offset, "length": values.size}
+        if values.ndim > 1:
+            columns[name]["shape"] = list(values.shape)
+        offset += values.nbytes
+
+    header = {
+        "source_version": source_version,
+        "scoring_version": SCORING_VERSION,
+        "built_at": time.time(),
+        "strings": {
+            "risk.Panchayat": risk_names,
+            "locations.Panchayat": [str(name) for name in locations["Panchayat"]],
+        },
+        "uncertainty": {"samples": bands.samples, "percentiles": list(bands.percentiles)},
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    # Never rewrite the live file: running workers have it memory-mapped
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, values in arrays.items():
+                f.seek(data_start + columns[name]["offset"])
+                f.write(np.ascontiguousarray(values).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_artifact(path):
+    """Memory-map an artifact. Raises ValueError for a file that is not one."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < _PREAMBLE.size:
+        raise ValueError(f"{path}: truncated dataset artifact")
+    magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path}: not a version {FORMAT_VERSION} CW-RAS dataset artifact")
+    header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    groups = {"risk": {}, "locations": {}, "scores": {}, "uncertainty": {}}
+    for name, spec in header["columns"].items():
+        group, column = name.split(".", 1)
+        values = np.frombuffer(
+            buffer, dtype=spec["dtype"], count=spec["length"], offset=data_start + spec["offset"]
+        )
+        groups[group][column] = values.reshape(spec["shape"]) if "shape" in spec else values
+    for name, values in header["strings"].items():
+        group, column = name.split(".", 1)
+        groups[group][column] = values
+
+    levels = np.array(scoring.LEVELS, dtype=object)
+    for column in LEVEL_COLUMNS:
+        groups["scores"][column] = levels[groups["scores"][column]]
+
+    bands = header["uncertainty"]
+    return CompiledDataset(header["source_version"], header["built_at"],
+                           groups["risk"], groups["locations"], groups["scores"],
+                           header.get("scoring_version"),
+                           uncertainty.UncertaintyResult(groups["risk"]["Panchayat"], bands["samples"],
+                                                         bands["percentiles"], groups["uncertainty"]))
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from dataset import ALIASES_CSV, ARTIFACT, LOCATIONS_CSV, RISK_CSV, file_version
+
+    parser = argparse.ArgumentParser(description="Compile the CW-RAS dataset artifact")
+    parser.add_argument("--master", default=RISK_CSV)
+    parser.add_argument("--locations", default=LOCATIONS_CSV)
+    parser.add_argument("--aliases", default=ALIASES_CSV)
+    parser.add_argument("--output", default=ARTIFACT)
+    args = parser.parse_args(argv)
+
+    risk = pd.read_csv(args.master)
+    locations = pd.read_csv(args.locations)
+    version = file_version(args.master, args.locations, args.aliases)
+    write_artifact(args.output, risk, locations, version)
+    print(f"{args.output} built from dataset version {version} "
+          f"({len(risk)} panchayats, {len(locations)} locations)")
+
+
+if __name__ == "__main__":
+    main()
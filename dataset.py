@@ -0,0 +1,372 @@
+"""Dataset snapshots for the CW-RAS app.
+
+A Dataset bundles the master dataset, the panchayat locations and everything
+derived from them (score table, name index, spatial index) into one object
+that is never modified after it is built. DatasetManager holds the current
+snapshot and replaces it with a single reference assignment when the CSVs
+change, so a request that grabbed the old snapshot keeps a consistent view
+while the new one is built in the background.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+import artifact
+import scoring
+import uncertainty
+from locate import Locator
+from name_index import NameIndex, load_aliases
+from ranking import RiskRanking
+from spatial import SpatialIndex
+
+log = logging.getLogger(__name__)
+
+RISK_CSV = "CW_RAS_master_dataset.csv"
+LOCATIONS_CSV = "panchayat_locations.csv"
+ALIASES_CSV = "panchayat_aliases.csv"
+ARTIFACT = "cwras_dataset.bin"
+DEFAULT_CHECK_INTERVAL = 30  # seconds between mtime checks
+
+
+# ---------- Precomputed Score Table ----------
+RISK_LABELS = {
+    "flood": "Flood Risk",
+    "scarcity": "Water Scarcity Risk",
+}
+
+EXPLANATIONS = {
+    "rainfall": "Rainfall variation is the dominant factor influencing the assessed risk in this region.",
+    "groundwater": "Groundwater level fluctuation significantly contributes to the assessed risk in this region.",
+    "landuse": "Land-use characteristics such as urbanization influence the assessed risk in this region.",
+}
+
+
+def _round_or_none(value, ndigits=2):
+    return None if math.isnan(value) else round(float(value), ndigits)
+
+
+def _column(columns, name, length):
+    if name in columns:
+        return np.asarray(columns[name], dtype=float)
+    return np.zeros(length)
+
+
+def build_score_table(columns, scores=None):
+    """Score every panchayat for both risk types in one vectorized pass.
+
+    columns is the master dataset (a DataFrame or a dict of arrays); scores
+    may be passed in when they were precomputed (see artifact.py), otherwise
+    they come from scoring.score_columns. Returns a dict keyed by
+    (panchayat, risk_type) holding every value the dashboard needs, so a
+    request only has to look up a row.
+    """
+    names = list(columns["Panchayat"])
+    r_normal = _column(columns, "R_normal", len(names))
+    r_current = _column(columns, "R_current", len(names))
+    gw_last = _column(columns, "GW_last", len(names))
+    gw_current = _column(columns, "GW_current", len(names))
+    urban = np.nan_to_num(_column(columns, "Urban_Percent", len(names)))
+    forest = np.nan_to_num(_column(columns, "Forest_Percent", len(names)))
+    water = _column(columns, "Water_Body_Percent", len(names))
+
+    if scores is None:
+        scores = scoring.score_columns(columns)
+
+    # ----- NORMALIZED COMPONENTS (all 0-100) -----
+    rain_score = scores["R_score"]
+    gw_score = scores["G_score"]
+    gw_flood_score = scores["G_Flood_Score"]
+    lu_score = scores["L_score"]
+
+    # ----- SURFACE WATER FACTORS -----
+    swf = scores["SWF"]
+    flood_boost = scores["FloodBoost"]
+
+    # Weighted contributions, ordered (rainfall, groundwater, land use)
+    f_rain, f_land, f_gw = scoring.FLOOD_WEIGHTS
+    s_rain, s_gw, s_land = scoring.SCARCITY_WEIGHTS
+    impacts = {
+        "flood": (f_rain * rain_score, f_gw * gw_flood_score, f_land * lu_score),
+        "scarcity": (s_rain * rain_score, s_gw * gw_score, s_land * lu_score),
+    }
+    totals = {"flood": scores["FloodRisk"], "scarcity": scores["ScarcityRisk"]}
+    levels = {"flood": scores["FloodRiskLevel"], "scarcity": scores["ScarcityRiskLevel"]}
+    # Unweighted 0-100 components, ordered (rainfall, groundwater, land use)
+    components = {
+        "flood": (rain_score, gw_flood_score, lu_score),
+        "scarcity": (rain_score, gw_score, lu_score),
+    }
+
+    table = {}
+    for i, name in enumerate(names):
+        urban_percent = round(float(urban[i]), 2)
+        if urban_percent >= 50:
+            landuse_type = "Urban-dominant"
+        elif urban_percent >= 25:
+            landuse_type = "Semi-urban"
+        else:
+            landuse_type = "Rural / Forest-dominant"
+
+        last = _round_or_none(gw_last[i])
+        current = _round_or_none(gw_current[i])
+        water_body_pct = water[i]
+
+        common = {
+            "rainfall_normal": round(float(r_normal[i]), 2),
+            "rainfall_current": round(float(r_current[i]), 2),
+            "rainfall_deviation": round(float(rain_score[i]), 2),
+
+            "gw_last": last,
+            "gw_current": current,
+            "gw_change": round(abs(last - current), 2) if last is not None and current is not None else None,
+
+            "urban_percent": urban_percent,
+            "forest_percent": round(float(forest[i]), 2),
+            "landuse_type": landuse_type,
+
+            "water_body_pct": round(float(water_body_pct), 1) if water_body_pct else 0,
+            "swf": round(float(swf[i]), 2),
+            "flood_boost": round(float(flood_boost[i]), 1),
+        }
+
+        for risk_type, (rain_impact, gw_impact, lu_impact) in impacts.items():
+            score = float(totals[risk_type][i])
+            rainfall = round(float(rain_impact[i]), 2)
+            groundwater = round(float(gw_impact[i]), 2)
+            landuse = round(float(lu_impact[i]), 2)
+
+            if rainfall >= groundwater and rainfall >= landuse:
+                explanation = EXPLANATIONS["rainfall"]
+            elif groundwater >= landuse:
+                explanation = EXPLANATIONS["groundwater"]
+            else:
+                explanation = EXPLANATIONS["landuse"]
+
+            rain_component, gw_component, lu_component = components[risk_type]
+
+            table[(name, risk_type)] = {
+                "risk_type": RISK_LABELS[risk_type],
+                "score": round(score, 2),
+                "level": levels[risk_type][i],
+                "rainfall": rainfall,
+                "groundwater": groundwater,
+                "landuse": landuse,
+                "explanation": explanation,
+
+                "rainfall_score": round(float(rain_component[i]), 2),
+                "groundwater_score": round(float(gw_component[i]), 2),
+                "landuse_score": round(float(lu_component[i]), 2),
+                **common,
+            }
+
+    return table
+
+
+class Dataset:
+    """One immutable, fully derived version of the input data.
+
+    risk_columns / location_columns are the master dataset and the locations
+    as DataFrames or plain dicts of arrays; scores optionally carries the
+    precomputed scoring.score_columns arrays and bands the precomputed
+    uncertainty.simulate result. modified_at is when the inputs last changed
+    (defaults to the load time) and backs Last-Modified headers.
+    """
+
+    def __init__(self, risk_columns, location_columns, aliases=None, version=None, scores=None,
+                 modified_at=None, bands=None):
+        self.risk_columns = risk_columns
+        self.location_columns = location_columns
+        self.version = version
+        self.loaded_at = time.time()
+        self.modified_at = modified_at or self.loaded_at
+
+        self.panchayat_list = sorted(set(risk_columns["Panchayat"]))
+        self.name_index = NameIndex(risk_columns["Panchayat"], aliases=aliases)
+        self.score_table = build_score_table(risk_columns, scores)
+        self.ranking = RiskRanking(self.score_table)
+
+        # Location names are spelled independently of the master dataset
+        # (e.g. "Sooranaadu South"), so map them onto canonical names.
+        labels = [
+            self.name_index.lookup(name) or name
+            for name in location_columns["Panchayat"]
+        ]
+        self.location_index = SpatialIndex(
+            location_columns["Latitude"],
+            location_columns["Longitude"],
+            labels
+        )
+        self.locator = Locator(self.score_table, self.location_index)
+
+        self._uncertainty = None if bands is None else self._index_bands(bands)
+        self._uncertainty_lock = threading.Lock()
+
+    @staticmethod
+    def _index_bands(bands):
+        return bands, {name: i for i, name in enumerate(bands.regions)}
+
+    @property
+    def uncertainty_ready(self):
+        return self._uncertainty is not None
+
+    @property
+    def uncertainty(self):
+        """Monte Carlo score bands for every panchayat. Read from the artifact
+        when there is a current one; otherwise simulated on first use (about
+        0.2 s) and kept for this version."""
+        if self._uncertainty is None:
+            with self._uncertainty_lock:
+                if self._uncertainty is None:
+                    self._uncertainty = self._index_bands(uncertainty.simulate(self.risk_columns))
+        return self._uncertainty[0]
+
+    def uncertainty_for(self, panchayat, risk_type):
+        """Uncertainty summary for one (panchayat, risk_type), or None."""
+        result = self.uncertainty
+        i = self._uncertainty[1].get(panchayat)
+        return None if i is None else result.for_region(i, risk_type)
+
+
+def file_version(*paths):
+    """Content hash of the input files, so identical data keeps its version."""
+    digest = hashlib.sha1()
+    for path in paths:
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def file_mtime(*paths):
+    """Latest modification time of the existing paths, or None."""
+    mtimes = [os.path.getmtime(path) for path in paths if path is not None and os.path.exists(path)]
+    return max(mtimes, default=None)
+
+
+def load_dataset(risk_csv=RISK_CSV, locations_csv=LOCATIONS_CSV, aliases_csv=ALIASES_CSV,
+                 artifact_path=ARTIFACT):
+    """Load the current inputs. A compiled artifact built from exactly these
+    CSVs by the current scoring code is memory-mapped without touching
+    pandas; otherwise (no artifact, or a stale one) the CSVs are parsed."""
+    version = file_version(risk_csv, locations_csv, aliases_csv)
+    modified_at = file_mtime(risk_csv, locations_csv, aliases_csv)
+    aliases = load_aliases(aliases_csv)
+
+    if artifact_path and os.path.exists(artifact_path):
+        try:
+            compiled = artifact.read_artifact(artifact_path)
+        except (OSError, ValueError):
+            log.exception("Ignoring unreadable dataset artifact %s", artifact_path)
+        else:
+            if compiled.is_current(version):
+                return Dataset(compiled.risk, compiled.locations, aliases, version, compiled.scores,
+                               modified_at, compiled.uncertainty)
+            log.warning("Dataset artifact %s is stale; loading CSVs", artifact_path)
+
+    import pandas as pd
+
+    return Dataset(pd.read_csv(risk_csv), pd.read_csv(locations_csv), aliases, version,
+                   modified_at=modified_at)
+
+
+class DatasetManager:
+    """Owns the current Dataset and swaps in a rebuilt one when inputs change.
+
+    Readers call .current once per request and use that snapshot throughout.
+    check() is cheap (a few stat calls, throttled to check_interval) and
+    rebuilds in a background thread; reload() rebuilds synchronously. A failed
+    rebuild keeps the previous snapshot and records the error in last_error.
+    """
+
+    def __init__(self, risk_csv=RISK_CSV, locations_csv=LOCATIONS_CSV, aliases_csv=ALIASES_CSV,
+                 artifact_path=ARTIFACT, check_interval=DEFAULT_CHECK_INTERVAL, loader=load_dataset):
+        self.paths = (risk_csv, locations_csv, aliases_csv, artifact_path)
+        self.check_interval = check_interval
+        self.loader = loader
+        self.last_error = None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._mtimes = self._stat()
+        self._current = loader(*self.paths)
+        if not self._current.uncertainty_ready:
+            # No current artifact: simulate the bands off the import path
+            threading.Thread(target=lambda data: data.uncertainty, args=(self._current,),
+                             daemon=True).start()
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def version(self):
+        return self._current.version
+
+    def on_swap(self, callback):
+        """Call callback(new_dataset) after every successful swap."""
+        self._listeners.append(callback)
+
+    def _stat(self):
+        stamps = []
+        for path in self.paths:
+            if path is None:
+                stamps.append(None)
+                continue
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def reload(self, force=False):
+        """Rebuild now if the files changed (or force). Returns True on a swap."""
+        with self._reload_lock:
+            mtimes = self._stat()
+            if not force and mtimes == self._mtimes:
+                return False
+            try:
+                dataset = self.loader(*self.paths)
+                dataset.uncertainty  # simulated here, before the swap, if not precomputed
+            except Exception as exc:  # keep serving the last good snapshot
+                log.exception("Dataset reload failed")
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._mtimes = mtimes
+                return False
+            self._mtimes = mtimes
+            self.last_error = None
+            swapped = dataset.version != self._current.version
+            self._current = dataset
+        if swapped:
+            for callback in self._listeners:
+                callback(dataset)
+        return swapped
+
+    def check(self):
+        """Throttled mtime check; starts a background rebuild on change."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._stat() != self._mtimes and not self._reload_lock.locked():
+            threading.Thread(target=self.reload, daemon=True).start()
+
+    def start_watcher(self, interval=None):
+        """Poll the files from a daemon thread instead of on requests."""
+        interval = interval or self.check_interval
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                self.reload()
+
+        thread = threading.Thread(target=watch, daemon=True)
+        thread.start()
+        return thread
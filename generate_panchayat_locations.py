@@ -1,49 +1,169 @@
+import argparse
+import json
+import os
+import queue
+import threading
+
 import pandas as pd
-import requests
-import time
-
-# Load master dataset
-risk_data = pd.read_csv("CW_RAS_master_dataset.csv")
-
-panchayats = risk_data["Panchayat"].unique().tolist()
-
-results = []
-
-for panchayat in panchayats:
-    print(f"Fetching location for: {panchayat}")
-
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": f"{panchayat}, Kerala, India",
-        "format": "json",
-        "limit": 1
-    }
-    headers = {
-        "User-Agent": "CW-RAS-Location-Generator"
-    }
-
-    response = requests.get(url, params=params, headers=headers)
-
-    if response.status_code == 200:
-        data = response.json()
-        if len(data) > 0:
-            lat = float(data[0]["lat"])
-            lon = float(data[0]["lon"])
-        else:
-            lat, lon = None, None
-    else:
-        lat, lon = None, None
 
-    results.append({
-        "Panchayat": panchayat,
-        "Latitude": lat,
-        "Longitude": lon
-    })
+from geocoding import NOMINATIM_URL, GeocodingError, Provider, make_session, search
+from name_index import NameIndex
+
+MASTER_CSV = "CW_RAS_master_dataset.csv"
+LOCATIONS_CSV = "panchayat_locations.csv"
+CHECKPOINT = "panchayat_locations.checkpoint.jsonl"
+USER_AGENT = "CW-RAS-Location-Generator"
+
+
+def load_checkpoint(path):
+    """{panchayat: (lat, lon)} for every name already attempted. Not-found
+    names are stored as (None, None) so a resumed run does not retry them."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            done[entry["Panchayat"]] = (entry["Latitude"], entry["Longitude"])
+    return done
+
+
+def load_existing(path, panchayats=None):
+    """{panchayat: (lat, lon)} for names that already have coordinates.
+
+    With panchayats (the master dataset's names), rows are keyed by the
+    master spelling they match through NameIndex.canonical, so a row typed
+    as "Sooranaadu South" keeps its coordinates for "Sooranadu South".
+    """
+    if not os.path.exists(path):
+        return {}
+    existing = pd.read_csv(path).dropna(subset=["Latitude", "Longitude"])
+    index = NameIndex(panchayats) if panchayats is not None else None
+    known = {}
+    for row in existing.itertuples(index=False):
+        name = row.Panchayat
+        if index is not None:
+            name = index.canonical(name) or name
+        # An exact spelling wins over a variant of the same panchayat
+        if name not in known or row.Panchayat == name:
+            known[name] = (float(row.Latitude), float(row.Longitude))
+    return known
+
+
+def geocode_all(names, providers, checkpoint=CHECKPOINT, threads_per_provider=2,
+                retries=3, backoff=1.0, log=print):
+    """Geocode names concurrently and return {panchayat: (lat, lon)}.
+
+    Each provider gets its own worker threads and token bucket, all sharing
+    one pooled HTTP session. Every answer is appended to the checkpoint as
+    soon as it arrives. Names that keep failing are left out of the result
+    (and the checkpoint) so the next run retries them.
+    """
+    pending = queue.Queue()
+    for name in names:
+        pending.put(name)
+
+    results = {}
+    lock = threading.Lock()
+    session = make_session(pool_size=max(len(providers) * threads_per_provider, 1))
+
+    with open(checkpoint, "a", encoding="utf-8") as log_file:
+        def worker(provider):
+            while True:
+                try:
+                    name = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    lat, lon = search(session, provider, f"{name}, Kerala, India",
+                                      retries=retries, backoff=backoff)
+                except GeocodingError as exc:
+                    log(f"Failed: {name} ({exc})")
+                    continue
+                except Exception as exc:
+                    # An unexpected answer must not end this thread and strand
+                    # its share of the queue; the name is retried next run.
+                    log(f"Failed: {name} (unexpected {type(exc).__name__}: {exc})")
+                    continue
+                with lock:
+                    results[name] = (lat, lon)
+                    log_file.write(json.dumps({
+                        "Panchayat": name, "Latitude": lat, "Longitude": lon,
+                        "provider": provider.name,
+                    }) + "\n")
+                    log_file.flush()
+                log(f"Fetched location for: {name} -> {lat}, {lon} [{provider.name}]")
 
-    time.sleep(1)  # IMPORTANT: respect OSM usage policy
+        threads = [
+            threading.Thread(target=worker, args=(provider,), daemon=True)
+            for provider in providers
+            for _ in range(threads_per_provider)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    session.close()
+    return results
+
+
+def generate(master_csv=MASTER_CSV, output_csv=LOCATIONS_CSV, checkpoint=CHECKPOINT,
+             providers=None, threads_per_provider=2, retries=3, backoff=1.0, log=print):
+    """Fill in coordinates for every panchayat in master_csv, resuming from
+    output_csv and the checkpoint, and rewrite output_csv."""
+    providers = providers or [Provider(NOMINATIM_URL, rate=1.0, user_agent=USER_AGENT)]
+    panchayats = pd.read_csv(master_csv)["Panchayat"].unique().tolist()
+
+    known = load_existing(output_csv, panchayats)
+    known.update(load_checkpoint(checkpoint))
+    todo = [name for name in panchayats if name not in known]
+    log(f"{len(panchayats) - len(todo)} already located, {len(todo)} to geocode")
+
+    known.update(geocode_all(todo, providers, checkpoint, threads_per_provider,
+                             retries, backoff, log))
+
+    df = pd.DataFrame([
+        {"Panchayat": name, "Latitude": known.get(name, (None, None))[0],
+         "Longitude": known.get(name, (None, None))[1]}
+        for name in panchayats
+    ])
+    tmp = output_csv + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, output_csv)
+
+    missing = [name for name in panchayats if name not in known]
+    if not missing and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return df, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode panchayats into panchayat_locations.csv")
+    parser.add_argument("--master", default=MASTER_CSV)
+    parser.add_argument("--output", default=LOCATIONS_CSV)
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    parser.add_argument("--provider", action="append", metavar="'URL [RATE]'",
+                        help="Nominatim-compatible search URL and requests/second; repeat for "
+                             "several providers (default: public OSM at 1 request/s, which is "
+                             "its usage policy)")
+    parser.add_argument("--threads", type=int, default=2, help="worker threads per provider")
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    specs = args.provider or [f"{NOMINATIM_URL} 1"]
+    providers = [Provider.parse(spec, user_agent=USER_AGENT) for spec in specs]
+    _, missing = generate(args.master, args.output, args.checkpoint, providers,
+                          args.threads, args.retries)
+
+    if missing:
+        print(f"{len(missing)} names failed; run again to resume: {', '.join(missing)}")
+    else:
+        print(f"{args.output} generated successfully and outputs verified")
 
-# Save to CSV
-df = pd.DataFrame(results)
-df.to_csv("panchayat_locations.csv", index=False)
 
-print("panchayat_locations.csv generated successfully and outputs verified")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+"""Geocoding for CW-RAS.
+
+Free-text place names that miss the exact panchayat match are geocoded
+through Nominatim. The same names come in over and over, so results are kept
+in an in-memory LRU backed by hashed JSON files in cache/ (one file per
+normalized query, named by its SHA-1). Entries expire after a TTL, and "not
+found" answers are cached too, with a shorter TTL. Expired files are deleted
+when they are read and by a periodic sweep on write, so cache/ stays bounded.
+
+The HTTP side (token-bucket rate limiting, pooled sessions, retries with
+backoff) is shared by the app and generate_panchayat_locations.py. requests
+is imported on first use, so workers that never miss the local name index
+never load it.
+
+Geocoder is what the web app uses. It puts the HTTP call behind a circuit
+breaker with strict timeouts and never waits for a rate-limit token, and it
+coalesces concurrent lookups of the same place into one request. A degraded
+upstream therefore costs a worker at most one timeout, and usually nothing.
+AsyncGeocoder wraps it for ASGI deployments.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 30 * 24 * 3600         # found places rarely move
+DEFAULT_NEGATIVE_TTL = 24 * 3600     # retry unknown names daily
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_PRUNE_INTERVAL = 3600        # sweep expired disk entries at most hourly
+
+_MISSING = object()
+
+
+def normalize_query(place_name):
+    """Case- and whitespace-insensitive cache key for a place name."""
+    return " ".join(str(place_name).lower().split())
+
+
+def _remove(path):
+    """Delete path if it still exists; True if it was removed."""
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+class GeocodeCache:
+    """Two-level (memory LRU + disk) cache of place name -> (lat, lon).
+
+    get() returns None on a miss, (lat, lon) on a hit and (None, None) for a
+    cached "not found". Expired disk entries are deleted when get() finds
+    them, and set() runs prune() at most once per prune_interval.
+    """
+
+    def __init__(self, cache_dir="cache", ttl=DEFAULT_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 prune_interval=DEFAULT_PRUNE_INTERVAL, clock=time.time):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_prune = None     # first write sweeps what earlier runs left
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".json")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _load(path, key=None):
+        """The cache entry stored at path, or None. cache/ also holds other
+        hashed responses; only our own entries (for key, if given) count."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or "query" not in entry or "expires" not in entry:
+            return None
+        if key is not None and entry["query"] != key:
+            return None
+        return entry
+
+    def _read_disk(self, key, now):
+        path = self._path(key)
+        entry = self._load(path, key)
+        if entry is None:
+            return None
+        if entry["expires"] <= now:
+            _remove(path)
+            return None
+        return entry
+
+    def _write_disk(self, key, entry):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError:
+            # Read-only deploys (e.g. serverless) still get the memory tier
+            _remove(tmp)
+
+    def get(self, place_name):
+        key = normalize_query(place_name)
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry["expires"] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["lat"], entry["lon"]
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, entry)
+        return entry["lat"], entry["lon"]
+
+    def set(self, place_name, lat, lon):
+        key = normalize_query(place_name)
+        now = self.clock()
+        found = lat is not None and lon is not None
+        entry = {
+            "query": key,
+            "lat": lat if found else None,
+            "lon": lon if found else None,
+            "expires": now + (self.ttl if found else self.negative_ttl),
+        }
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+        with self._lock:
+            due = self._next_prune is None or now >= self._next_prune
+            if due:
+                self._next_prune = now + self.prune_interval
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete expired entries (found and not-found) from disk and return
+        how many were removed. Files that are not cache entries are kept."""
+        now = self.clock()
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            entry = self._load(path)
+            if entry is not None and path == self._path(entry["query"]) and entry["expires"] <= now:
+                removed += _remove(path)
+        return removed
+
+    def clear(self):
+        """Drop the in-memory tier (disk entries are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+
+# ---------- HTTP Providers ----------
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+DEFAULT_TIMEOUT = 10
+REQUEST_TIMEOUT = (3.05, 5)  # (connect, read) seconds for lookups made while serving a request
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeocodingError(Exception):
+    """The provider could not answer (as opposed to answering "not found")."""
+
+
+class RateLimitedError(GeocodingError):
+    """No rate-limit token was available and the caller would not wait."""
+
+
+class CircuitOpenError(GeocodingError):
+    """The provider has been failing; calls are refused until it cools down."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token and return 0, or return the seconds until one is due."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            self.sleep(wait)
+
+    def try_acquire(self):
+        """Take a token if one is available right now."""
+        return not self._take()
+
+
+class Provider:
+    """A Nominatim-compatible search endpoint (public OSM, a local mirror, ...)
+    with its own rate limit."""
+
+    def __init__(self, url=NOMINATIM_URL, rate=1.0, name=None, user_agent="CW-RAS-App",
+                 timeout=DEFAULT_TIMEOUT):
+        self.url = url
+        self.name = name or url
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate)
+
+    @classmethod
+    def parse(cls, spec, **kwargs):
+        """Build a provider from "URL" or "URL RATE" (requests per second).
+
+        Whitespace cannot occur in a URL, so it separates the rate; URLs
+        with user:pass@host parse correctly.
+        """
+        parts = spec.split()
+        if len(parts) not in (1, 2):
+            raise ValueError(f"provider must be 'URL' or 'URL RATE', not {spec!r}")
+        rate = float(parts[1]) if len(parts) == 2 else kwargs.pop("rate", 1.0)
+        return cls(parts[0], rate, **kwargs)
+
+
+def make_session(pool_size=10):
+    """requests.Session with a connection pool sized for pool_size threads."""
+    import requests
+    import requests.adapters
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def search(session, provider, query, retries=3, backoff=1.0, sleep=time.sleep, wait=True):
+    """Geocode one query. Returns (lat, lon), or (None, None) if the provider
+    found nothing. Connection errors, timeouts, 429 and 5xx answers are retried
+    with exponential backoff (honouring Retry-After); GeocodingError is raised
+    once retries run out. With wait=False, RateLimitedError is raised instead
+    of sleeping for a rate-limit token."""
+    import requests
+
+    params = {"q": query, "format": "json", "limit": 1}
+    headers = {"User-Agent": provider.user_agent}
+    last_error = None
+
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(last_error[1])
+        if wait:
+            provider.bucket.acquire()
+        elif not provider.bucket.try_acquire():
+            raise RateLimitedError(f"{provider.name}: rate limit reached")
+        delay = backoff * (2 ** attempt)
+        try:
+            response = session.get(provider.url, params=params, headers=headers,
+                                   timeout=provider.timeout)
+        except requests.RequestException as exc:
+            last_error = (exc, delay)
+            continue
+
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            last_error = (f"HTTP {response.status_code}", delay)
+            continue
+        if response.status_code != 200:
+            raise GeocodingError(f"{provider.name}: HTTP {response.status_code} for {query!r}")
+
+        try:
+            data = response.json()
+        except ValueError as exc:
+            raise GeocodingError(f"{provider.name}: invalid JSON for {query!r}") from exc
+        if len(data) == 0:
+            return None, None
+        return float(data[0]["lat"]), float(data[0]["lon"])
+
+    raise GeocodingError(f"{provider.name}: gave up on {query!r} after {retries + 1} attempts "
+                         f"({last_error[0]})")
+
+
+class CircuitBreaker:
+    """Stops calling a failing provider for a while.
+
+    After failure_threshold consecutive failures the breaker opens and
+    allow() refuses calls. Once reset_timeout has passed, one trial call per
+    reset_timeout is let through: success closes the breaker, failure keeps
+    it open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = self.clock()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self._opened_at = now  # one trial; the next waits another reset_timeout
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs fn once per key at a time; concurrent callers with the same key
+    wait for that call and share its result (or exception)."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class Geocoder:
+    """Request-path geocoding: cache, single-flight, circuit breaker, one
+    pooled session and strict (connect, read) timeouts.
+
+    lookup() returns (lat, lon) or (None, None) for "not found" and raises
+    GeocodingError when the provider cannot answer right now: it is down,
+    timing out, the breaker is open, or its rate limit is used up.
+    """
+
+    def __init__(self, provider=None, cache=None, breaker=None, retries=0, pool_size=10):
+        self.provider = provider or Provider(NOMINATIM_URL, timeout=REQUEST_TIMEOUT)
+        self.cache = cache
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = make_session(self.pool_size)
+        return self._session
+
+    def lookup(self, place_name):
+        if self.cache is not None:
+            cached = self.cache.get(place_name)
+            if cached is not None:
+                return cached
+        return self._flight.do(normalize_query(place_name), lambda: self._fetch(place_name))
+
+    def _fetch(self, place_name):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.provider.name}: circuit open")
+        try:
+            lat, lon = search(self.session, self.provider, place_name,
+                              retries=self.retries, backoff=0.1, wait=False)
+        except RateLimitedError:
+            raise
+        except GeocodingError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if self.cache is not None:
+            self.cache.set(place_name, lat, lon)
+        return lat, lon
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class AsyncGeocoder:
+    """asyncio front end to a Geocoder, for ASGI deployments.
+
+    There is no async HTTP client among our dependencies, so the blocking
+    lookup runs on a small dedicated thread pool. That pool bounds how many
+    upstream calls can be in flight, and the event loop itself never blocks.
+    Concurrent awaits of the same place share one future, and every lookup
+    is cut off at deadline seconds.
+    """
+
+    def __init__(self, geocoder=None, max_workers=4, deadline=8.0):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.geocoder = geocoder or Geocoder()
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="cwras-geocode")
+        self._inflight = {}
+
+    async def lookup(self, place_name):
+        import asyncio
+
+        key = normalize_query(place_name)
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, self.geocoder.lookup, place_name)
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.deadline)
+        except asyncio.TimeoutError as exc:
+            raise GeocodingError(f"lookup of {place_name!r} exceeded {self.deadline}s") from exc
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.geocoder.close()
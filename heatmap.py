@@ -0,0 +1,318 @@
+"""Gridded risk heatmaps, map tiles and region polygons.
+
+A batch stage for the map UI. It interpolates the flood and scarcity
+scores of every located panchayat onto a regular lat/lon grid, using
+inverse-distance weighting over the k nearest panchayats. The neighbour
+search is spatial.SpatialIndex.query_many, so the whole grid is one
+vectorized pass. From the grid it writes:
+
+    <output>/flood/{z}/{x}/{y}.png       XYZ (Web Mercator) PNG tiles per zoom
+    <output>/scarcity/{z}/{x}/{y}.png
+    <output>/regions.geojson              one polygon per panchayat
+    <output>/manifest.json                bounds, zooms, colour legend, dataset version
+
+Tiles with no data are not written, so the map shows nothing there. Cells
+farther than max_km from every panchayat are left empty.
+
+We have no boundary data. A region polygon is the convex hull of the grid
+cells whose nearest panchayat it is: a rasterized Voronoi cell, which is
+close enough for choropleths and hit-testing.
+
+    python heatmap.py                                   # static/tiles, zooms 7-11, 1 km grid
+    python heatmap.py --bbox 8.17,74.85,12.8,77.42      # all of Kerala
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+import scoring
+from spatial import SpatialIndex, idw_weights
+
+OUTPUT_DIR = os.path.join("static", "tiles")
+TILE_SIZE = 256
+DEFAULT_ZOOMS = (7, 11)
+DEFAULT_RESOLUTION_KM = 1.0
+DEFAULT_NEIGHBOURS = 8
+DEFAULT_POWER = 2.0
+DEFAULT_MAX_KM = 15.0
+KM_PER_DEGREE = 111.32
+
+# Score -> colour stops, matching the dashboard's Low / Moderate / High colours
+COLOUR_STOPS = (
+    (0, (74, 222, 128)),
+    (scoring.LOW_CUTOFF, (74, 222, 128)),
+    ((scoring.LOW_CUTOFF + scoring.HIGH_CUTOFF) / 2, (251, 191, 36)),
+    (scoring.HIGH_CUTOFF, (248, 113, 113)),
+    (100, (185, 28, 28)),
+)
+ALPHA = 170
+
+
+class Grid:
+    """Regular lat/lon grid of interpolated scores. Row 0 is the southern edge."""
+
+    def __init__(self, south, west, d_lat, d_lon, values, nearest):
+        self.south = south
+        self.west = west
+        self.d_lat = d_lat
+        self.d_lon = d_lon
+        self.values = values      # {risk_type: (rows, cols) array, NaN = no data}
+        self.nearest = nearest    # (rows, cols) index of the nearest point, -1 = no data
+
+    @property
+    def shape(self):
+        return self.nearest.shape
+
+    def sample(self, risk_type, lats, lons):
+        """Values at arbitrary points (nearest cell); NaN outside the grid."""
+        rows = np.floor((lats - self.south) / self.d_lat).astype(np.intp)
+        cols = np.floor((lons - self.west) / self.d_lon).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        out = np.full(np.shape(lats), np.nan)
+        out[inside] = self.values[risk_type][rows[inside], cols[inside]]
+        return out
+
+
+def interpolate(lats, lons, values, bbox, resolution_km=DEFAULT_RESOLUTION_KM,
+                k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER, max_km=DEFAULT_MAX_KM):
+    """Inverse-distance-weighted grid over bbox = (south, west, north, east).
+
+    values is {risk_type: array aligned with lats/lons}. Returns a Grid.
+    """
+    south, west, north, east = bbox
+    d_lat = resolution_km / KM_PER_DEGREE
+    d_lon = resolution_km / (KM_PER_DEGREE * math.cos(math.radians((south + north) / 2)))
+    rows = max(int(math.ceil((north - south) / d_lat - 1e-9)), 1)
+    cols = max(int(math.ceil((east - west) / d_lon - 1e-9)), 1)
+    cell_lats = south + (np.arange(rows) + 0.5) * d_lat
+    cell_lons = west + (np.arange(cols) + 0.5) * d_lon
+    grid_lats, grid_lons = np.meshgrid(cell_lats, cell_lons, indexing="ij")
+
+    index = SpatialIndex(lats, lons)
+    positions, km = index.query_many(grid_lats.ravel(), grid_lons.ravel(), k)
+    points = np.asarray(index.labels)[positions]          # rows of the input arrays
+    weights = idw_weights(km, power, max_km)
+    covered = km[:, 0] <= max_km
+
+    gridded = {}
+    for risk_type, column in values.items():
+        cell = (weights * np.asarray(column, dtype=float)[points]).sum(axis=1)
+        cell[~covered] = np.nan
+        gridded[risk_type] = cell.reshape(rows, cols)
+
+    nearest = np.where(covered, points[:, 0], -1).reshape(rows, cols)
+    return Grid(south, west, d_lat, d_lon, gridded, nearest)
+
+
+# ---------- PNG ----------
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(rgba):
+    """PNG bytes for an (height, width, 4) uint8 array."""
+    height, width, _ = rgba.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)   # filter byte 0 per row
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + _chunk(b"IEND", b""))
+
+
+def colourize(scores):
+    """RGBA uint8 for an array of scores; NaN is transparent."""
+    stops = [s for s, _ in COLOUR_STOPS]
+    rgba = np.zeros(scores.shape + (4,), dtype=np.uint8)
+    clean = np.nan_to_num(scores)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(clean, stops, [c[channel] for _, c in COLOUR_STOPS])
+    rgba[..., 3] = np.where(np.isnan(scores), 0, ALPHA)
+    return rgba
+
+
+# ---------- TILES ----------
+def tile_range(bbox, zoom):
+    """(x0, x1, y0, y1) inclusive XYZ tile indices covering bbox at zoom."""
+    south, west, north, east = bbox
+    n = 2 ** zoom
+
+    def x(lon):
+        return min(int((lon + 180) / 360 * n), n - 1)
+
+    def y(lat):
+        lat = math.radians(lat)
+        return min(int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n), n - 1)
+
+    return x(west), x(east), y(north), y(south)
+
+
+def tile_pixels(zoom, x, y):
+    """(lats, lons) of the pixel centres of one tile, each (256, 256)."""
+    n = TILE_SIZE * 2 ** zoom
+    offsets = np.arange(TILE_SIZE) + 0.5
+    lons = (x * TILE_SIZE + offsets) / n * 360 - 180
+    mercator = np.pi * (1 - 2 * (y * TILE_SIZE + offsets) / n)
+    lats = np.degrees(np.arctan(np.sinh(mercator)))
+    return np.meshgrid(lats, lons, indexing="ij")
+
+
+def write_tiles(grid, output_dir, zooms=DEFAULT_ZOOMS, bbox=None):
+    """Render every non-empty tile for each risk type. Returns the tile count."""
+    bbox = bbox or (grid.south, grid.west,
+                    grid.south + grid.shape[0] * grid.d_lat, grid.west + grid.shape[1] * grid.d_lon)
+    written = 0
+    for zoom in range(zooms[0], zooms[1] + 1):
+        x0, x1, y0, y1 = tile_range(bbox, zoom)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                lats, lons = tile_pixels(zoom, x, y)
+                for risk_type in grid.values:
+                    scores = grid.sample(risk_type, lats, lons)
+                    if np.isnan(scores).all():
+                        continue
+                    directory = os.path.join(output_dir, risk_type, str(zoom), str(x))
+                    os.makedirs(directory, exist_ok=True)
+                    with open(os.path.join(directory, f"{y}.png"), "wb") as f:
+                        f.write(encode_png(colourize(scores)))
+                    written += 1
+    return written
+
+
+# ---------- REGION POLYGONS ----------
+def convex_hull(points):
+    """Counter-clockwise hull (Andrew's monotone chain) of (x, y) tuples."""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def region_polygons(grid, names, properties=None):
+    """GeoJSON FeatureCollection with one polygon per input point that is
+    nearest to at least one grid cell. properties(i) adds feature properties."""
+    rows, cols = np.nonzero(grid.nearest >= 0)
+    owners = grid.nearest[rows, cols]
+    order = np.argsort(owners, kind="stable")
+    rows, cols, owners = rows[order], cols[order], owners[order]
+    bounds = np.flatnonzero(np.diff(owners)) + 1
+
+    features = []
+    for r, c, owner in zip(np.split(rows, bounds), np.split(cols, bounds), owners[np.r_[0, bounds]]):
+        corners = [
+            (round(grid.west + (cc + dx) * grid.d_lon, 5), round(grid.south + (rr + dy) * grid.d_lat, 5))
+            for rr, cc in zip(r.tolist(), c.tolist())
+            for dx in (0, 1) for dy in (0, 1)
+        ]
+        ring = convex_hull(corners)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [[list(p) for p in ring + ring[:1]]]},
+            "properties": {"panchayat": names[owner], **(properties(owner) if properties else {})},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+# ---------- BATCH STAGE ----------
+def located_scores(data):
+    """(lats, lons, names, {risk_type: scores}) for every located panchayat of a Dataset."""
+    index = data.location_index
+    keep = [i for i, name in enumerate(index.labels) if (name, "flood") in data.score_table]
+    names = [index.labels[i] for i in keep]
+    values = {
+        risk_type: np.array([data.score_table[(name, risk_type)]["score"] for name in names])
+        for risk_type in ("flood", "scarcity")
+    }
+    return index.lats[keep], index.lons[keep], names, values
+
+
+def build(data, output_dir=OUTPUT_DIR, bbox=None, resolution_km=DEFAULT_RESOLUTION_KM,
+          zooms=DEFAULT_ZOOMS, k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER, max_km=DEFAULT_MAX_KM,
+          log=print):
+    """Grid, tiles, polygons and manifest for one Dataset."""
+    lats, lons, names, values = located_scores(data)
+    if bbox is None:
+        pad_lat = max_km / KM_PER_DEGREE
+        pad_lon = pad_lat / math.cos(math.radians(float(np.mean(lats))))
+        bbox = (lats.min() - pad_lat, lons.min() - pad_lon, lats.max() + pad_lat, lons.max() + pad_lon)
+    bbox = tuple(round(float(v), 5) for v in bbox)
+
+    start = time.perf_counter()
+    grid = interpolate(lats, lons, values, bbox, resolution_km, k, power, max_km)
+    log(f"{grid.shape[0]} x {grid.shape[1]} grid in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    tiles = write_tiles(grid, output_dir, zooms, bbox)
+    log(f"{tiles} tiles for zooms {zooms[0]}-{zooms[1]} in {time.perf_counter() - start:.2f}s")
+
+    def properties(i):
+        props = {}
+        for risk_type in ("flood", "scarcity"):
+            row = data.score_table[(names[i], risk_type)]
+            props[risk_type] = row["score"]
+            props[f"{risk_type}_level"] = row["level"]
+        return props
+
+    regions = region_polygons(grid, names, properties)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "regions.geojson"), "w", encoding="utf-8") as f:
+        json.dump(regions, f)
+
+    manifest = {
+        "dataset_version": data.version,
+        "built_at": time.time(),
+        "bbox": bbox,
+        "resolution_km": resolution_km,
+        "zooms": list(zooms),
+        "interpolation": {"method": "idw", "neighbours": k, "power": power, "max_km": max_km},
+        "tiles": {risk_type: f"{risk_type}/{{z}}/{{x}}/{{y}}.png" for risk_type in values},
+        "regions": "regions.geojson",
+        "legend": [{"score": s, "rgb": list(c)} for s, c in COLOUR_STOPS],
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    log(f"{len(regions['features'])} region polygons -> {output_dir}")
+    return grid
+
+
+def main(argv=None):
+    from dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Render CW-RAS heatmap tiles and region polygons")
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--bbox", help="south,west,north,east (default: data extent + max-km)")
+    parser.add_argument("--resolution-km", type=float, default=DEFAULT_RESOLUTION_KM)
+    parser.add_argument("--zoom", default=f"{DEFAULT_ZOOMS[0]}-{DEFAULT_ZOOMS[1]}", help="MIN-MAX")
+    parser.add_argument("--neighbours", type=int, default=DEFAULT_NEIGHBOURS)
+    parser.add_argument("--power", type=float, default=DEFAULT_POWER)
+    parser.add_argument("--max-km", type=float, default=DEFAULT_MAX_KM)
+    args = parser.parse_args(argv)
+
+    bbox = tuple(float(v) for v in args.bbox.split(",")) if args.bbox else None
+    low, _, high = args.zoom.partition("-")
+    zooms = (int(low), int(high or low))
+    build(load_dataset(), args.output, bbox, args.resolution_km, zooms,
+          args.neighbours, args.power, args.max_km)
+
+
+if __name__ == "__main__":
+    main()
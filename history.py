@@ -0,0 +1,287 @@
+"""Monthly risk history per panchayat.
+
+An append-only, time-partitioned, columnar store. Each write adds one
+segment file per affected month:
+
+    history/
+        2024-05/000001.npz
+        2024-06/000002.npz      one array per column (Panchayat, inputs, scores)
+        2024-06/000007.npz      a later revision of some 2024-06 rows
+
+Segments are numbered across the whole store and never rewritten. For
+every (panchayat, month) the row in the highest-numbered segment is the
+current one, so corrections are simply newer segments.
+
+Rescoring is incremental. append() compares the incoming readings with
+the stored ones and rescores only the rows whose inputs changed, plus the
+following month of each such region. GW_last for a month is the previous
+month's GW_current, so correcting one month's groundwater also moves the
+next month's groundwater score. Nothing else is touched.
+
+    python history.py append --period 2024-06 --input CW_RAS_master_dataset.csv
+    python history.py correct --period 2024-06 --panchayat Kollam GW_current=6.2
+    python history.py trend Kollam
+"""
+import argparse
+import bisect
+import io
+import math
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+import scoring
+
+HISTORY_DIR = "history"
+
+# Readings per (panchayat, month). GW_last is only used for a panchayat's
+# first month; after that it is the previous month's GW_current.
+INPUT_COLUMNS = (
+    "R_normal", "R_current", "GW_last", "GW_current",
+    "Urban_Percent", "Forest_Percent", "Water_Body_Percent",
+)
+SCORE_COLUMNS = ("R_score", "G_score", "L_score", "FloodRisk", "ScarcityRisk")
+LEVEL_COLUMNS = {"FloodRiskLevel": "FloodRisk", "ScarcityRiskLevel": "ScarcityRisk"}
+
+_PERIOD = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+_SEGMENT = re.compile(r"^(\d{6})\.npz$")
+
+
+def _same(a, b):
+    return a == b or (isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b))
+
+
+class HistoryStore:
+    """Current rows of the history directory, kept in memory.
+
+    One process should write at a time; any number can read. Readers call
+    refresh() to pick up segments written by others.
+    """
+
+    def __init__(self, path=HISTORY_DIR, refresh_interval=0.0):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.version = 0          # highest segment number loaded
+        self.modified_at = None   # mtime of the newest segment loaded
+        self.last_rescored = 0    # rows rescored by the last append()
+        self._rows = {}           # (panchayat, period) -> {column: value}
+        self._periods = {}        # panchayat -> sorted periods
+        self._loaded = set()
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self.refresh(force=True)
+
+    # ---------- reading ----------
+    def refresh(self, force=False):
+        """Load segments written since the last call. Returns True if any were.
+
+        Listing and loading happen under one lock, so two concurrent refreshes
+        cannot both apply a segment and put older rows back over newer ones.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return False
+            self._last_refresh = now
+            if not os.path.isdir(self.path):
+                return False
+
+            new = []
+            for period in os.listdir(self.path):
+                directory = os.path.join(self.path, period)
+                if not _PERIOD.match(period) or not os.path.isdir(directory):
+                    continue
+                for name in os.listdir(directory):
+                    match = _SEGMENT.match(name)
+                    if match and (period, name) not in self._loaded:
+                        new.append((int(match.group(1)), period, name))
+
+            for seq, period, name in sorted(new):
+                path = os.path.join(self.path, period, name)
+                with np.load(path, allow_pickle=False) as segment:
+                    columns = {key: segment[key] for key in segment.files}
+                self._remember(period, columns)
+                self._loaded.add((period, name))
+                self.version = max(self.version, seq)
+                self._touch(os.path.getmtime(path))
+            return bool(new)
+
+    def _touch(self, mtime):
+        self.modified_at = mtime if self.modified_at is None else max(self.modified_at, mtime)
+
+    def _remember(self, period, columns):
+        names = columns.pop("Panchayat")
+        for i, name in enumerate(names.tolist()):
+            row = {key: values[i].item() for key, values in columns.items()}
+            new = (name, period) not in self._rows
+            # Row before period: trend() may be reading _periods concurrently
+            self._rows[(name, period)] = row
+            if new:
+                bisect.insort(self._periods.setdefault(name, []), period)
+
+    def regions(self):
+        return sorted(self._periods)
+
+    def periods(self, panchayat=None):
+        if panchayat is not None:
+            return list(self._periods.get(panchayat, ()))
+        return sorted({period for periods in self._periods.values() for period in periods})
+
+    def row(self, panchayat, period):
+        return self._rows.get((panchayat, period))
+
+    def trend(self, panchayat, start=None, end=None):
+        """Scores of one panchayat per month, oldest first, as parallel lists:
+        {"periods", "flood", "flood_level", "scarcity", "scarcity_level"}.
+        start / end are inclusive "YYYY-MM" bounds."""
+        periods = self._periods.get(panchayat, [])
+        lo = bisect.bisect_left(periods, start) if start else 0
+        hi = bisect.bisect_right(periods, end) if end else len(periods)
+        selected = periods[lo:hi]
+        rows = [self._rows[(panchayat, period)] for period in selected]
+        return {
+            "periods": selected,
+            "flood": [round(row["FloodRisk"], 2) for row in rows],
+            "flood_level": [scoring.LEVELS[row["FloodRiskLevel"]] for row in rows],
+            "scarcity": [round(row["ScarcityRisk"], 2) for row in rows],
+            "scarcity_level": [scoring.LEVELS[row["ScarcityRiskLevel"]] for row in rows],
+        }
+
+    # ---------- writing ----------
+    def append(self, period, columns):
+        """Record one month of readings for any number of panchayats.
+
+        columns holds "Panchayat" and any of INPUT_COLUMNS (a DataFrame or a
+        dict of sequences). Missing inputs keep their stored value for that
+        month. Returns the number of rows rescored.
+        """
+        if not _PERIOD.match(period):
+            raise ValueError(f"period must look like 2024-06, not {period!r}")
+        names = [str(name) for name in columns["Panchayat"]]
+        given = {c: scoring._as_float(columns[c]) for c in INPUT_COLUMNS if c in columns}
+
+        with self._lock:
+            self.refresh(force=True)
+            staged = {}
+            for i, name in enumerate(names):
+                stored = self._rows.get((name, period))
+                inputs = {
+                    c: float(given[c][i]) if c in given else (stored[c] if stored else math.nan)
+                    for c in INPUT_COLUMNS
+                }
+                if stored is None or not all(_same(inputs[c], stored[c]) for c in INPUT_COLUMNS):
+                    staged[(name, period)] = inputs
+
+            affected = dict(staged)
+            for name, month in staged:
+                following = self._next_period(name, month)
+                if following and (name, following) not in affected:
+                    affected[(name, following)] = {c: self._rows[(name, following)][c]
+                                                   for c in INPUT_COLUMNS}
+
+            self.last_rescored = len(affected)
+            if affected:
+                self._write(affected, staged)
+            return self.last_rescored
+
+    def correct(self, panchayat, period, **values):
+        """Fix some readings of one panchayat in one month."""
+        return self.append(period, {"Panchayat": [panchayat], **{k: [v] for k, v in values.items()}})
+
+    def _next_period(self, name, period):
+        periods = self._periods.get(name, [])
+        i = bisect.bisect_right(periods, period)
+        return periods[i] if i < len(periods) else None
+
+    def _previous_gw(self, name, period, staged):
+        periods = self._periods.get(name, [])
+        candidates = set(periods[:bisect.bisect_left(periods, period)])
+        candidates.update(p for n, p in staged if n == name and p < period)
+        if not candidates:
+            return None
+        previous = max(candidates)
+        row = staged.get((name, previous)) or self._rows[(name, previous)]
+        return row["GW_current"]
+
+    def _write(self, affected, staged):
+        keys = sorted(affected)
+        inputs = {c: np.array([affected[key][c] for key in keys]) for c in INPUT_COLUMNS}
+        effective_last = np.array([
+            v if (v := self._previous_gw(name, period, staged)) is not None else affected[(name, period)]["GW_last"]
+            for name, period in keys
+        ])
+        scores = scoring.score_columns({**inputs, "GW_last": effective_last})
+
+        by_period = {}
+        for i, (_, period) in enumerate(keys):
+            by_period.setdefault(period, []).append(i)
+
+        for period, index in sorted(by_period.items()):
+            index = np.array(index)
+            segment = {"Panchayat": np.array([keys[i][0] for i in index])}
+            segment.update({c: inputs[c][index] for c in INPUT_COLUMNS})
+            segment["GW_last_used"] = effective_last[index]
+            segment.update({c: np.asarray(scores[c], dtype=float)[index] for c in SCORE_COLUMNS})
+            segment.update({c: scoring.classify_codes(scores[source][index])
+                            for c, source in LEVEL_COLUMNS.items()})
+
+            seq = self.version + 1
+            directory = os.path.join(self.path, period)
+            os.makedirs(directory, exist_ok=True)
+            name = f"{seq:06d}.npz"
+            buffer = io.BytesIO()
+            np.savez(buffer, **segment)
+            tmp = os.path.join(directory, name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(tmp, os.path.join(directory, name))
+            self._touch(os.path.getmtime(os.path.join(directory, name)))
+
+            self._remember(period, dict(segment))
+            self._loaded.add((period, name))
+            self.version = seq
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CW-RAS monthly risk history")
+    parser.add_argument("--store", default=HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    append = commands.add_parser("append", help="add or update one month from a CSV")
+    append.add_argument("--period", required=True, help="YYYY-MM")
+    append.add_argument("--input", required=True, help="CSV with Panchayat and reading columns")
+
+    correct = commands.add_parser("correct", help="fix readings of one panchayat")
+    correct.add_argument("--period", required=True)
+    correct.add_argument("--panchayat", required=True)
+    correct.add_argument("values", nargs="+", metavar="COLUMN=VALUE")
+
+    trend = commands.add_parser("trend", help="print one panchayat's history")
+    trend.add_argument("panchayat")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.store)
+    if args.command == "append":
+        import pandas as pd
+
+        rescored = store.append(args.period, pd.read_csv(args.input))
+        print(f"{args.period}: {rescored} rows rescored (store version {store.version})")
+    elif args.command == "correct":
+        values = dict(item.split("=", 1) for item in args.values)
+        unknown = set(values) - set(INPUT_COLUMNS)
+        if unknown:
+            parser.error(f"unknown columns: {', '.join(sorted(unknown))}")
+        rescored = store.correct(args.panchayat, args.period, **{k: float(v) for k, v in values.items()})
+        print(f"{rescored} rows rescored (store version {store.version})")
+    else:
+        history = store.trend(args.panchayat)
+        for i, period in enumerate(history["periods"]):
+            print(f"{period}  flood {history['flood'][i]:6.2f} {history['flood_level'][i]:<9}"
+                  f"scarcity {history['scarcity'][i]:6.2f} {history['scarcity_level'][i]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Import-time report for app startup.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and sums
+the self time of every imported module by top-level package, so you can see
+what a worker pays for before it serves its first request.
+
+    python import_report.py                      # table, slowest first
+    python import_report.py --json report.json   # also write machine-readable results
+    python import_report.py --budget-ms 600 --forbid pandas,requests,matplotlib
+
+With --budget-ms or --forbid it exits non-zero when the total import time is
+over budget or a forbidden package is imported at startup, for use in CI.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module="app", python=sys.executable):
+    """[(module, self_us, cumulative_us, depth), ...] for one cold import."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize(rows, module="app"):
+    by_package = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+    for name, self_us, _, _ in rows:
+        package = by_package[name.split(".")[0]]
+        package["self_ms"] += self_us / 1000
+        package["modules"] += 1
+    total = next((c for n, _, c, d in rows if n == module and d == 0), sum(r[1] for r in rows))
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 2),
+        "packages": {
+            name: {"self_ms": round(stats["self_ms"], 2), "modules": stats["modules"]}
+            for name, stats in sorted(by_package.items(), key=lambda kv: -kv[1]["self_ms"])
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-package import time of the app")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=20, help="packages to print")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--budget-ms", type=float, help="fail if the total import time exceeds this")
+    parser.add_argument("--forbid", default="", help="comma-separated packages that must not load")
+    args = parser.parse_args(argv)
+
+    report = summarize(measure(args.module), args.module)
+
+    print(f"import {args.module}: {report['total_ms']:.1f} ms")
+    print(f"{'package':<28}{'self ms':>10}{'modules':>9}")
+    for name, stats in list(report["packages"].items())[:args.top]:
+        print(f"{name:<28}{stats['self_ms']:>10.1f}{stats['modules']:>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        failures.append(f"import took {report['total_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for package in filter(None, args.forbid.split(",")):
+        if package in report["packages"]:
+            failures.append(f"{package} is imported at startup")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,58 +1,50 @@
-import ee
+import argparse
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-# Initialize Earth Engine
-ee.Initialize(project="cwras-landuse")
+from name_index import NameIndex
 
-# Load local files
-locations = pd.read_csv("panchayat_locations.csv")
-master = pd.read_csv("CW_RAS_master_dataset.csv")
+LOCATIONS_CSV = "panchayat_locations.csv"
+MASTER_CSV = "CW_RAS_master_dataset.csv"
+OUTPUT_CSV = "CW_RAS_master_dataset_updated.csv"
+DEFAULT_RADIUS = 5000  # metres
+METRES_PER_DEGREE = 111320.0
 
-# Load ESA WorldCover 2020 (10m resolution)
-landcover = ee.Image("ESA/WorldCover/v100/2020")
+# ESA WorldCover Classes
+# 10 = Tree cover
+# 20 = Shrubland
+# 30 = Grassland
+# 40 = Cropland
+# 50 = Built-up
+# 80 = Permanent water bodies
+# 95 = Mangroves
+URBAN_CLASSES = (50,)
+VEGETATION_CLASSES = (10, 20, 30, 40, 95)
+WATER_CLASSES = (80,)
 
-def get_landcover_percent(lat, lon, radius=5000):
-    point = ee.Geometry.Point(lon, lat)
-    region = point.buffer(radius)
+FALLBACK_PERCENTAGES = (5.0, 80.0, 0.0)  # urban, vegetation, water
 
-    stats = landcover.reduceRegion(
-        reducer=ee.Reducer.frequencyHistogram(),
-        geometry=region,
-        scale=10,
-        maxPixels=1e9
-    ).getInfo()
 
-    if not stats or "Map" not in stats:
+def percentages_from_histogram(histogram):
+    """Class histogram {class: pixel count} -> (urban, vegetation, water) percentages."""
+    if not histogram:
         print("No data found, using safe defaults.")
-        return 5.0, 80.0, 0.0  # fallback values
-
-    histogram = stats["Map"]
+        return FALLBACK_PERCENTAGES
 
     # Convert keys to integers (important safety step)
-    histogram = {int(k): v for k, v in histogram.items()}
-
+    histogram = {int(float(k)): v for k, v in histogram.items()}
     total = sum(histogram.values())
+    if total <= 0:
+        print("No data found, using safe defaults.")
+        return FALLBACK_PERCENTAGES
 
-    # ESA WorldCover Classes
-    # 10 = Tree cover
-    # 20 = Shrubland
-    # 30 = Grassland
-    # 40 = Cropland
-    # 50 = Built-up
-    # 80 = Permanent water bodies
-    # 95 = Mangroves
-
-    urban_pixels = histogram.get(50, 0)
-
-    vegetation_pixels = (
-        histogram.get(10, 0) +   # Tree cover
-        histogram.get(20, 0) +   # Shrubland
-        histogram.get(30, 0) +   # Grassland
-        histogram.get(40, 0) +   # Cropland
-        histogram.get(95, 0)     # Mangroves
-    )
-
-    water_pixels = histogram.get(80, 0)  # Permanent water bodies
+    urban_pixels = sum(histogram.get(c, 0) for c in URBAN_CLASSES)
+    vegetation_pixels = sum(histogram.get(c, 0) for c in VEGETATION_CLASSES)
+    water_pixels = sum(histogram.get(c, 0) for c in WATER_CLASSES)
 
     urban_percent = (urban_pixels / total) * 100
     vegetation_percent = (vegetation_pixels / total) * 100
@@ -61,33 +53,310 @@ def get_landcover_percent(lat, lon, radius=5000):
     return round(urban_percent, 2), round(vegetation_percent, 2), round(water_percent, 2)
 
 
-for _, row in locations.iterrows():
-    print("Processing:", row["Panchayat"])
+# ---------- Land-cover backends ----------
+# A backend turns a list of (key, lat, lon) points into {key: histogram} for
+# circular buffers of `radius` metres. Keys without data may be left out.
+
+class ChunkedBackend:
+    """Base for backends that answer a chunk of buffers per call.
+
+    Subclasses implement _reduce_chunk(points, radius) -> {str(key): histogram};
+    histograms() splits the points into chunks of chunk_size, runs them on
+    max_workers threads and maps the string keys back to the callers' keys.
+    """
+
+    chunk_size = 250
+    max_workers = 1
+
+    def _reduce_chunk(self, points, radius):
+        raise NotImplementedError
+
+    def histograms(self, points, radius=DEFAULT_RADIUS):
+        points = list(points)
+        chunks = [points[i:i + self.chunk_size] for i in range(0, len(points), self.chunk_size)]
+        keys = {str(key): key for key, _, _ in points}
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for chunk_result in pool.map(lambda chunk: self._reduce_chunk(chunk, radius), chunks):
+                results.update({keys[k]: v for k, v in chunk_result.items()})
+        return results
+
+
+class EarthEngineBackend(ChunkedBackend):
+    """ESA WorldCover 2020 (10m) through Google Earth Engine.
+
+    All buffers in a chunk go into one FeatureCollection and are reduced by a
+    single reduceRegions call, so a refresh costs one round trip per chunk
+    instead of one per panchayat. Chunks (kept small enough for EE quotas)
+    run in parallel.
+    """
+
+    def __init__(self, project="cwras-landuse", chunk_size=250, max_workers=4, scale=10):
+        import ee
+
+        ee.Initialize(project=project)
+        self.ee = ee
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.scale = scale
+        self.landcover = ee.Image("ESA/WorldCover/v100/2020")
+
+    def _reduce_chunk(self, points, radius):
+        ee = self.ee
+        features = ee.FeatureCollection([
+            ee.Feature(ee.Geometry.Point(lon, lat).buffer(radius), {"key": str(key)})
+            for key, lat, lon in points
+        ])
+        reduced = self.landcover.reduceRegions(
+            collection=features,
+            reducer=ee.Reducer.frequencyHistogram(),
+            scale=self.scale,
+        ).getInfo()
+
+        histograms = {}
+        for feature in reduced.get("features", []):
+            props = feature.get("properties", {})
+            histogram = props.get("histogram") or props.get("Map")
+            if histogram:
+                histograms[props["key"]] = histogram
+        return histograms
+
+
+class FixtureBackend(ChunkedBackend):
+    """Offline backend serving recorded histograms ({key: {class: count}}),
+    e.g. a JSON dump of a previous Earth Engine run. It goes through the same
+    chunking as EarthEngineBackend, so that path can be exercised offline."""
+
+    def __init__(self, histograms, chunk_size=250, max_workers=1):
+        if isinstance(histograms, str):
+            with open(histograms, encoding="utf-8") as f:
+                histograms = json.load(f)
+        self._histograms = {str(key): value for key, value in histograms.items()}
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def _reduce_chunk(self, points, radius):
+        return {str(key): self._histograms[str(key)] for key, _, _ in points if str(key) in self._histograms}
+
+
+class ArrayTile:
+    """A land-cover tile held as a 2D class array (in memory or np.memmap).
+
+    transform is (lon_origin, pixel_width, lat_origin, pixel_height) in
+    degrees for the top-left corner, with pixel_height negative (north-up).
+    """
+
+    def __init__(self, array, transform):
+        self.array = array
+        self.transform = tuple(float(v) for v in transform)
+        self.shape = array.shape[-2:]
+
+    def read(self, row0, row1, col0, col1):
+        return self.array[row0:row1, col0:col1]
+
+
+class RasterioTile:
+    """A GeoTIFF tile read window by window through rasterio."""
+
+    def __init__(self, path):
+        import rasterio
+        from rasterio.windows import Window
+
+        self._window = Window
+        self.dataset = rasterio.open(path)
+        t = self.dataset.transform
+        self.transform = (t.c, t.a, t.f, t.e)
+        self.shape = (self.dataset.height, self.dataset.width)
+
+    def read(self, row0, row1, col0, col1):
+        return self.dataset.read(1, window=self._window(col0, row0, col1 - col0, row1 - row0))
+
+
+def open_tile(path):
+    """Open a WorldCover tile. .npy tiles (with a "<path>.json" sidecar holding
+    {"transform": [lon0, dx, lat0, dy]}) are memory-mapped; anything else is
+    opened as a GeoTIFF with rasterio."""
+    if path.endswith(".npy"):
+        with open(path + ".json", encoding="utf-8") as f:
+            transform = json.load(f)["transform"]
+        return ArrayTile(np.load(path, mmap_mode="r"), transform)
+    return RasterioTile(path)
+
+
+def convert_tile(tif_path, npy_path):
+    """Decompress a GeoTIFF tile into a memory-mappable .npy + sidecar."""
+    tile = RasterioTile(tif_path)
+    np.save(npy_path, tile.read(0, tile.shape[0], 0, tile.shape[1]))
+    with open(npy_path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"transform": list(tile.transform)}, f)
+
+
+class RasterBackend:
+    """ESA WorldCover from local tiles, no Earth Engine needed.
+
+    Each tile is swept once in horizontal strips: every strip is read with one
+    windowed read (or a memory-mapped slice) and all buffers centred in it are
+    counted from that block with np.bincount. The circular mask is built once
+    per pixel grid and 0.1 degree latitude band. Buffers that straddle tile
+    edges are summed across tiles.
+    """
+
+    NODATA = 0
+
+    def __init__(self, tiles, strip_rows=1024):
+        self.tiles = [open_tile(t) if isinstance(t, str) else t for t in tiles]
+        self.strip_rows = strip_rows
+        self._masks = {}
+
+    def _mask(self, transform, lat, radius):
+        _, dx, _, dy = transform
+        key = (dx, dy, round(lat, 1), radius)
+        mask = self._masks.get(key)
+        if mask is None:
+            ry = radius / (METRES_PER_DEGREE * abs(dy))
+            rx = radius / (METRES_PER_DEGREE * math.cos(math.radians(key[2])) * abs(dx))
+            iy = np.arange(-math.ceil(ry), math.ceil(ry) + 1)[:, None]
+            ix = np.arange(-math.ceil(rx), math.ceil(rx) + 1)[None, :]
+            mask = (iy / ry) ** 2 + (ix / rx) ** 2 <= 1.0
+            self._masks[key] = mask
+        return mask
+
+    def _sweep_tile(self, tile, points, radius, counts):
+        lon0, dx, lat0, dy = tile.transform
+        n_rows, n_cols = tile.shape
+
+        located = []
+        for key, lat, lon in points:
+            mask = self._mask(tile.transform, lat, radius)
+            half_r, half_c = mask.shape[0] // 2, mask.shape[1] // 2
+            row = int(math.floor((lat - lat0) / dy))
+            col = int(math.floor((lon - lon0) / dx))
+            if row + half_r < 0 or row - half_r >= n_rows or col + half_c < 0 or col - half_c >= n_cols:
+                continue  # buffer does not touch this tile
+            located.append((row, col, key, mask))
+        located.sort(key=lambda item: item[0])
+
+        i = 0
+        while i < len(located):
+            strip_end = located[i][0] + self.strip_rows
+            batch = []
+            while i < len(located) and located[i][0] < strip_end:
+                batch.append(located[i])
+                i += 1
+
+            row0 = max(min(r - m.shape[0] // 2 for r, _, _, m in batch), 0)
+            row1 = min(max(r + m.shape[0] // 2 + 1 for r, _, _, m in batch), n_rows)
+            col0 = max(min(c - m.shape[1] // 2 for _, c, _, m in batch), 0)
+            col1 = min(max(c + m.shape[1] // 2 + 1 for _, c, _, m in batch), n_cols)
+            block = np.asarray(tile.read(row0, row1, col0, col1))
+
+            for row, col, key, mask in batch:
+                half_r, half_c = mask.shape[0] // 2, mask.shape[1] // 2
+                r0, r1 = max(row - half_r, row0), min(row + half_r + 1, row1)
+                c0, c1 = max(col - half_c, col0), min(col + half_c + 1, col1)
+                window = block[r0 - row0:r1 - row0, c0 - col0:c1 - col0]
+                clipped = mask[r0 - row + half_r:r1 - row + half_r, c0 - col + half_c:c1 - col + half_c]
+                hist = np.bincount(window[clipped].ravel(), minlength=256)
+                if key in counts:
+                    counts[key] += hist[:len(counts[key])]
+                else:
+                    counts[key] = hist
+
+    def histograms(self, points, radius=DEFAULT_RADIUS):
+        points = list(points)
+        counts = {}
+        for tile in self.tiles:
+            self._sweep_tile(tile, points, radius, counts)
+
+        histograms = {}
+        for key, hist in counts.items():
+            hist[self.NODATA] = 0
+            classes = np.flatnonzero(hist)
+            if len(classes):
+                histograms[key] = {int(c): int(hist[c]) for c in classes}
+        return histograms
+
+
+# ---------- Update ----------
+
+def compute_landuse(locations, backend, radius=DEFAULT_RADIUS):
+    """Land-use percentages for every located panchayat, indexed by Panchayat."""
+    located = locations.dropna(subset=["Latitude", "Longitude"])
+    points = list(zip(located["Panchayat"], located["Latitude"], located["Longitude"]))
+    histograms = backend.histograms(points, radius=radius)
+
+    rows = []
+    for panchayat, _, _ in points:
+        urban, forest, water = percentages_from_histogram(histograms.get(panchayat))
+        print(f"{panchayat}: Urban: {urban}% | Vegetation: {forest}% | Water Body: {water}%")
+        rows.append((panchayat, urban, forest, water))
+
+    return pd.DataFrame(
+        rows, columns=["Panchayat", "Urban_Percent", "Forest_Percent", "Water_Body_Percent"]
+    ).drop_duplicates("Panchayat").set_index("Panchayat")
+
+
+def update_master(master, landuse):
+    """Write the land-use columns into master with one keyed merge; panchayats
+    without a location keep their current values.
+
+    Location rows are matched to master names through NameIndex.canonical (as
+    generate_panchayat_locations.load_existing does), so a row spelled as an
+    alias still updates its panchayat. An exact spelling wins over a variant.
+    """
+    updated = master.copy()
+    keys = updated["Panchayat"]
+    index = NameIndex(keys)
+    rows = {}
+    for name in landuse.index:
+        canonical = index.canonical(name) or name
+        if canonical not in rows or name == canonical:
+            rows[canonical] = name
+    landuse = landuse.loc[list(rows.values())].set_axis(list(rows.keys()))
+    for column in landuse.columns:
+        fresh = keys.map(landuse[column])
+        if column in updated.columns:
+            updated[column] = fresh.fillna(updated[column])
+        else:
+            updated[column] = fresh
+    return updated
+
 
-    urban, forest, water = get_landcover_percent(
-        row["Latitude"],
-        row["Longitude"],
-        radius=5000
-    )
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh land-use percentages from ESA WorldCover")
+    parser.add_argument("--locations", default=LOCATIONS_CSV)
+    parser.add_argument("--master", default=MASTER_CSV)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS)
+    parser.add_argument("--backend", choices=["ee", "raster", "fixture"], default="ee")
+    parser.add_argument("--tiles", nargs="+",
+                        help="local WorldCover tiles (.tif, or .npy + .json sidecar) for --backend raster")
+    parser.add_argument("--fixture", help="JSON histograms for --backend fixture")
+    parser.add_argument("--project", default="cwras-landuse", help="Earth Engine project")
+    parser.add_argument("--chunk-size", type=int, default=250, help="buffers per reduceRegions call")
+    parser.add_argument("--workers", type=int, default=4, help="parallel reduceRegions calls")
+    args = parser.parse_args(argv)
 
-    print(f"Urban: {urban}% | Vegetation: {forest}% | Water Body: {water}%")
+    if args.backend == "fixture":
+        if not args.fixture:
+            parser.error("--backend fixture needs --fixture")
+        backend = FixtureBackend(args.fixture)
+    elif args.backend == "raster":
+        if not args.tiles:
+            parser.error("--backend raster needs --tiles")
+        backend = RasterBackend(args.tiles)
+    else:
+        backend = EarthEngineBackend(args.project, args.chunk_size, args.workers)
 
-    master.loc[
-        master["Panchayat"] == row["Panchayat"],
-        "Urban_Percent"
-    ] = urban
+    # Load local files
+    locations = pd.read_csv(args.locations)
+    master = pd.read_csv(args.master)
 
-    master.loc[
-        master["Panchayat"] == row["Panchayat"],
-        "Forest_Percent"
-    ] = forest
+    landuse = compute_landuse(locations, backend, radius=args.radius)
+    update_master(master, landuse).to_csv(args.output, index=False)
 
-    master.loc[
-        master["Panchayat"] == row["Panchayat"],
-        "Water_Body_Percent"
-    ] = water
+    print("Done. Updated dataset saved with Urban, Forest, and Water Body percentages.")
 
-# Save updated dataset
-master.to_csv("CW_RAS_master_dataset_updated.csv", index=False)
 
-print("Done. Updated dataset saved with Urban, Forest, and Water Body percentages.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Scores at arbitrary coordinates, blended from the nearest panchayats.
+
+Snapping a GPS point to its single nearest centroid gives a point on a
+boundary the full score of whichever neighbour happens to be closer.
+Locator instead blends the k nearest panchayats' scores (the total and
+its rainfall / groundwater / land-use components) by inverse-distance
+weighting, and reports which panchayats contributed and how much.
+
+Lookups are bulk: SpatialIndex.query_many picks the neighbours of every
+point at once, and the distances are then recomputed with a vectorized
+haversine so that a point sitting on a centroid is recognized exactly.
+"""
+import numpy as np
+
+import scoring
+from ranking import RISK_TYPES
+from spatial import SpatialIndex, haversine_km, idw_weights
+
+DEFAULT_NEIGHBOURS = 4
+DEFAULT_POWER = 2.0
+DEFAULT_MAX_KM = 25.0
+FIELDS = ("score", "rainfall_score", "groundwater_score", "landuse_score")
+
+
+class Blend:
+    """Result of Locator.blend for M points.
+
+    neighbours / distances_km / weights are (M, k), closest first; scores is
+    {risk_type: {field: (M,) array}} and levels {risk_type: (M,) level codes}.
+    covered is False for points with no panchayat within max_km.
+    """
+
+    def __init__(self, names, lats, lons, neighbours, distances_km, weights, scores, levels):
+        self.names = names
+        self.lats = lats
+        self.lons = lons
+        self.neighbours = neighbours
+        self.distances_km = distances_km
+        self.weights = weights
+        self.scores = scores
+        self.levels = levels
+        self.covered = weights.sum(axis=1) > 0
+
+    def __len__(self):
+        return len(self.lats)
+
+    def results(self):
+        """JSON-ready dicts, one per point, in input order."""
+        lats, lons = self.lats.tolist(), self.lons.tolist()
+        covered = self.covered.tolist()
+        neighbours = self.neighbours.tolist()
+        distances = np.round(self.distances_km, 3).tolist()
+        weights = np.round(self.weights, 4).tolist()
+        scores = {
+            risk_type: {field: np.round(values, 2).tolist() for field, values in fields.items()}
+            for risk_type, fields in self.scores.items()
+        }
+
+        out = []
+        for i in range(len(lats)):
+            result = {"lat": lats[i], "lon": lons[i]}
+            if not covered[i]:
+                result["error"] = "No panchayat within range."
+                out.append(result)
+                continue
+            for risk_type, fields in scores.items():
+                result[risk_type] = {field: values[i] for field, values in fields.items()}
+                result[risk_type]["level"] = scoring.LEVELS[self.levels[risk_type][i]]
+            result["neighbours"] = [
+                {"panchayat": self.names[pos], "distance_km": km, "weight": weight}
+                for pos, km, weight in zip(neighbours[i], distances[i], weights[i])
+                if weight > 0
+            ]
+            out.append(result)
+        return out
+
+
+class Locator:
+    """Located, scored panchayats of one Dataset."""
+
+    def __init__(self, score_table, location_index):
+        keep = [i for i, name in enumerate(location_index.labels) if (name, RISK_TYPES[0]) in score_table]
+        self.index = SpatialIndex(location_index.lats[keep], location_index.lons[keep],
+                                  [location_index.labels[i] for i in keep])
+        self.names = self.index.labels
+        self.values = {
+            risk_type: {
+                field: np.array([score_table[(name, risk_type)][field] for name in self.names])
+                for field in FIELDS
+            }
+            for risk_type in RISK_TYPES
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    def blend(self, lats, lons, k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER, max_km=DEFAULT_MAX_KM,
+              risk_types=RISK_TYPES):
+        """Blend the k nearest panchayats' scores at each (lat, lon). Returns a Blend."""
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        neighbours, _ = self.index.query_many(lats, lons, k)
+        km = haversine_km(lats[:, None], lons[:, None], self.index.lats[neighbours], self.index.lons[neighbours])
+        order = np.argsort(km, axis=1, kind="stable")
+        neighbours = np.take_along_axis(neighbours, order, axis=1)
+        km = np.take_along_axis(km, order, axis=1)
+        weights = idw_weights(km, power, max_km)
+
+        scores, levels = {}, {}
+        for risk_type in risk_types:
+            scores[risk_type] = {
+                field: (weights * values[neighbours]).sum(axis=1)
+                for field, values in self.values[risk_type].items()
+            }
+            levels[risk_type] = scoring.classify_codes(np.round(scores[risk_type]["score"], 2))
+        return Blend(self.names, lats, lons, neighbours, km, weights, scores, levels)
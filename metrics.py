@@ -0,0 +1,267 @@
+"""Request metrics for CW-RAS in the Prometheus text format.
+
+A deliberately small, dependency-free subset of what prometheus_client does:
+labelled counters and histograms in one registry, rendered by the /metrics
+route. Values are per process; with several workers, scrape each one (or
+put them behind a per-worker port) and let Prometheus sum them.
+
+The request path is timed stage by stage:
+
+    with metrics.stage("geocode"):
+        lat, lon = get_lat_long(place)
+
+feeds cwras_stage_seconds{stage="geocode"}.
+
+SlowRequestProfiler is an optional sampling profiler. While enabled, a
+daemon thread samples the stacks of in-flight requests every few
+milliseconds. Requests slower than the threshold have their samples
+written as collapsed stacks ("frame;frame;frame count" lines), which
+flamegraph.pl, speedscope and inferno read directly.
+"""
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name + "_total", _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(tuple(labels[name] for name in self.labelnames))
+        return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(b), s, c) for key, (b, s, c) in self._series.items()}
+        names = self.labelnames + ("le",)
+        for key, (buckets, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, buckets):
+                cumulative += hits
+                yield self.name + "_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class CallbackGauge:
+    """Gauge read at scrape time from fn(), which returns a number or a
+    {label value: number} dict when there is one label name."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labelnames=()):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        value = self.fn()
+        if not self.labelnames:
+            yield self.name, "", value
+            return
+        for label, item in sorted(value.items()):
+            yield self.name, _format_labels(self.labelnames, (label,)), item
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, fn, labelnames=()):
+        return self.register(CallbackGauge(name, help, fn, labelnames))
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+request_seconds = registry.histogram(
+    "cwras_request_seconds", "Request latency by endpoint.", ("endpoint",))
+stage_seconds = registry.histogram(
+    "cwras_stage_seconds", "Time spent in each stage of the request path.", ("stage",))
+resolutions = registry.counter(
+    "cwras_resolutions", "Place names resolved locally, by geocoding, or not at all.", ("method",))
+geocode_failures = registry.counter(
+    "cwras_geocode_failures", "Geocoding calls that raised (network errors, bad responses).")
+slow_profiles = registry.counter(
+    "cwras_slow_request_profiles", "Profiles written for slow requests.")
+
+
+def stage(name):
+    """Context manager timing one stage of the request path."""
+    return stage_seconds.time(stage=name)
+
+
+# ---------- SLOW REQUEST PROFILER ----------
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class SlowRequestProfiler:
+    """Samples in-flight requests and keeps the profiles of slow ones.
+
+    begin() / end() bracket a request on the calling thread; end() returns
+    the path of the written profile, or None when the request was fast.
+    """
+
+    def __init__(self, output_dir="profiles", threshold=0.5, interval=0.005):
+        self.output_dir = output_dir
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._sequence = itertools.count(1)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            # Under the lock, so end() never sees a tally still being counted
+            with self._lock:
+                for thread_id, (_, _, samples) in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != me:
+                        samples[_collapse(frame)] += 1
+
+    def begin(self, label):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="cwras-profiler", daemon=True)
+                    self._thread.start()
+        with self._lock:
+            self._active[threading.get_ident()] = (label, time.perf_counter(), _Tally())
+
+    def end(self):
+        with self._lock:
+            entry = self._active.pop(threading.get_ident(), None)
+        if entry is None:
+            return None
+        label, start, samples = entry
+        elapsed = time.perf_counter() - start
+        if elapsed < self.threshold or not samples:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label)
+        # pid and sequence number: timestamps only have one-second resolution
+        path = os.path.join(self.output_dir,
+                            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._sequence)}"
+                            f"-{safe_label}-{elapsed * 1000:.0f}ms.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        slow_profiles.inc()
+        return path
@@ -0,0 +1,215 @@
+"""Panchayat name index.
+
+Built once at load time so a typed place name can be resolved to a canonical
+panchayat without scanning the dataset or calling the geocoder. Lookups try,
+in order:
+
+1. exact match on the normalized name (case, spaces and the dataset's
+   asterisk markers ignored), "(M)" / "(C)" suffixes optional, and any
+   aliases from panchayat_aliases.csv (Malayalam script, transliterations,
+   common misspellings);
+2. a loose transliteration key, so "Karipra" or "Tekkumbagam" still match;
+3. an unambiguous prefix ("sasthamk" -> Sasthamkotta);
+4. fuzzy match within a bounded edit distance, through a BK-tree.
+
+Exact, transliteration and prefix lookups are dict hits. The alias file is
+optional and has two columns, Alias,Panchayat.
+"""
+import csv
+import os
+import re
+
+MIN_PREFIX_LENGTH = 4
+_SUFFIX = re.compile(r"\s*\((m|c)\)\s*$")
+_DISPLAY_SUFFIX = re.compile(r"\s*\((m|c)\)\s*$", re.IGNORECASE)
+_ASPIRATED = re.compile(r"([bcdgkpt])h")
+_REPEATS = re.compile(r"(.)\1+")
+# Pre-Unicode 5.1 chillu letters (consonant + virama + ZWJ), still typed by
+# older Malayalam keyboards, and the atomic letters panchayat_aliases.csv uses
+_OLD_CHILLU = re.compile("([\u0d23\u0d28\u0d30\u0d32\u0d33\u0d15])\u0d4d\u200d")
+_CHILLU = {"\u0d23": "\u0d7a", "\u0d28": "\u0d7b", "\u0d30": "\u0d7c",
+           "\u0d32": "\u0d7d", "\u0d33": "\u0d7e", "\u0d15": "\u0d7f"}
+
+
+def normalize_name(name):
+    """Lower-case, drop asterisk markers, collapse whitespace and use atomic
+    Malayalam chillu letters."""
+    name = _OLD_CHILLU.sub(lambda m: _CHILLU[m.group(1)], str(name))
+    return " ".join(name.replace("*", " ").lower().split())
+
+
+def display_name(name):
+    """Canonical dataset name for display: asterisk markers and the "(M)" /
+    "(C)" suffix dropped, case kept ("Kollam(C)*" -> "Kollam")."""
+    return _DISPLAY_SUFFIX.sub("", " ".join(str(name).replace("*", " ").split()))
+
+
+def transliteration_key(name):
+    """Loose key that folds common Malayalam romanization variants together
+    (ee/i, oo/u, aspirated consonants, doubled letters, w/v, spacing)."""
+    key = normalize_name(name)
+    key = _SUFFIX.sub("", key)
+    key = key.replace("ee", "i").replace("oo", "u").replace("w", "v").replace("zh", "l")
+    key = _ASPIRATED.sub(r"\1", key)
+    key = re.sub(r"[^a-z]", "", key)
+    return _REPEATS.sub(r"\1", key)
+
+
+def _script(key):
+    """"malayalam" for keys written in Malayalam script, else "latin"."""
+    return "malayalam" if any("\u0d00" <= c <= "\u0d7f" for c in key) else "latin"
+
+
+def edit_distance(a, b):
+    """Levenshtein distance."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def max_edits_for(query):
+    """Edit budget that grows with query length: short names must be close."""
+    if len(query) <= 4:
+        return 0
+    if len(query) <= 8:
+        return 1
+    if len(query) <= 14:
+        return 2
+    return 3
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings for bounded edit-distance search."""
+
+    def __init__(self, words=()):
+        self._root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            d = edit_distance(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """[(distance, word), ...] within max_distance, closest first."""
+        if self._root is None:
+            return []
+        hits, stack = [], [self._root]
+        while stack:
+            candidate, children = stack.pop()
+            d = edit_distance(word, candidate)
+            if d <= max_distance:
+                hits.append((d, candidate))
+            for edge, child in children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+        return sorted(hits)
+
+
+def load_aliases(path="panchayat_aliases.csv"):
+    """Read Alias,Panchayat pairs; no path or a missing file means no aliases."""
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8", newline="") as f:
+        return {row["Alias"]: row["Panchayat"] for row in csv.DictReader(f) if row.get("Alias")}
+
+
+class NameIndex:
+    """Maps typed names to canonical panchayat names."""
+
+    def __init__(self, names, aliases=None):
+        self.names = list(dict.fromkeys(names))
+        self._exact = {}
+        self._loose = {}
+        self._prefix = {}
+
+        variants = {}
+        for name in self.names:
+            key = normalize_name(name)
+            self._exact.setdefault(key, name)
+            self._add_unique(variants, _SUFFIX.sub("", key), name)
+            self._add_unique(self._loose, transliteration_key(name), name)
+
+        known = set(self.names)
+        for alias, name in (aliases or {}).items():
+            if name in known:
+                self._add_unique(variants, normalize_name(alias), name)
+
+        for key, name in variants.items():
+            if name is not None:
+                self._exact.setdefault(key, name)
+
+        for key, name in self._exact.items():
+            for end in range(MIN_PREFIX_LENGTH, len(key) + 1):
+                self._add_unique(self._prefix, key[:end], name)
+
+        # One tree per script: a romanized query is never within the edit
+        # budget of a Malayalam alias, so it need not be compared with one
+        self._exact_keys = {}
+        for key in self._exact:
+            self._exact_keys.setdefault(_script(key), BKTree()).add(key)
+
+    @staticmethod
+    def _add_unique(mapping, key, name):
+        # A key shared by two different panchayats is ambiguous: keep neither
+        if not key:
+            return
+        existing = mapping.get(key, name)
+        mapping[key] = name if existing == name else None
+
+    def exact(self, query):
+        return self._exact.get(normalize_name(query))
+
+    def prefix(self, query):
+        key = normalize_name(query)
+        if len(key) < MIN_PREFIX_LENGTH:
+            return None
+        return self._prefix.get(key)
+
+    def fuzzy(self, query, max_distance=None):
+        """Closest canonical name within the edit budget, or None if there is
+        none or the best distance is shared by two panchayats."""
+        key = normalize_name(query)
+        if max_distance is None:
+            max_distance = max_edits_for(key)
+        tree = self._exact_keys.get(_script(key))
+        hits = tree.search(key, max_distance) if tree is not None else []
+        if not hits:
+            return None
+        best = {self._exact[word] for d, word in hits if d == hits[0][0]}
+        return best.pop() if len(best) == 1 else None
+
+    def canonical(self, name):
+        """Exact or transliteration match only, for joining names across data
+        files, where a prefix or fuzzy guess could pair the wrong rows."""
+        return self.exact(name) or self._loose.get(transliteration_key(name))
+
+    def lookup(self, query):
+        """Canonical panchayat for a typed name, or None to fall back to geocoding."""
+        return (
+            self.exact(query)
+            or self._loose.get(transliteration_key(query))
+            or self.prefix(query)
+            or self.fuzzy(query)
+        )
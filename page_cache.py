@@ -0,0 +1,61 @@
+"""Rendered-page cache for the dashboard.
+
+There are only (panchayats × risk types) distinct dashboards per dataset
+version, so each one is rendered once and the HTML is kept with a content
+ETag and a Last-Modified time for conditional requests. Entries are keyed by
+(panchayat, risk_type, dataset version); the app calls invalidate() from the
+dataset swap hook so old pages are dropped as soon as a new version is live.
+"""
+import hashlib
+import threading
+
+
+class CachedPage:
+    """One rendered page and its validators."""
+
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, body, last_modified):
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+        self.last_modified = last_modified
+
+
+class PageCache:
+    """Thread-safe {(panchayat, risk_type, version): CachedPage}.
+
+    Pages for any version other than the live one are never stored, so a
+    request that started before a swap cannot put a stale page back.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def get_or_render(self, panchayat, risk_type, version, render, last_modified):
+        """Cached page for the key, calling render() -> str on a miss."""
+        key = (panchayat, risk_type, version)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self.hits += 1
+                return page
+            self.misses += 1
+
+        page = CachedPage(render(), last_modified)
+        with self._lock:
+            if version == self.version:
+                page = self._pages.setdefault(key, page)
+        return page
+
+    def invalidate(self, version):
+        """Drop every page and only accept pages for version from now on."""
+        with self._lock:
+            self.version = version
+            self._pages = {}
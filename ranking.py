@@ -0,0 +1,69 @@
+"""Ranked and range queries over the precomputed scores.
+
+RiskRanking is built once per dataset version from Dataset.score_table.
+For every risk type it sorts the panchayats by score, highest first (ties
+by name). It then keeps one pre-filtered list per (land-use type, level)
+combination, each with a parallel array of negated scores for bisection.
+
+A query picks its list and bisects for the score bounds. The result is
+the slice [offset, offset + limit), so cost is O(log n + k) however many
+panchayats there are, and nothing is rescored.
+"""
+import bisect
+
+import scoring
+
+RISK_TYPES = ("flood", "scarcity")
+LANDUSE_TYPES = ("Urban-dominant", "Semi-urban", "Rural / Forest-dominant")
+LANDUSE_ALIASES = {
+    "urban": "Urban-dominant",
+    "urban-dominant": "Urban-dominant",
+    "semi-urban": "Semi-urban",
+    "rural": "Rural / Forest-dominant",
+    "forest": "Rural / Forest-dominant",
+    "rural / forest-dominant": "Rural / Forest-dominant",
+}
+
+
+def landuse_type(value):
+    """Canonical land-use type for a filter value ("urban", "Semi-urban", ...), or None."""
+    return LANDUSE_ALIASES.get(value.strip().lower()) if value else None
+
+
+class RiskRanking:
+    def __init__(self, score_table):
+        self._lists = {}
+        for risk_type in RISK_TYPES:
+            rows = sorted(
+                ((name, row) for (name, kind), row in score_table.items() if kind == risk_type),
+                key=lambda item: (-item[1]["score"], item[0]),
+            )
+            for landuse in (None, *LANDUSE_TYPES):
+                for level in (None, *scoring.LEVELS):
+                    self._lists[(risk_type, landuse, level)] = ([], [])
+
+            for rank, (name, row) in enumerate(rows, start=1):
+                entry = {
+                    "rank": rank,
+                    "panchayat": name,
+                    "score": row["score"],
+                    "level": row["level"],
+                    "landuse_type": row["landuse_type"],
+                }
+                for landuse in (None, row["landuse_type"]):
+                    for level in (None, row["level"]):
+                        entries, keys = self._lists[(risk_type, landuse, level)]
+                        entries.append(entry)
+                        keys.append(-row["score"])
+
+    def query(self, risk_type, landuse=None, level=None, min_score=None, max_score=None,
+              offset=0, limit=20):
+        """(total, entries): the panchayats with min_score <= score <= max_score
+        (both optional), optionally only one land-use type and/or level,
+        ranked highest first and paginated."""
+        entries, keys = self._lists[(risk_type, landuse, level)]
+        lo = 0 if max_score is None else bisect.bisect_left(keys, -max_score)
+        hi = len(keys) if min_score is None else bisect.bisect_right(keys, -min_score)
+        total = max(hi - lo, 0)
+        start = lo + offset
+        return total, entries[start:max(min(start + limit, hi), start)]
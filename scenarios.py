@@ -0,0 +1,253 @@
+"""What-if scenario sweeps over the scoring parameters.
+
+A scenario is one set of values for the constants in scoring.py (weights,
+MAX_GW_CHANGE, the SWF divisor and floor, the flood boost factor and the
+level cutoffs). sweep() scores every region under every scenario in one
+pass: parameters become (scenarios, 1) columns, the data (1, regions) rows,
+and the scoring functions broadcast them into (scenarios, regions) tensors.
+Scenarios are processed in chunks so memory stays bounded however large the
+grid is.
+
+    import scenarios
+    grid = scenarios.grid(flood_w_rain=[0.3, 0.4, 0.5], max_gw_change=[2, 3, 4])
+    result = scenarios.sweep(dataset_columns, grid)
+    result.flood_changed      # regions whose flood level differs from today's, per scenario
+
+    python scenarios.py --set flood_w_rain=0.3:0.5:5 --set max_gw_change=2,3,4 --output sweep.csv
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+import scoring
+
+PARAMETERS = {
+    "flood_w_rain": scoring.FLOOD_WEIGHTS[0],
+    "flood_w_land": scoring.FLOOD_WEIGHTS[1],
+    "flood_w_gw": scoring.FLOOD_WEIGHTS[2],
+    "scarcity_w_rain": scoring.SCARCITY_WEIGHTS[0],
+    "scarcity_w_gw": scoring.SCARCITY_WEIGHTS[1],
+    "scarcity_w_land": scoring.SCARCITY_WEIGHTS[2],
+    "max_gw_change": scoring.MAX_GW_CHANGE,
+    "swf_divisor": scoring.SWF_DIVISOR,
+    "swf_floor": scoring.SWF_FLOOR,
+    "flood_boost_factor": scoring.FLOOD_BOOST_FACTOR,
+    "low_cutoff": scoring.LOW_CUTOFF,
+    "high_cutoff": scoring.HIGH_CUTOFF,
+}
+
+# Keep each (chunk, regions) intermediate around a few MB
+DEFAULT_CHUNK_ELEMENTS = 1 << 20
+
+
+def grid(**axes):
+    """Cartesian product of the given parameter values.
+
+    Returns {parameter: 1-D array} with one entry per scenario; parameters
+    that are not given keep their current value. Raises ValueError for an
+    unknown parameter name.
+    """
+    unknown = set(axes) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    names = list(axes)
+    combos = list(itertools.product(*(np.atleast_1d(axes[name]) for name in names)))
+    scenarios = {name: np.full(max(len(combos), 1), value, dtype=float)
+                 for name, value in PARAMETERS.items()}
+    for i, name in enumerate(names):
+        scenarios[name] = np.array([combo[i] for combo in combos], dtype=float)
+    return scenarios
+
+
+def from_records(records):
+    """Scenarios from a list of {parameter: value} dicts (missing = current)."""
+    unknown = {key for record in records for key in record} - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    return {name: np.array([record.get(name, default) for record in records], dtype=float)
+            for name, default in PARAMETERS.items()}
+
+
+class SweepResult:
+    """Scores and level changes for every (scenario, region) pair.
+
+    flood / scarcity are (scenarios, regions) score tensors (None when the
+    sweep ran with keep_scores=False); flood_levels / scarcity_levels are
+    the matching int8 level codes (0 Low, 1 Moderate, 2 High). The summary
+    arrays are always filled in:
+
+        flood_changed[s]        regions whose flood level differs from the baseline
+        flood_level_counts[s]   regions per level, shape (scenarios, 3)
+        flood_flip_rate[r]      share of scenarios that change region r's level
+        flood_min/max[r]        score range of region r across scenarios
+
+    and the same for scarcity. The baseline is the current scoring.py
+    constants.
+    """
+
+    def __init__(self, scenarios, regions, baseline):
+        self.scenarios = scenarios
+        self.regions = regions
+        self.baseline = baseline
+        self.flood = self.scarcity = None
+        self.flood_levels = self.scarcity_levels = None
+
+    def summary(self):
+        """One row per scenario: its parameters plus the per-scenario stats,
+        as {column: array} (ready for pandas.DataFrame)."""
+        rows = dict(self.scenarios)
+        for risk in ("flood", "scarcity"):
+            counts = getattr(self, f"{risk}_level_counts")
+            rows[f"{risk}_changed"] = getattr(self, f"{risk}_changed")
+            rows[f"{risk}_mean"] = getattr(self, f"{risk}_mean")
+            for code, level in enumerate(scoring.LEVELS):
+                rows[f"{risk}_{level.lower()}"] = counts[:, code]
+        return rows
+
+
+def _prepare(columns):
+    """The parameter-free parts of the score, as (1, regions) rows."""
+    gw_last = scoring._as_float(columns["GW_last"])
+    gw_current = scoring._as_float(columns["GW_current"])
+    try:
+        water = scoring._as_float(columns["Water_Body_Percent"])
+    except KeyError:
+        water = np.zeros(len(gw_last))
+    return {
+        "r": scoring.rainfall_score(columns["R_normal"], columns["R_current"])[None, :],
+        "l": scoring.landuse_score(columns["Urban_Percent"], columns["Forest_Percent"])[None, :],
+        "gw_last": gw_last[None, :],
+        "gw_current": gw_current[None, :],
+        "water": water[None, :],
+    }
+
+
+def _score(data, params):
+    """(flood, scarcity) for parameter columns of shape (chunk, 1)."""
+    g = scoring.groundwater_score(data["gw_last"], data["gw_current"], params["max_gw_change"])
+    g_flood = np.where(scoring.groundwater_rising(data["gw_last"], data["gw_current"]), g, 0.0)
+    swf = scoring.surface_water_factor(data["water"], params["swf_divisor"], params["swf_floor"])
+    boost = scoring.flood_boost(data["water"], params["flood_boost_factor"])
+
+    flood = scoring.flood_risk(
+        data["r"], data["l"], g_flood, boost,
+        (params["flood_w_rain"], params["flood_w_land"], params["flood_w_gw"]),
+    )
+    scarcity = scoring.scarcity_risk(
+        data["r"], g, data["l"], swf,
+        (params["scarcity_w_rain"], params["scarcity_w_gw"], params["scarcity_w_land"]),
+    )
+    return flood, scarcity
+
+
+def sweep(columns, scenarios, keep_scores=True, chunk_elements=DEFAULT_CHUNK_ELEMENTS):
+    """Score every region in columns under every scenario.
+
+    columns is anything score_columns accepts (DataFrame, dict of arrays,
+    Dataset.risk_columns); scenarios comes from grid() or from_records().
+    With keep_scores=False only the summaries are kept, which lets very
+    large grids run in constant memory.
+    """
+    data = _prepare(columns)
+    n_regions = data["r"].shape[1]
+    n_scenarios = len(next(iter(scenarios.values())))
+    params = {name: np.asarray(scenarios.get(name, np.full(n_scenarios, default)), dtype=float)
+              for name, default in PARAMETERS.items()}
+
+    baseline_params = {name: np.array([[value]], dtype=float) for name, value in PARAMETERS.items()}
+    base_flood, base_scarcity = _score(data, baseline_params)
+    baseline = {
+        "flood": base_flood[0],
+        "scarcity": base_scarcity[0],
+        "flood_levels": scoring.classify_codes(base_flood[0]),
+        "scarcity_levels": scoring.classify_codes(base_scarcity[0]),
+    }
+
+    regions = list(columns["Panchayat"]) if "Panchayat" in columns else list(range(n_regions))
+    result = SweepResult(params, regions, baseline)
+    if keep_scores:
+        for risk in ("flood", "scarcity"):
+            setattr(result, risk, np.empty((n_scenarios, n_regions)))
+            setattr(result, f"{risk}_levels", np.empty((n_scenarios, n_regions), dtype=np.int8))
+    for risk in ("flood", "scarcity"):
+        setattr(result, f"{risk}_changed", np.zeros(n_scenarios, dtype=np.int64))
+        setattr(result, f"{risk}_mean", np.zeros(n_scenarios))
+        setattr(result, f"{risk}_level_counts", np.zeros((n_scenarios, 3), dtype=np.int64))
+        setattr(result, f"{risk}_flip_rate", np.zeros(n_regions))
+        setattr(result, f"{risk}_min", np.full(n_regions, np.inf))
+        setattr(result, f"{risk}_max", np.full(n_regions, -np.inf))
+
+    chunk = max(1, chunk_elements // max(n_regions, 1))
+    for lo in range(0, n_scenarios, chunk):
+        hi = min(lo + chunk, n_scenarios)
+        block = {name: values[lo:hi, None] for name, values in params.items()}
+        for risk, scores in zip(("flood", "scarcity"), _score(data, block)):
+            levels = scoring.classify_codes(scores, block["low_cutoff"], block["high_cutoff"])
+            changed = levels != baseline[f"{risk}_levels"]
+
+            getattr(result, f"{risk}_changed")[lo:hi] = changed.sum(axis=1)
+            getattr(result, f"{risk}_mean")[lo:hi] = scores.mean(axis=1)
+            counts = getattr(result, f"{risk}_level_counts")
+            for code in range(3):
+                counts[lo:hi, code] = (levels == code).sum(axis=1)
+            getattr(result, f"{risk}_flip_rate")[:] += changed.sum(axis=0)
+            np.minimum(getattr(result, f"{risk}_min"), scores.min(axis=0), out=getattr(result, f"{risk}_min"))
+            np.maximum(getattr(result, f"{risk}_max"), scores.max(axis=0), out=getattr(result, f"{risk}_max"))
+            if keep_scores:
+                getattr(result, risk)[lo:hi] = scores
+                getattr(result, f"{risk}_levels")[lo:hi] = levels
+
+    for risk in ("flood", "scarcity"):
+        getattr(result, f"{risk}_flip_rate")[:] /= max(n_scenarios, 1)
+    return result
+
+
+def parse_values(spec):
+    """ "0.3:0.5:5" -> 5 evenly spaced values, "2,3,4" -> a list."""
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return [float(value) for value in spec.split(",")]
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from dataset import RISK_CSV
+
+    parser = argparse.ArgumentParser(description="Sweep the CW-RAS scoring parameters")
+    parser.add_argument("--input", default=RISK_CSV)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUES",
+                        help="parameter values as a,b,c or start:stop:num; repeat per parameter "
+                             f"({', '.join(PARAMETERS)})")
+    parser.add_argument("--output", default="scenario_sweep.csv", help="per-scenario summary CSV")
+    parser.add_argument("--regions", help="also write per-region flip rates and score ranges here")
+    args = parser.parse_args(argv)
+
+    axes = {}
+    for item in args.set:
+        name, _, values = item.partition("=")
+        axes[name.strip()] = parse_values(values)
+
+    df = pd.read_csv(args.input)
+    result = sweep(df, grid(**axes), keep_scores=False)
+    pd.DataFrame(result.summary()).to_csv(args.output, index=False)
+    print(f"{len(result.flood_changed)} scenarios x {len(result.regions)} regions -> {args.output}")
+
+    if args.regions:
+        pd.DataFrame({
+            "Panchayat": result.regions,
+            "FloodLevel": np.asarray(scoring.LEVELS, dtype=object)[result.baseline["flood_levels"]],
+            "FloodFlipRate": result.flood_flip_rate,
+            "FloodMin": result.flood_min,
+            "FloodMax": result.flood_max,
+            "ScarcityLevel": np.asarray(scoring.LEVELS, dtype=object)[result.baseline["scarcity_levels"]],
+            "ScarcityFlipRate": result.scarcity_flip_rate,
+            "ScarcityMin": result.scarcity_min,
+            "ScarcityMax": result.scarcity_max,
+        }).to_csv(args.regions, index=False)
+
+
+if __name__ == "__main__":
+    main()
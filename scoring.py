@@ -0,0 +1,161 @@
+"""CW-RAS scoring engine: vectorized NumPy versions of the risk formulas.
+
+Every function takes whole columns (arrays, Series or scalars) and returns
+score arrays, so app.py, Secondary Files/CW_RAS.py and the verification
+scripts all share one definition of the formulas.
+
+The tunable constants are keyword arguments defaulting to the module
+constants. They broadcast like the data, so scenarios.py can pass
+(scenarios, 1) parameter columns against (1, regions) data rows and score
+every scenario at once.
+"""
+import numpy as np
+
+MAX_GW_CHANGE = 3.0      # metres, groundwater change that maps to a score of 100
+SWF_DIVISOR = 50.0       # Water_Body_Percent at which SWF bottoms out
+SWF_FLOOR = 0.1
+FLOOD_BOOST_FACTOR = 1.2
+
+FLOOD_WEIGHTS = (0.4, 0.4, 0.2)      # rainfall, land use, rising groundwater
+SCARCITY_WEIGHTS = (0.4, 0.4, 0.2)   # rainfall, groundwater, land use
+
+LOW_CUTOFF = 30
+HIGH_CUTOFF = 60
+LEVELS = ("Low", "Moderate", "High")
+_LEVEL_NAMES = np.array(LEVELS, dtype=object)
+
+SCORE_COLUMNS = (
+    "R_score", "G_score", "G_Flood_Score", "L_score",
+    "SWF", "FloodBoost", "FloodRisk_Base", "FloodRisk",
+    "ScarcityRisk", "FloodRiskLevel", "ScarcityRiskLevel",
+)
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=float)
+
+
+def rainfall_score(r_normal, r_current):
+    """Rainfall deviation normalized to 0-100, capped at 100. Zero normal scores 0."""
+    r_normal = _as_float(r_normal)
+    r_current = _as_float(r_current)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dev = np.abs(r_normal - r_current) / r_normal * 100
+    return np.where(r_normal == 0, 0.0, np.minimum(dev, 100))
+
+
+def groundwater_score(gw_last, gw_current, max_change=MAX_GW_CHANGE):
+    """Groundwater change magnitude normalized to 0-100 using 3m reference max.
+    Missing readings score 0."""
+    gw_last = _as_float(gw_last)
+    gw_current = _as_float(gw_current)
+    score = np.minimum(np.abs(gw_last - gw_current) / max_change * 100, 100)
+    return np.where(np.isnan(score), 0.0, score)
+
+
+def groundwater_rising(gw_last, gw_current):
+    """True where the water table rose. GW is in mbgl, so a rise means
+    GW_current < GW_last. Missing readings are never rising."""
+    return _as_float(gw_current) < _as_float(gw_last)
+
+
+def groundwater_flood_score(gw_last, gw_current, max_change=MAX_GW_CHANGE):
+    """Directional groundwater score: only a rising water table adds flood risk."""
+    return np.where(
+        groundwater_rising(gw_last, gw_current),
+        groundwater_score(gw_last, gw_current, max_change),
+        0.0,
+    )
+
+
+def landuse_score(urban_pct, forest_pct):
+    """Land-use score normalized to 0-100. Higher = more runoff-prone.
+    Missing percentages count as 0."""
+    urban = np.nan_to_num(_as_float(urban_pct))
+    forest = np.nan_to_num(_as_float(forest_pct))
+    return np.minimum((urban / 100) * 50 + ((100 - forest) / 100) * 50, 100)
+
+
+def surface_water_factor(water_body_pct, divisor=SWF_DIVISOR, floor=SWF_FLOOR):
+    """Surface Water Factor: moderates scarcity for lake-adjacent areas.
+    SWF = max(1.0 - (Water_Body_Percent / 50), 0.1), and 1.0 when there is no
+    (or unknown) water body. Range: [0.1, 1.0]."""
+    water = _as_float(water_body_pct)
+    swf = np.maximum(1.0 - water / divisor, floor)
+    return np.where(np.isnan(water) | (water <= 0), 1.0, swf)
+
+
+def flood_boost(water_body_pct, factor=FLOOD_BOOST_FACTOR):
+    """Flood boost from lake proximity: Water_Body_Percent * 1.2 (missing = 0)."""
+    return np.nan_to_num(_as_float(water_body_pct)) * factor
+
+
+def flood_risk_base(r_score, l_score, g_flood_score, weights=FLOOD_WEIGHTS):
+    w_rain, w_land, w_gw = weights
+    return w_rain * _as_float(r_score) + w_land * _as_float(l_score) + w_gw * _as_float(g_flood_score)
+
+
+def flood_risk(r_score, l_score, g_flood_score, boost, weights=FLOOD_WEIGHTS):
+    """Final flood score = min(base + boost, 100)."""
+    base = flood_risk_base(r_score, l_score, g_flood_score, weights)
+    return np.minimum(base + _as_float(boost), 100)
+
+
+def scarcity_risk(r_score, g_score, l_score, swf, weights=SCARCITY_WEIGHTS):
+    """Scarcity score = (0.4*R + 0.4*G + 0.2*L) * SWF."""
+    w_rain, w_gw, w_land = weights
+    base = w_rain * _as_float(r_score) + w_gw * _as_float(g_score) + w_land * _as_float(l_score)
+    return base * _as_float(swf)
+
+
+def classify_codes(scores, low=LOW_CUTOFF, high=HIGH_CUTOFF):
+    """Level codes 0 (Low, <30), 1 (Moderate, <60) or 2 (High) as int8.
+    NaN falls through to High, like the scalar classify_level."""
+    scores = _as_float(scores)
+    codes = np.full(scores.shape, 2, dtype=np.int8)
+    codes[scores < high] = 1
+    codes[scores < low] = 0
+    return codes
+
+
+def classify(scores):
+    """Map scores to "Low", "Moderate" or "High" (object array)."""
+    return np.asarray(_LEVEL_NAMES[classify_codes(scores)], dtype=object)
+
+
+def score_columns(columns):
+    """Score whole columns at once.
+
+    columns is anything indexable by the master dataset column names (a
+    DataFrame, a dict of arrays, ...). Water_Body_Percent is optional.
+    Returns a dict of arrays named as in CW_RAS_output_results.csv.
+    """
+    r = rainfall_score(columns["R_normal"], columns["R_current"])
+    g = groundwater_score(columns["GW_last"], columns["GW_current"])
+    g_flood = groundwater_flood_score(columns["GW_last"], columns["GW_current"])
+    lu = landuse_score(columns["Urban_Percent"], columns["Forest_Percent"])
+
+    try:
+        water = columns["Water_Body_Percent"]
+    except KeyError:
+        water = np.zeros(len(r))
+    swf = surface_water_factor(water)
+    boost = flood_boost(water)
+
+    flood_base = flood_risk_base(r, lu, g_flood)
+    flood = np.minimum(flood_base + boost, 100)
+    scarcity = scarcity_risk(r, g, lu, swf)
+
+    return {
+        "R_score": r,
+        "G_score": g,
+        "G_Flood_Score": g_flood,
+        "L_score": lu,
+        "SWF": swf,
+        "FloodBoost": boost,
+        "FloodRisk_Base": flood_base,
+        "FloodRisk": flood,
+        "ScarcityRisk": scarcity,
+        "FloodRiskLevel": classify(flood),
+        "ScarcityRiskLevel": classify(scarcity),
+    }
@@ -0,0 +1,278 @@
+"""Spatial index for nearest-panchayat lookups.
+
+Points are stored as 3D unit vectors in a KD-tree, so nearest and k-nearest
+queries take O(log N) instead of a Python haversine loop over every row.
+Straight-line (chord) distance between unit vectors orders points exactly as
+great-circle distance does, and is converted back to kilometres on the way
+out.
+"""
+import heapq
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_LEAF_SIZE = 16
+BRUTE_FORCE_MAX_POINTS = 256    # query_many scans every point up to this size
+BLOCK_ELEMENTS = 1 << 20        # query x point distances held at once by query_many
+
+
+def to_unit_vectors(lats, lons):
+    """(lat, lon) in degrees -> (N, 3) unit vectors."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    """Chord length between unit vectors -> great-circle distance in km."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord, dtype=float) / 2, 1.0))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized haversine distance in km; inputs broadcast against each other."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def idw_weights(km, power=2.0, max_km=np.inf, snap_km=1e-3):
+    """Inverse-distance weights for (M, k) neighbour distances, closest first.
+
+    Each row sums to 1. Neighbours beyond max_km get no weight, a row whose
+    closest neighbour is within snap_km takes that neighbour alone, and a
+    row with nothing in range is all zeros.
+    """
+    km = np.asarray(km, dtype=float)
+    weights = 1.0 / np.maximum(km, snap_km) ** power
+    weights[km > max_km] = 0.0
+    snapped = km[:, 0] < snap_km
+    weights[snapped] = 0.0
+    weights[snapped, 0] = 1.0
+    total = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, total, out=np.zeros_like(weights), where=total > 0)
+
+
+class SpatialIndex:
+    """KD-tree over (lat, lon) points.
+
+    labels are returned with each hit (defaults to the row position). Points
+    with missing coordinates are left out of the index.
+    """
+
+    def __init__(self, lats, lons, labels=None, leaf_size=DEFAULT_LEAF_SIZE):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if labels is None:
+            labels = np.arange(len(lats))
+        labels = list(labels)
+
+        valid = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.labels = [labels[i] for i in valid]
+        self.leaf_size = max(int(leaf_size), 1)
+
+        points = to_unit_vectors(self.lats, self.lons).reshape(-1, 3)
+        self._build(points)
+
+    def __len__(self):
+        return len(self.labels)
+
+    # ---------- Build ----------
+    def _build(self, points):
+        order = np.arange(len(points))
+        # Node arrays: split dimension (-1 for leaves), split value, children,
+        # and the [start, end) slice of the permuted points for leaves.
+        self._dim, self._split, self._left, self._right = [], [], [], []
+        self._start, self._end = [], []
+
+        def new_node(start, end):
+            for column, value in ((self._dim, -1), (self._split, 0.0), (self._left, -1),
+                                  (self._right, -1), (self._start, start), (self._end, end)):
+                column.append(value)
+            return len(self._dim) - 1
+
+        if len(points):
+            stack = [new_node(0, len(points))]
+            while stack:
+                node = stack.pop()
+                start, end = self._start[node], self._end[node]
+                if end - start <= self.leaf_size:
+                    continue
+                block = points[order[start:end]]
+                dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+                mid = (end - start) // 2
+                part = np.argpartition(block[:, dim], mid)
+                order[start:end] = order[start:end][part]
+                self._dim[node] = dim
+                self._split[node] = float(points[order[start + mid], dim])
+                self._left[node] = new_node(start, start + mid)
+                self._right[node] = new_node(start + mid, end)
+                stack.extend((self._left[node], self._right[node]))
+
+        self._order = order
+        self._points = points[order]
+
+        # Flat copies for query_many: the tree as arrays, and every leaf's
+        # slice of _points and bounding box, in slice order.
+        self._tree = tuple(np.asarray(column) for column in (self._dim, self._split, self._left, self._right))
+        leaves = np.flatnonzero(self._tree[0] < 0)
+        leaves = leaves[np.argsort(np.asarray(self._start)[leaves])]
+        self._leaf_of = np.full(len(self._dim), -1, dtype=np.intp)
+        self._leaf_of[leaves] = np.arange(len(leaves))
+        self._leaf_start = np.asarray(self._start, dtype=np.intp)[leaves]
+        self._leaf_size = np.asarray(self._end, dtype=np.intp)[leaves] - self._leaf_start
+        if len(points):
+            self._leaf_lo = np.minimum.reduceat(self._points, self._leaf_start, axis=0)
+            self._leaf_hi = np.maximum.reduceat(self._points, self._leaf_start, axis=0)
+
+    # ---------- Queries ----------
+    def _query_point(self, point, k):
+        # Max-heap of the k best (negated squared chord, position) pairs
+        best = []
+        if not len(self._points):
+            return best
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound > -best[0][0]:
+                continue
+            dim = self._dim[node]
+            if dim < 0:
+                start, end = self._start[node], self._end[node]
+                diff = self._points[start:end] - point
+                dist2 = np.einsum("ij,ij->i", diff, diff)
+                for offset in np.argsort(dist2, kind="stable")[:k]:
+                    item = (-float(dist2[offset]), -(start + int(offset)))
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+                    else:
+                        break
+                continue
+            delta = point[dim] - self._split[node]
+            near, far = (self._left[node], self._right[node]) if delta < 0 else (self._right[node], self._left[node])
+            stack.append((far, delta * delta))
+            stack.append((near, 0.0))
+        return sorted((-d2, -neg_pos) for d2, neg_pos in best)
+
+    def query(self, lat, lon, k=1):
+        """k nearest points to (lat, lon) as [(label, distance_km), ...], closest first."""
+        point = to_unit_vectors(lat, lon)
+        hits = self._query_point(point, max(int(k), 1))
+        return [
+            (self.labels[self._order[pos]], float(chord_to_km(np.sqrt(d2))))
+            for d2, pos in hits
+        ]
+
+    def nearest(self, lat, lon):
+        """(label, distance_km) of the closest point, or (None, inf) for an empty index."""
+        hits = self.query(lat, lon, k=1)
+        return hits[0] if hits else (None, float("inf"))
+
+    def query_many(self, lats, lons, k=1):
+        """Bulk k-nearest search.
+
+        Returns (positions, distances_km), both shaped (M, k), where positions
+        index into self.labels / self.lats / self.lons. Queries with missing
+        coordinates get NaN distances. Small indexes are scanned in full;
+        large ones are searched leaf by leaf (see _query_leaves). Either way
+        at most BLOCK_ELEMENTS distances are held at once.
+        """
+        queries = to_unit_vectors(lats, lons).reshape(-1, 3)
+        k = min(max(int(k), 1), len(self))
+        positions = np.zeros((len(queries), k), dtype=np.intp)
+        chords = np.full((len(queries), k), np.nan)
+        valid = np.flatnonzero(~np.isnan(queries).any(axis=1))
+        if not k or not len(valid):
+            pass
+        elif len(self) <= BRUTE_FORCE_MAX_POINTS:
+            rows = max(1, BLOCK_ELEMENTS // len(self))
+            for lo in range(0, len(valid), rows):
+                block = valid[lo:lo + rows]
+                found, dist2 = _k_smallest(_dist2(queries[block], self._points), k)
+                positions[block] = found
+                chords[block] = np.sqrt(dist2)
+        else:
+            self._query_leaves(queries[valid], valid, k, positions, chords)
+
+        if k and len(valid):
+            # 2 - 2 * dot picks the neighbours cheaply but loses precision near
+            # zero distance; recompute the chosen ones from coordinate differences.
+            diff = self._points[positions[valid]] - queries[valid, None, :]
+            exact = np.einsum("ijk,ijk->ij", diff, diff)
+            rank = np.argsort(exact, axis=1, kind="stable")
+            positions[valid] = np.take_along_axis(positions[valid], rank, axis=1)
+            chords[valid] = np.sqrt(np.take_along_axis(exact, rank, axis=1))
+
+        return self._order[positions], chord_to_km(chords)
+
+    def _home_leaves(self, queries):
+        """Leaf number each query descends to."""
+        dims, splits, lefts, rights = self._tree
+        node = np.zeros(len(queries), dtype=np.intp)
+        active = np.flatnonzero(dims[node] >= 0)
+        while len(active):
+            current = node[active]
+            left = queries[active, dims[current]] < splits[current]
+            node[active] = np.where(left, lefts[current], rights[current])
+            active = active[dims[node[active]] >= 0]
+        return self._leaf_of[node]
+
+    def _leaf_positions(self, leaves):
+        """Positions in _points of every point in the given leaves."""
+        sizes = self._leaf_size[leaves]
+        offsets = self._leaf_start[leaves] - (np.cumsum(sizes) - sizes)
+        return np.repeat(offsets, sizes) + np.arange(sizes.sum())
+
+    def _query_leaves(self, queries, rows, k, positions, chords):
+        """Exact k-nearest for large indexes, one group of nearby queries at a time.
+
+        Queries are grouped by the leaf they descend to. For each group, the
+        points of the leaves closest to the group's bounding box give every
+        query an upper bound on its k-th distance; only leaves whose box lies
+        within the largest of those bounds can hold a neighbour, and just
+        those are scanned.
+        """
+        home = self._home_leaves(queries)
+        order = np.argsort(home, kind="stable")
+        for group in np.split(order, np.flatnonzero(np.diff(home[order])) + 1):
+            block = queries[group]
+            gap = np.maximum(np.maximum(self._leaf_lo - block.max(axis=0), block.min(axis=0) - self._leaf_hi), 0.0)
+            lower = np.einsum("ij,ij->i", gap, gap)
+
+            by_lower = np.argsort(lower, kind="stable")
+            enough = np.searchsorted(np.cumsum(self._leaf_size[by_lower]), k) + 1
+            seeds = self._points[self._leaf_positions(by_lower[:enough])]
+            step = max(1, BLOCK_ELEMENTS // len(seeds))
+            upper = max(
+                np.partition(_dist2(block[lo:lo + step], seeds), k - 1, axis=1)[:, k - 1].max()
+                for lo in range(0, len(group), step)
+            )
+
+            candidates = self._leaf_positions(np.flatnonzero(lower <= upper * (1 + 1e-9) + 1e-15))
+            points = self._points[candidates]
+            step = max(1, BLOCK_ELEMENTS // len(candidates))
+            for lo in range(0, len(group), step):
+                found, dist2 = _k_smallest(_dist2(block[lo:lo + step], points), k)
+                positions[rows[group[lo:lo + step]]] = candidates[found]
+                chords[rows[group[lo:lo + step]]] = np.sqrt(dist2)
+
+
+def _dist2(queries, points):
+    """(M, N) squared chord lengths between unit vectors."""
+    return np.maximum(2.0 - 2.0 * queries @ points.T, 0.0)
+
+
+def _k_smallest(dist2, k):
+    """Column indices and values of the k smallest entries of each row, ascending."""
+    if k < dist2.shape[1]:
+        part = np.argpartition(dist2, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(dist2.shape[1]), dist2.shape)
+    part_d2 = np.take_along_axis(dist2, part, axis=1)
+    rank = np.argsort(part_d2, axis=1, kind="stable")
+    return np.take_along_axis(part, rank, axis=1), np.take_along_axis(part_d2, rank, axis=1)
@@ -0,0 +1,143 @@
+"""Monte Carlo uncertainty for the risk scores.
+
+R_current, GW_current and the land-use percentages are estimates. simulate()
+draws `samples` perturbed copies of them for every region at once, as a
+(samples, regions) array, and scores them with the scoring.py formulas. It
+reports percentiles of each score and the probability of each risk level.
+
+Noise model (NOISE), all Gaussian:
+    R_current           10% of the value (relative), floored at 0
+    GW_current          0.5 m, floored at 0 (mbgl)
+    Urban / Forest      5 percentage points, clipped to [0, 100]
+    Water_Body_Percent  2 percentage points where there is a water body;
+                        regions without one are never given one
+
+The sampling is seeded, so a dataset version always shows the same bands.
+"""
+import numpy as np
+
+import scoring
+
+DEFAULT_SAMPLES = 10_000
+DEFAULT_PERCENTILES = (5, 50, 95)
+DEFAULT_SEED = 20240601
+DEFAULT_CHUNK_ELEMENTS = 1 << 22
+
+NOISE = {
+    "R_current": ("relative", 0.10),
+    "GW_current": ("absolute", 0.5),
+    "Urban_Percent": ("absolute", 5.0),
+    "Forest_Percent": ("absolute", 5.0),
+    "Water_Body_Percent": ("absolute", 2.0),
+}
+_BOUNDS = {
+    "R_current": (0, None),
+    "GW_current": (0, None),
+    "Urban_Percent": (0, 100),
+    "Forest_Percent": (0, 100),
+    "Water_Body_Percent": (0, 100),
+}
+
+
+class UncertaintyResult:
+    """Per-region distributions of both scores.
+
+    flood_percentiles / scarcity_percentiles are (regions, len(percentiles))
+    and flood_probabilities / scarcity_probabilities are (regions, 3), in
+    scoring.LEVELS order. arrays, keyed by those attribute names, fills them
+    from precomputed values (see artifact.py) instead of empty arrays.
+    """
+
+    ARRAYS = tuple(f"{risk}_{part}" for risk in ("flood", "scarcity")
+                   for part in ("percentiles", "probabilities", "mean"))
+
+    def __init__(self, regions, samples, percentiles, arrays=None):
+        self.regions = regions
+        self.samples = samples
+        self.percentiles = tuple(percentiles)
+        if arrays is not None:
+            for name in self.ARRAYS:
+                setattr(self, name, arrays[name])
+            return
+        n = len(regions)
+        for risk in ("flood", "scarcity"):
+            setattr(self, f"{risk}_percentiles", np.empty((n, len(self.percentiles))))
+            setattr(self, f"{risk}_probabilities", np.empty((n, 3)))
+            setattr(self, f"{risk}_mean", np.empty(n))
+
+    def for_region(self, index, risk_type):
+        """JSON-ready summary of one region: interval, median and level odds."""
+        bands = getattr(self, f"{risk_type}_percentiles")[index]
+        odds = getattr(self, f"{risk_type}_probabilities")[index]
+        return {
+            "samples": self.samples,
+            "percentiles": {f"p{p:g}": round(float(v), 2) for p, v in zip(self.percentiles, bands)},
+            "interval": [round(float(bands[0]), 2), round(float(bands[-1]), 2)],
+            "mean": round(float(getattr(self, f"{risk_type}_mean")[index]), 2),
+            "probabilities": {level: round(float(p), 4) for level, p in zip(scoring.LEVELS, odds)},
+        }
+
+
+def _column(columns, name, n):
+    try:
+        return scoring._as_float(columns[name])
+    except KeyError:
+        return np.zeros(n)
+
+
+def _perturb(rng, values, name, shape, noise):
+    kind, scale = noise[name]
+    draws = rng.standard_normal(shape)
+    draws *= values * scale if kind == "relative" else scale
+    draws += values
+    low, high = _BOUNDS[name]
+    np.clip(draws, low, high, out=draws)
+    if name == "Water_Body_Percent":
+        draws = np.where(values > 0, draws, values)
+    return draws
+
+
+def simulate(columns, samples=DEFAULT_SAMPLES, percentiles=DEFAULT_PERCENTILES, noise=None,
+             seed=DEFAULT_SEED, chunk_elements=DEFAULT_CHUNK_ELEMENTS):
+    """Monte Carlo score distributions for every region in columns.
+
+    columns is anything score_columns accepts. Regions are processed in
+    chunks of about chunk_elements samples, so memory does not grow with
+    the number of regions.
+    """
+    noise = {**NOISE, **(noise or {})}
+    rng = np.random.default_rng(seed)
+    n = len(columns["R_normal"])
+    regions = list(columns["Panchayat"]) if "Panchayat" in columns else list(range(n))
+    result = UncertaintyResult(regions, samples, percentiles)
+
+    inputs = {name: _column(columns, name, n) for name in (
+        "R_normal", "R_current", "GW_last", "GW_current",
+        "Urban_Percent", "Forest_Percent", "Water_Body_Percent",
+    )}
+
+    step = max(1, chunk_elements // samples)
+    for lo in range(0, n, step):
+        hi = min(lo + step, n)
+        shape = (samples, hi - lo)
+        part = {name: values[lo:hi] for name, values in inputs.items()}
+        drawn = {name: _perturb(rng, part[name], name, shape, noise) for name in NOISE}
+
+        r = scoring.rainfall_score(part["R_normal"], drawn["R_current"])
+        g = scoring.groundwater_score(part["GW_last"], drawn["GW_current"])
+        g_flood = np.where(scoring.groundwater_rising(part["GW_last"], drawn["GW_current"]), g, 0.0)
+        lu = scoring.landuse_score(drawn["Urban_Percent"], drawn["Forest_Percent"])
+        water = drawn["Water_Body_Percent"]
+
+        scores = {
+            "flood": scoring.flood_risk(r, lu, g_flood, scoring.flood_boost(water)),
+            "scarcity": scoring.scarcity_risk(r, g, lu, scoring.surface_water_factor(water)),
+        }
+        for risk, values in scores.items():
+            codes = scoring.classify_codes(values)
+            getattr(result, f"{risk}_percentiles")[lo:hi] = np.percentile(values, percentiles, axis=0).T
+            getattr(result, f"{risk}_mean")[lo:hi] = values.mean(axis=0)
+            odds = getattr(result, f"{risk}_probabilities")
+            for code in range(3):
+                odds[lo:hi, code] = (codes == code).mean(axis=0)
+    return result